@@ -11,6 +11,7 @@ from .utils import (
     get_fixed_angles,
     get_full_qaoa_dataset_table_row,
     get_full_qaoa_dataset_table,
+    get_full_qaoa_dataset_arrays,
     get_3_reg_dataset_table,
     get_3_reg_dataset_table_row,
     get_fixed_angle_dataset_table,
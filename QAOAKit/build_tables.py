@@ -1,40 +1,91 @@
 import numpy as np
 import pandas as pd
 import networkx as nx
+import argparse
+import hashlib
+import inspect
 import json
-import gc
+import os
 import copy
+import time
 import pynauty
 import pickle
+import re
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from io import BytesIO
 from urllib.request import urlopen
 from zipfile import ZipFile
 import shutil
 from tqdm import tqdm
-from multiprocessing import Process
 
+from . import weighted_store
+from .graph_store import GraphStore, bitmasks_to_edges
 from .utils import (
-    load_results_file_into_dataframe,
+    FULL_QAOA_DATASET_COLUMNS,
     get_adjacency_dict,
-    read_graph_from_file,
+    get_canonical_graph_hash,
+    get_graph_and_assign_weights,
+    get_results_file,
+    iter_graph_file,
+    load_results_file,
+    load_weighted_results_into_dataframe,
+    load_weights_into_dataframe,
 )
 
 build_tables_folder = Path(__file__).parent
+default_data_folder = Path(build_tables_folder, "../data")
 
 n_graphs = {3: 2, 4: 6, 5: 21, 6: 112, 7: 853, 8: 11117, 9: 261080}
-
-
-def load_data():
-    if not Path(build_tables_folder, "../data/qaoa-dataset-version1/").is_dir():
+# graph files are split into shards of at most this many graphs,
+# so the n = 9 file is spread over all workers
+GRAPH_SHARD_SIZE = 8192
+THREE_REG_FILE = "3_regular/3r_WURTZ_ensemble.json"
+WEIGHTED_TRANSFER_FILE = "transfer_qaoa_weighted/all_transfer.zip"
+# folder of the `QAOAKit.weighted_store.WeightedDatasetStore` built from it
+WEIGHTED_TRANSFER_STORE = "weighted_transfer"
+# weighted_angle_dat/{p} holds the results and weights files of one number of nodes
+WEIGHTED_ANGLE_FOLDER = "weighted_angle_dat"
+WEIGHTED_ANGLE_STORE = "weighted_angle_dat"
+# maps every table in lookup_tables to the digest of the inputs it was built from
+MANIFEST_FILE = "manifest.json"
+
+
+class StageTimer:
+    """Wall-clock time spent in each named stage of the build"""
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        print(f"{name}...")
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def report(self):
+        width = max(len(name) for name in list(self.stages) + ["total"])
+        lines = ["Stage timings:"]
+        for name, elapsed in self.stages.items():
+            lines.append(f"  {name:<{width}}  {elapsed:8.2f} s")
+        lines.append(f"  {'total':<{width}}  {sum(self.stages.values()):8.2f} s")
+        print("\n".join(lines))
+
+
+def load_data(data_folder=default_data_folder):
+    if not Path(data_folder, "qaoa-dataset-version1/").is_dir():
         print("Loading data, this may take a while")
-        data_folder = Path(build_tables_folder, "../data/")
         zipurl = "https://github.com/QAOAKit/data/zipball/master"
         with urlopen(zipurl) as zipresp:
             with ZipFile(BytesIO(zipresp.read())) as zfile:
                 zfile.extractall(data_folder)
         # remove top folder
-        folder = list(Path(build_tables_folder, "../data/").glob("QAOAKit-data-*"))
+        folder = list(Path(data_folder).glob("QAOAKit-data-*"))
         assert len(folder) == 1
         folder = folder[0]
         for subfolder in folder.glob("*"):
@@ -46,168 +97,340 @@ def load_data():
         shutil.rmtree(folder)
 
 
-def build_graph2angles():
-    print(f"Building graph2angles table...")
+def get_graph_file(n_qubits, data_folder=default_data_folder):
+    return Path(data_folder, f"qaoa-dataset-version1/Graphs/graph{n_qubits}c.txt")
 
-    tables = {}
 
-    for n_qubits in tqdm(range(3, 10)):
-        tables[n_qubits] = {}
+def get_file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
 
-        for p in tqdm(range(1, 4), leave=False):
-            tables[n_qubits][p] = {}
 
-            df = load_results_file_into_dataframe(n_qubits, p)
+def get_digest(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
 
-            for index, data in df.iterrows():
-                if data["p"] != p:
-                    assert np.isclose(data["C_{true opt}"], data["C_opt"])
-                tables[n_qubits][p][int(index)] = {
-                    "beta": data["beta"],
-                    "gamma": data["gamma"],
-                }
 
-    pickle.dump(
-        tables,
-        open(Path(build_tables_folder, f"../data/lookup_tables/graph2angles.p"), "wb"),
+def get_code_digest():
+    """Digest of the code the table contents depend on:
+    this module and the parsers it uses from QAOAKit.utils
+    """
+    h = hashlib.sha256(Path(__file__).read_bytes())
+    for f in (iter_graph_file, load_results_file, get_adjacency_dict):
+        h.update(inspect.getsource(f).encode())
+    return h.hexdigest()
+
+
+def get_weighted_code_digest():
+    """Digest of the code the weighted stores depend on"""
+    h = hashlib.sha256(get_code_digest().encode())
+    for f in (
+        weighted_store,
+        get_canonical_graph_hash,
+        load_weighted_results_into_dataframe,
+        load_weights_into_dataframe,
+        get_graph_and_assign_weights,
+    ):
+        h.update(inspect.getsource(f).encode())
+    return h.hexdigest()
+
+
+def get_table_inputs(data_folder, p_range, graph_counts):
+    """Digest of the inputs of every table: raw data files, builder code and options
+
+    Returns
+    -------
+    inputs : dict
+        Maps table file name to the digest of its inputs
+    """
+    code = get_code_digest()
+    graphs = {
+        n_qubits: get_file_digest(get_graph_file(n_qubits, data_folder))
+        for n_qubits in graph_counts
+    }
+    results = {
+        f"n={n_qubits},p={p}": get_file_digest(
+            get_results_file(n_qubits, p, data_folder)
+        )
+        for n_qubits in graph_counts
+        for p in p_range
+    }
+    inputs = {
+        f"graph2pynauty_large_{n_qubits}.p": get_digest(
+            code, graph_counts[n_qubits], graphs[n_qubits]
+        )
+        for n_qubits in graph_counts
+    }
+    inputs["graph2pynauty.p"] = get_digest(code, graph_counts, graphs)
+    inputs["graph2angles.p"] = get_digest(code, list(p_range), results)
+    inputs["full_qaoa_dataset_table.npz"] = get_digest(
+        code, graph_counts, graphs, list(p_range), results
     )
-    del tables
-    print(f"Done building graph2angles table.")
-
-
-def build_graph2pynauty():
-    print(f"Building graph2pynauty table...")
-
-    tables = {}
-
-    for n_qubits in tqdm(range(3, 10)):
-
-        with open(
-            Path(
-                build_tables_folder,
-                "../data/qaoa-dataset-version1/Graphs/graph" + str(n_qubits) + "c.txt",
-            )
-        ) as f:
-            for _ in tqdm(range(n_graphs[n_qubits]), leave=False):
-                G, graph_id = read_graph_from_file(f, expected_nnodes=n_qubits)
-                g = pynauty.Graph(
-                    number_of_vertices=G.number_of_nodes(),
-                    directed=nx.is_directed(G),
-                    adjacency_dict=get_adjacency_dict(G),
-                )
-                cert = pynauty.certificate(g)
-                tables[cert] = graph_id
-
-    pickle.dump(
-        tables,
-        open(Path(build_tables_folder, f"../data/lookup_tables/graph2pynauty.p"), "wb"),
+    inputs["3_reg_dataset_table.p"] = get_digest(
+        code, get_file_digest(Path(data_folder, THREE_REG_FILE))
     )
-    del tables
-    print(f"Done building graph2pynauty table.")
-
+    # the weighted transfer data is optional
+    if Path(data_folder, WEIGHTED_TRANSFER_FILE).exists():
+        inputs[WEIGHTED_TRANSFER_STORE] = get_digest(
+            get_weighted_code_digest(),
+            get_file_digest(Path(data_folder, WEIGHTED_TRANSFER_FILE)),
+        )
+    weighted_angle_folders = get_weighted_angle_folders(data_folder)
+    if weighted_angle_folders:
+        inputs[WEIGHTED_ANGLE_STORE] = get_digest(
+            get_weighted_code_digest(),
+            {
+                f"p={p}": [
+                    (f.name, get_file_digest(f))
+                    for f in sorted(p_folder.iterdir())
+                    if f.is_file()
+                ]
+                for p, (p_folder, _) in weighted_angle_folders.items()
+            },
+            {
+                n_qubits: get_file_digest(get_graph_file(n_qubits, data_folder))
+                for _, n_qubits in weighted_angle_folders.values()
+            },
+        )
+    return inputs
 
-def build_graph2pynauty_large():
-    print(f"Building graph2pynauty_large tables...")
 
-    for n_qubits in tqdm(range(3, 10)):
-        table = {}
+def dump_atomic(obj, path):
+    """Pickles obj to path through a temporary file,
+    so an interrupted build never leaves a truncated file at path
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def savez_atomic(arrays, path):
+    """Saves a dict of arrays to an .npz file at path, see `dump_atomic`"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(path):
+    if not Path(path).exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path):
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def get_graph_shards(graph_counts=n_graphs, shard_size=GRAPH_SHARD_SIZE):
+    """Splits every graph file into (n_qubits, start, stop) ranges of graph positions"""
+    shards = []
+    for n_qubits, count in graph_counts.items():
+        for start in range(0, count, shard_size):
+            shards.append((n_qubits, start, min(start + shard_size, count)))
+    return shards
+
+
+def get_certificate(n_qubits, edges):
+    """pynauty certificate of the graph on n_qubits nodes with edges"""
+    adjacency_dict = {node: [] for node in range(n_qubits)}
+    for u, v in edges.tolist():
+        adjacency_dict[u].append(v)
+        adjacency_dict[v].append(u)
+    g = pynauty.Graph(number_of_vertices=n_qubits, adjacency_dict=adjacency_dict)
+    return pynauty.certificate(g)
+
+
+def certify_graph_shard(n_qubits, start, stop, data_folder=default_data_folder):
+    """Parses graphs at positions start, .., stop - 1 of graph{n_qubits}c.txt
+    and computes their pynauty certificates
+
+    Returns
+    -------
+    records : list
+        (graph_id, cert, bitmask) for each graph, bitmask as in `QAOAKit.graph_store`
+    """
+    records = []
+    for graph_ids, bitmasks in iter_graph_file(
+        get_graph_file(n_qubits, data_folder), n_qubits, start=start, stop=stop
+    ):
+        edges, offsets = bitmasks_to_edges(bitmasks, n_qubits)
+        for i, (graph_id, bitmask) in enumerate(zip(graph_ids, bitmasks)):
+            cert = get_certificate(n_qubits, edges[offsets[i] : offsets[i + 1]])
+            records.append((int(graph_id), cert, bitmask))
+    assert len(records) == stop - start
+    return records
+
+
+def load_results(n_qubits, p, data_folder=default_data_folder):
+    return n_qubits, p, load_results_file(n_qubits, p, data_folder)
+
+
+def build_graph_table(n_qubits, records, graph_count=None):
+    """Builds the graph2pynauty_large table for n_qubits
+    from the certificates of all graphs on n_qubits nodes
+
+    Parameters
+    ----------
+    n_qubits : int
+    records : list
+        (graph_id, cert, bitmask) for all graphs on n_qubits nodes
+    graph_count : int, default None
+        Expected number of graphs, n_graphs[n_qubits] if None
+
+    Returns
+    -------
+    table : dict
+        'graph_id2pynautycert' and 'pynautycert2graph_id' tables
+        and the 'graph_store' (`QAOAKit.graph_store.GraphStore`) of all graphs
+    """
+    if graph_count is None:
+        graph_count = n_graphs[n_qubits]
+    graph_ids, certs, bitmasks = zip(*records)
+    table = {
+        "graph_id2pynautycert": dict(zip(graph_ids, certs)),
+        "pynautycert2graph_id": dict(zip(certs, graph_ids)),
+        "graph_store": GraphStore(n_qubits, graph_ids, bitmasks),
+    }
+    for subtable in table.values():
+        assert len(subtable) == graph_count
+    return table
+
+
+def build_graph2pynauty(large_tables):
+    """Builds the graph2pynauty table (certificate to graph_id for all n)
+    from the graph2pynauty_large tables
+    """
+    graph2pynauty = {}
+    for table in large_tables.values():
+        graph2pynauty.update(table["pynautycert2graph_id"])
+    return graph2pynauty
 
-        table["graph_id2pynautycert"] = {}
-        table["graph_id2graph"] = {}
-        table["pynautycert2graph_id"] = {}
-        table["pynautycert2graph"] = {}
 
-        with open(
-            Path(
-                build_tables_folder,
-                "../data/qaoa-dataset-version1/Graphs/graph" + str(n_qubits) + "c.txt",
-            )
-        ) as f:
-            for _ in tqdm(range(n_graphs[n_qubits]), leave=False):
-                G, graph_id = read_graph_from_file(f, expected_nnodes=n_qubits)
-                g = pynauty.Graph(
-                    number_of_vertices=G.number_of_nodes(),
-                    directed=nx.is_directed(G),
-                    adjacency_dict=get_adjacency_dict(G),
-                )
-                cert = pynauty.certificate(g)
-                table["graph_id2graph"][graph_id] = copy.deepcopy(G)
-                table["graph_id2pynautycert"][graph_id] = cert
-                table["pynautycert2graph_id"][cert] = graph_id
-                table["pynautycert2graph"][cert] = copy.deepcopy(G)
-
-        assert len(table["graph_id2pynautycert"]) == n_graphs[n_qubits]
-        assert len(table["graph_id2graph"]) == n_graphs[n_qubits]
-        assert len(table["pynautycert2graph_id"]) == n_graphs[n_qubits]
-        assert len(table["pynautycert2graph"]) == n_graphs[n_qubits]
-        pickle.dump(
-            table,
-            open(
-                Path(
-                    build_tables_folder,
-                    f"../data/lookup_tables/graph2pynauty_large_{n_qubits}.p",
-                ),
-                "wb",
-            ),
-        )
-        del table
-        gc.collect()
-    print(f"Done building graph2pynauty_large tables.")
+def build_graph2angles(results):
+    """Builds the graph2angles table from the loaded results files
 
+    Parameters
+    ----------
+    results : dict
+        results[n_qubits][p] is the output of `load_results_file`
 
-def build_full_qaoa_dataset():
-    print(f"Building full_qaoa_dataset table...")
+    Returns
+    -------
+    tables : dict
+        tables[n_qubits][p][graph_id] = {'beta': beta, 'gamma': gamma}
     """
-    Specifications:
-        index: 'pynauty_cert'+p (??)
-        columns: [
-            'pynauty_cert','graph_id','#nodes','C_{true opt}','C_init','C_opt','pr(max)','p','beta','gamma',
-            'p_max', # maximal p allowed; this is to differentiate from p in the original dataset, which can be lower due to achieving optimal solution
-            ]
+    tables = {}
+    for n_qubits, results_n in results.items():
+        tables[n_qubits] = {}
+        for p, arrays in results_n.items():
+            # rows with a lower p reached the optimal cut before p_max
+            lower = arrays["p"] != p
+            assert np.isclose(
+                arrays["C_{true opt}"][lower], arrays["C_opt"][lower]
+            ).all()
+            tables[n_qubits][p] = {
+                int(graph_id): {"beta": beta, "gamma": gamma}
+                for graph_id, beta, gamma in zip(
+                    arrays["graph_id"], arrays["beta"], arrays["gamma"]
+                )
+            }
+    return tables
+
+
+def build_full_qaoa_dataset(results, large_tables, graph_counts=n_graphs):
+    """Builds the columnar full_qaoa_dataset table
+
+    Every column is a numpy array with one entry per (graph, p_max),
+    rows are ordered by n, p_max and graph_id.
+    See `FULL_QAOA_DATASET_COLUMNS` for the names of the numeric columns.
+
+    Columns:
+        graph_id, n, p, p_max : ints; p_max is the maximal p allowed; this is to
+            differentiate from p in the original dataset, which can be lower
+            due to achieving optimal solution
+        C_true_opt, C_init, C_opt, pr_max : floats
+        beta, gamma : (rows, max p_max) angle matrices padded with nan
+        graph : uint64 edge bitmask (`QAOAKit.graph_store`)
+        pynauty_cert : (rows, max length) uint8 certificate bytes padded with 0
+        pynauty_cert_length : certificate lengths
+
+    Returns
+    -------
+    arrays : dict
+        Maps column name to numpy array
     """
-    df = pd.DataFrame()
-
-    for n_qubits in tqdm(range(3, 10)):
-        graph_table = pickle.load(
-            open(
-                Path(
-                    build_tables_folder,
-                    f"../data/lookup_tables/graph2pynauty_large_{n_qubits}.p",
-                ),
-                "rb",
-            )
-        )
-        graph_id2pynauty = pd.Series(
-            graph_table["graph_id2pynautycert"], name="pynauty_cert"
-        )
-        graph_id2graph = pd.Series(graph_table["graph_id2graph"], name="G")
-        for p in tqdm(range(1, 4), leave=False):
-            df_orig = (
-                load_results_file_into_dataframe(n_qubits, p)
-                .merge(graph_id2pynauty, how="outer", right_index=True, left_index=True)
-                .merge(graph_id2graph, how="outer", right_index=True, left_index=True)
-            )
-            assert len(df_orig) == n_graphs[n_qubits]
-            df_orig["n"] = df_orig.apply(lambda row: row["G"].number_of_nodes(), axis=1)
-            assert (df_orig["n"] == n_qubits).all()
-            df = pd.concat([df, df_orig.reset_index()], ignore_index=True)
-    assert len(df) == sum(v * 3 for v in n_graphs.values())
-    df.to_pickle(
-        Path(build_tables_folder, "../data/lookup_tables/full_qaoa_dataset_table.p")
+    n_rows = sum(graph_counts[n] * len(results[n]) for n in results)
+    max_p = max(p for results_n in results.values() for p in results_n)
+    cert_width = max(
+        len(cert)
+        for table in large_tables.values()
+        for cert in table["pynautycert2graph_id"]
     )
-    del df
-    print(f"Done building full_qaoa_dataset table.")
-
-
-def build_3_reg_dataset():
-    print("Building  3-regular graph table")
-    with open(
-        Path(build_tables_folder, "../data/3_regular/3r_WURTZ_ensemble.json")
-    ) as json_file:
+    arrays = {
+        "graph_id": np.empty(n_rows, dtype=np.int32),
+        "n": np.empty(n_rows, dtype=np.uint8),
+        "p": np.empty(n_rows, dtype=np.uint8),
+        "p_max": np.empty(n_rows, dtype=np.uint8),
+        **{
+            column: np.empty(n_rows, dtype=float)
+            for column in FULL_QAOA_DATASET_COLUMNS.values()
+        },
+        "beta": np.full((n_rows, max_p), np.nan),
+        "gamma": np.full((n_rows, max_p), np.nan),
+        "graph": np.empty(n_rows, dtype=np.uint64),
+        "pynauty_cert": np.zeros((n_rows, cert_width), dtype=np.uint8),
+        "pynauty_cert_length": np.empty(n_rows, dtype=np.uint16),
+    }
+
+    start = 0
+    for n_qubits, results_n in sorted(results.items()):
+        table = large_tables[n_qubits]
+        graph_ids = table["graph_store"].graph_ids
+        bitmasks = table["graph_store"].bitmasks
+        assert len(graph_ids) == graph_counts[n_qubits]
+        certs = [table["graph_id2pynautycert"][i] for i in graph_ids]
+        cert_lengths = np.array([len(cert) for cert in certs])
+        cert_matrix = np.zeros((len(certs), cert_width), dtype=np.uint8)
+        for row, cert in zip(cert_matrix, certs):
+            row[: len(cert)] = np.frombuffer(cert, dtype=np.uint8)
+
+        for p, results_p in sorted(results_n.items()):
+            order = np.argsort(results_p["graph_id"])
+            assert (results_p["graph_id"][order] == graph_ids).all()
+            rows = slice(start, start + len(order))
+            arrays["graph_id"][rows] = graph_ids
+            arrays["n"][rows] = n_qubits
+            arrays["p"][rows] = results_p["p"][order]
+            arrays["p_max"][rows] = p
+            for column, name in FULL_QAOA_DATASET_COLUMNS.items():
+                arrays[name][rows] = results_p[column][order]
+            arrays["beta"][rows, :p] = results_p["beta"][order]
+            arrays["gamma"][rows, :p] = results_p["gamma"][order]
+            arrays["graph"][rows] = bitmasks
+            arrays["pynauty_cert"][rows] = cert_matrix
+            arrays["pynauty_cert_length"][rows] = cert_lengths
+            start += len(order)
+    assert start == n_rows
+    return arrays
+
+
+def build_3_reg_dataset(data_folder=default_data_folder):
+    with open(Path(data_folder, THREE_REG_FILE)) as json_file:
         data = json.load(json_file)
 
     rows = []
-    for row in tqdm(data):
+    for row in data:
         G = nx.Graph()
         G.add_edges_from(row["edges"])
         g = pynauty.Graph(
@@ -239,52 +462,272 @@ def build_3_reg_dataset():
                 d["theta"] = np.hstack([d["gamma"], d["beta"]])
             rows.append(copy.deepcopy(d))
 
-    df = pd.DataFrame(rows, columns=rows[0].keys())
-    df.to_pickle(
-        Path(build_tables_folder, "../data/lookup_tables/3_reg_dataset_table.p")
-    )
-    print("Done building  3-regular graph table")
+    return pd.DataFrame(rows, columns=rows[0].keys())
 
 
-if __name__ == "__main__":
-    print("Building tables (this may take a few minutes)...")
+def build_weighted_transfer_store(data_folder, folder):
+    """Converts transfer_qaoa_weighted/all_transfer.zip
+    into a `QAOAKit.weighted_store.WeightedDatasetStore` in folder
+    """
+    # precise_float keeps the weights exact, they are hashed
+    df = pd.read_json(Path(data_folder, WEIGHTED_TRANSFER_FILE), precise_float=True)
+    df["G"] = [nx.node_link_graph(G_json) for G_json in df["G_json"]]
+    weighted_store.build_weighted_store(df, folder)
 
-    # each function is run in its own process to force system to free memory
 
-    p = Process(target=load_data)
-    p.start()
-    p.join()
-    del p
-    gc.collect()
+def get_weighted_angle_folders(data_folder):
+    """Folders of weighted_angle_dat
 
-    p1 = Process(target=build_graph2angles)
-    p1.start()
+    Returns
+    -------
+    folders : dict
+        Maps p to the folder weighted_angle_dat/{p} and the number of nodes
+        of the graphs in its QAOA_dat_weighted_{n} files
+    """
+    folders = {}
+    for p_folder in sorted(Path(data_folder, WEIGHTED_ANGLE_FOLDER).glob("*")):
+        if not (p_folder.is_dir() and p_folder.name.isdigit()):
+            continue
+        n_qubits = {
+            int(match.group(1))
+            for f in p_folder.glob("QAOA_dat_weighted_*")
+            if (match := re.match(r"QAOA_dat_weighted_(\d+)", f.name))
+        }
+        if len(n_qubits) != 1:
+            raise ValueError(
+                f"Expected results for one number of nodes in {p_folder}, "
+                f"found {sorted(n_qubits)}"
+            )
+        folders[int(p_folder.name)] = (p_folder, n_qubits.pop())
+    return folders
 
-    p2 = Process(target=build_graph2pynauty)
-    p2.start()
 
-    p1.join()
-    p2.join()
-    del p1
-    del p2
-    gc.collect()
+def build_weighted_angle_store(data_folder, folder):
+    """Converts the weighted_angle_dat results of every p
+    into a `QAOAKit.weighted_store.WeightedDatasetStore` in folder
+    """
+    dfs = []
+    for p, (p_folder, n_qubits) in get_weighted_angle_folders(data_folder).items():
+        df = load_weighted_results_into_dataframe(
+            p_folder,
+            p,
+            n_qubits,
+            load_weights_into_dataframe(p_folder),
+            graphs_file_path=get_graph_file(n_qubits, data_folder),
+        )
+        # the store keeps the weights with the graphs
+        dfs.append(df.drop(columns="weights"))
+    weighted_store.build_weighted_store(pd.concat(dfs), folder)
+
+
+def build_tables(
+    data_folder=default_data_folder,
+    n_workers=None,
+    p_range=(1, 2, 3),
+    graph_counts=n_graphs,
+    force=False,
+):
+    """Builds the lookup tables in data_folder/lookup_tables
+    whose inputs changed since they were last built
+
+    The digest of the inputs of every table (raw data files, builder code
+    and options) is recorded in lookup_tables/manifest.json, and only tables
+    whose digest differs from the manifest are rebuilt.
+    Every graph file and every results file needed is read exactly once:
+    graph files are parsed and certified in shards on a process pool,
+    results files are loaded on the same pool, and all tables
+    are derived from these in the main process.
+    Finished shards are checkpointed in lookup_tables/shards,
+    so an interrupted build resumes where it stopped.
+
+    Parameters
+    ----------
+    data_folder : path-like
+        Folder holding the qaoa-dataset-version1 and 3_regular data,
+        and optionally the transfer_qaoa_weighted and weighted_angle_dat data
+    n_workers : int, default None
+        Number of worker processes, os.cpu_count() if None
+    p_range : tuple, default (1, 2, 3)
+        Values of p to load results for
+    graph_counts : dict, default n_graphs
+        Number of graphs in graph{n}c.txt for every n to build tables for
+    force : bool, default False
+        Rebuild all tables regardless of the manifest
+
+    Returns
+    -------
+    timer : StageTimer
+        Time spent in every stage
+    """
+    timer = StageTimer()
+    lookup_tables_folder = Path(data_folder, "lookup_tables")
+    shards_folder = Path(lookup_tables_folder, "shards")
+    shards_folder.mkdir(parents=True, exist_ok=True)
+    manifest_path = Path(lookup_tables_folder, MANIFEST_FILE)
+
+    with timer.stage("download"):
+        load_data(data_folder)
+
+    with timer.stage("hash inputs"):
+        inputs = get_table_inputs(data_folder, p_range, graph_counts)
+        manifest = {} if force else load_manifest(manifest_path)
+        stale = {
+            name
+            for name, digest in inputs.items()
+            if manifest.get(name) != digest
+            or not Path(lookup_tables_folder, name).exists()
+        }
+    if not stale:
+        print("All tables are up to date")
+        shutil.rmtree(shards_folder, ignore_errors=True)
+        return timer
+    print(f"Tables to build: {', '.join(sorted(stale))}")
+
+    def save(name, table, dump=dump_atomic):
+        dump(table, Path(lookup_tables_folder, name))
+        manifest[name] = inputs[name]
+        save_manifest(manifest, manifest_path)
+
+    need_graph_tables = stale & {"graph2pynauty.p", "full_qaoa_dataset_table.npz"}
+    parse_n = [n for n in graph_counts if f"graph2pynauty_large_{n}.p" in stale]
+    load_n = [n for n in graph_counts if need_graph_tables and n not in parse_n]
+    need_results = stale & {"graph2angles.p", "full_qaoa_dataset_table.npz"}
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        if "3_reg_dataset_table.p" in stale:
+            three_reg_future = executor.submit(build_3_reg_dataset, data_folder)
+        # the weighted stores are written in place by the workers
+        weighted_futures = {
+            name: executor.submit(
+                build_store, data_folder, Path(lookup_tables_folder, name)
+            )
+            for name, build_store in [
+                (WEIGHTED_TRANSFER_STORE, build_weighted_transfer_store),
+                (WEIGHTED_ANGLE_STORE, build_weighted_angle_store),
+            ]
+            if name in stale
+        }
+
+        shards = get_graph_shards({n: graph_counts[n] for n in parse_n})
+        shard_files = [
+            Path(
+                shards_folder,
+                f"graph{n}_{start}_{stop}_"
+                f"{inputs[f'graph2pynauty_large_{n}.p'][:16]}.p",
+            )
+            for n, start, stop in shards
+        ]
+        futures = [
+            (
+                None
+                if shard_file.exists()
+                else executor.submit(certify_graph_shard, *shard, data_folder)
+            )
+            for shard, shard_file in zip(shards, shard_files)
+        ]
+        results_futures = [
+            executor.submit(load_results, n_qubits, p, data_folder)
+            for n_qubits in graph_counts
+            for p in p_range
+            if need_results
+        ]
+
+        large_tables = {}
+        if load_n:
+            with timer.stage("load up-to-date graph tables"):
+                for n_qubits in load_n:
+                    with open(
+                        Path(lookup_tables_folder, f"graph2pynauty_large_{n_qubits}.p"),
+                        "rb",
+                    ) as f:
+                        large_tables[n_qubits] = pickle.load(f)
+
+        if shards:
+            with timer.stage("parse and certify graphs"):
+                n_resumed = sum(future is None for future in futures)
+                if n_resumed:
+                    print(f"Resuming from {n_resumed} of {len(shards)} shards")
+                records = {n_qubits: [] for n_qubits in parse_n}
+                # shards are consumed in file order, so records keep the file order
+                for (n_qubits, _, _), shard_file, future in zip(
+                    shards, tqdm(shard_files), futures
+                ):
+                    if future is None:
+                        with open(shard_file, "rb") as f:
+                            shard_records = pickle.load(f)
+                    else:
+                        shard_records = future.result()
+                        dump_atomic(shard_records, shard_file)
+                    records[n_qubits].extend(shard_records)
+
+            with timer.stage("build graph tables"):
+                for n_qubits in parse_n:
+                    large_tables[n_qubits] = build_graph_table(
+                        n_qubits, records.pop(n_qubits), graph_counts[n_qubits]
+                    )
+                    save(f"graph2pynauty_large_{n_qubits}.p", large_tables[n_qubits])
+                if "graph2pynauty.p" in stale:
+                    save("graph2pynauty.p", build_graph2pynauty(large_tables))
+        elif "graph2pynauty.p" in stale:
+            with timer.stage("build graph tables"):
+                save("graph2pynauty.p", build_graph2pynauty(large_tables))
+
+        if need_results:
+            with timer.stage("load results"):
+                results = {n_qubits: {} for n_qubits in graph_counts}
+                for future in results_futures:
+                    n_qubits, p, df = future.result()
+                    results[n_qubits][p] = df
+
+        if "graph2angles.p" in stale:
+            with timer.stage("build graph2angles"):
+                save("graph2angles.p", build_graph2angles(results))
+
+        if "full_qaoa_dataset_table.npz" in stale:
+            with timer.stage("build full_qaoa_dataset"):
+                save(
+                    "full_qaoa_dataset_table.npz",
+                    build_full_qaoa_dataset(results, large_tables, graph_counts),
+                    dump=savez_atomic,
+                )
 
-    p = Process(target=build_graph2pynauty_large)
-    p.start()
-    p.join()
-    del p
-    gc.collect()
+        if "3_reg_dataset_table.p" in stale:
+            with timer.stage("build 3_reg_dataset"):
+                save("3_reg_dataset_table.p", three_reg_future.result())
 
-    p = Process(target=build_full_qaoa_dataset)
-    p.start()
-    p.join()
-    del p
-    gc.collect()
+        for name, future in weighted_futures.items():
+            with timer.stage(f"build {name} store"):
+                future.result()
+                manifest[name] = inputs[name]
+                save_manifest(manifest, manifest_path)
 
-    p = Process(target=build_3_reg_dataset)
-    p.start()
-    p.join()
-    del p
-    gc.collect()
+    # all tables are built, the checkpoints are not needed anymore
+    shutil.rmtree(shards_folder, ignore_errors=True)
+    return timer
 
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build QAOAKit lookup tables")
+    parser.add_argument(
+        "--data-folder",
+        type=Path,
+        default=default_data_folder,
+        help="folder holding the raw data, tables are written to its lookup_tables",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="rebuild all tables even if their inputs did not change",
+    )
+    args = parser.parse_args()
+
+    print("Building tables (this may take a few minutes)...")
+    timer = build_tables(args.data_folder, n_workers=args.workers, force=args.force)
+    timer.report()
     print("All done")
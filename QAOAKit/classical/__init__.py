@@ -1 +1,9 @@
 from .thompson_parekh_marwaha import thompson_parekh_marwaha
+from .brute_force import maxcut_brute_force
+from .goemans_williamson import (
+    goemans_williamson_maxcut,
+    sample_goemans_williamson_cuts,
+    sdp_embedding_cache,
+)
+from .local_search import local_search_maxcut
+from .baseline import maxcut_baseline
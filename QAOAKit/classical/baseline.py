@@ -0,0 +1,107 @@
+import numpy as np
+import networkx as nx
+
+from .brute_force import maxcut_brute_force
+from .goemans_williamson import goemans_williamson_maxcut
+from .local_search import local_search_maxcut
+from .thompson_parekh_marwaha import thompson_parekh_marwaha
+from .cache import CanonicalGraphCache, get_graph_key
+
+# auto: exact enumeration up to EXACT_MAX_NODES nodes, Goemans-Williamson up to GW_MAX_NODES
+EXACT_MAX_NODES = 20
+GW_MAX_NODES = 100
+# number of sampled cuts that are refined with local search
+N_POLISHED = 8
+
+baseline_cache = CanonicalGraphCache(maxsize=1024)
+
+
+def is_unweighted_regular(G):
+    degrees = {d for _, d in G.degree()}
+    weights = {d.get("weight", 1) for _, _, d in G.edges(data=True)}
+    return len(degrees) == 1 and weights == {1}
+
+
+def get_baseline_method(G):
+    """Method picked by method="auto" in `maxcut_baseline`"""
+    n = G.number_of_nodes()
+    if n <= EXACT_MAX_NODES:
+        return "exact"
+    if n <= GW_MAX_NODES:
+        return "gw"
+    if is_unweighted_regular(G) and not nx.is_forest(G):
+        return "tpm"
+    return "local_search"
+
+
+def polish(G, x, values):
+    """Local search from the N_POLISHED best cuts; returns the best result"""
+    top = np.argsort(-values)[:N_POLISHED]
+    x, values = local_search_maxcut(G, x[top])
+    best = int(np.argmax(values))
+    return float(values[best]), x[best]
+
+
+def solve_baseline(G, method, nsamples, seed):
+    n = G.number_of_nodes()
+    upper_bound = None
+    if method == "exact":
+        value, x = maxcut_brute_force(G)
+        upper_bound = value
+    elif method == "gw":
+        value, x, upper_bound = goemans_williamson_maxcut(G, nsamples, seed=seed)
+        value, x = polish(G, x[None, :], np.array([value]))
+    elif method == "tpm":
+        if seed is not None:
+            np.random.seed(seed)
+        samples, _ = thompson_parekh_marwaha(G, nsamples)
+        x = (samples > 0.5).astype(np.uint8)
+        w = nx.to_scipy_sparse_array(G, nodelist=range(n), format="csr")
+        spins = 1.0 - 2.0 * x
+        values = w.sum() / 4 - np.einsum("ki,ki->k", (w @ spins.T).T, spins) / 4
+        value, x = polish(G, x, values)
+    elif method == "local_search":
+        rng = np.random.default_rng(seed)
+        x, values = local_search_maxcut(G, rng.integers(0, 2, (nsamples, n)))
+        best = int(np.argmax(values))
+        value, x = float(values[best]), x[best]
+    else:
+        raise ValueError(f"Unknown MaxCut baseline method {method}")
+    info = {"value": value, "method": method, "exact": method == "exact", "upper_bound": upper_bound}
+    return np.asarray(x, dtype=np.uint8), info
+
+
+def maxcut_baseline(G, method="auto", nsamples=1000, seed=None):
+    """Best known MaxCut of G, cached by canonical weighted-graph hash
+    (by labelled graph above CANONICAL_MAX_NODES nodes, see `get_graph_key`)
+
+    Exact enumeration for small graphs; for larger ones the best of nsamples
+    Goemans-Williamson cuts, Thompson-Parekh-Marwaha samples or random starts,
+    refined with 1-flip/2-flip local search. A cached exact result of an
+    isomorphic graph is returned for every method.
+
+    input:
+        G (nx.Graph):   graph on which to solve MaxCut
+                          nodes must be labelled 0,..,|V|-1
+        method (str):   "auto", "exact", "gw", "tpm" or "local_search"
+        nsamples (int): number of sampled cuts or local search starts
+        seed (int):     seed of the sampler
+    returns:
+        x (np.array):   binary string of the best cut found
+        info (dict):    'value': its cut value; 'method': the method used;
+                        'exact': whether value is the maximal cut, otherwise it is a lower bound;
+                        'upper_bound': SDP bound for "gw", the value for "exact", else None;
+                        'cached': whether the result came from the cache
+    """
+    if method == "auto":
+        method = get_baseline_method(G)
+    graph_key = get_graph_key(G)
+    exact = baseline_cache.lookup(G, ("exact",), graph_key)
+    if exact is not None:
+        x, info = exact
+        return x, dict(info, cached=True)
+    key = ("exact",) if method == "exact" else (method, nsamples)
+    x, info, cached = baseline_cache.get(
+        G, lambda G: solve_baseline(G, method, nsamples, seed), key, graph_key
+    )
+    return x, dict(info, cached=cached)
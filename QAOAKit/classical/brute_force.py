@@ -0,0 +1,30 @@
+import numpy as np
+
+from QAOAKit.simulators.statevector import (
+    get_maxcut_diagonal,
+    get_indexed_maxcut_diagonal,
+)
+
+
+def maxcut_brute_force(G, n_threads=None):
+    """Exact MaxCut by enumerating all 2**n cuts with the vectorized cut diagonal
+
+    input:
+        G (nx.Graph):    graph on which to solve MaxCut
+                           nodes must be labelled 0,..,|V|-1
+        n_threads (int): number of threads used to build the diagonal
+    returns:
+        value (float):   maximal cut value
+        x (np.array):    binary string of a maximal cut, x[i] is the side of node i
+    """
+    n = G.number_of_nodes()
+    diagonal = get_indexed_maxcut_diagonal(G, n_threads)
+    if diagonal is None:
+        diagonal = get_maxcut_diagonal(G, n_threads)
+        best = int(np.argmax(diagonal))
+        value = float(diagonal[best])
+    else:
+        best = int(np.argmax(diagonal.index))
+        value = float(diagonal.values[diagonal.index[best]])
+    x = (best >> np.arange(n)) & 1
+    return value, x
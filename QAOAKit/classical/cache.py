@@ -0,0 +1,76 @@
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+
+from QAOAKit.utils import get_canonical_graph_hash
+
+# nauty's canonical labeling gets slow on large regular graphs (tens of seconds
+# at 2000 nodes); larger graphs are keyed by their labelled edge list instead
+CANONICAL_MAX_NODES = 256
+
+
+def get_graph_key(G):
+    """Returns (digest, canon) identifying G: up to isomorphism for graphs with at most
+    CANONICAL_MAX_NODES nodes, as labelled graph (identity canon) for larger ones
+    """
+    if G.number_of_nodes() <= CANONICAL_MAX_NODES:
+        return get_canonical_graph_hash(G, return_labeling=True)
+    edges = np.array(
+        [(min(u, v), max(u, v), d.get("weight", 1)) for u, v, d in G.edges(data=True)],
+        dtype=float,
+    ).reshape(-1, 3)
+    edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+    digest = hashlib.sha256(
+        np.int64(G.number_of_nodes()).tobytes() + edges.tobytes()
+    ).hexdigest()
+    return digest, np.arange(G.number_of_nodes())
+
+
+class CanonicalGraphCache:
+    """LRU cache of per-node results keyed by canonical graph hash
+
+    A cached value is a pair (per_node, info) where per_node is an array whose
+    first axis is indexed by node. It is stored per canonical position, so all
+    graphs isomorphic to a solved graph (with the same weights) reuse it with
+    the rows permuted to their own labelling.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def lookup(self, G, key=(), graph_key=None):
+        """Returns (per_node, info) for G if cached, None otherwise
+
+        graph_key: `get_graph_key(G)` if already computed
+        """
+        digest, canon = graph_key or get_graph_key(G)
+        full_key = (digest,) + tuple(key)
+        with self.lock:
+            if full_key not in self.entries:
+                return None
+            self.entries.move_to_end(full_key)
+            canonical, info = self.entries[full_key]
+        per_node = np.empty_like(canonical)
+        per_node[canon] = canonical
+        return per_node, info
+
+    def get(self, G, compute, key=(), graph_key=None):
+        """Returns (per_node, info, cached) for G, calling compute(G) on a miss
+
+        key (tuple): extra parameters that distinguish cached values of the same graph
+        graph_key: `get_graph_key(G)` if already computed
+        """
+        graph_key = graph_key or get_graph_key(G)
+        cached = self.lookup(G, key, graph_key)
+        if cached is not None:
+            return cached + (True,)
+        digest, canon = graph_key
+        per_node, info = compute(G)
+        with self.lock:
+            self.entries[(digest,) + tuple(key)] = (np.asarray(per_node)[canon], info)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return per_node, info, False
@@ -0,0 +1,100 @@
+import numpy as np
+import networkx as nx
+
+from .cache import CanonicalGraphCache
+
+
+def solve_maxcut_sdp(w):
+    """Solves the Goemans-Williamson MaxCut SDP relaxation
+
+    maximize sum_ij w_ij (1 - X_ij) / 4 subject to X PSD and X_ii = 1
+
+    input:
+        w (np.array):        symmetric (n, n) weight matrix
+    returns:
+        vectors (np.array):  (n, n) array of unit vectors with X_ij = <v_i, v_j>
+        bound (float):       SDP optimum, an upper bound on the maximal cut
+    """
+    # cvxpy is only needed here, it is installed with qiskit-optimization
+    import cvxpy as cvx
+
+    n = len(w)
+    x = cvx.Variable((n, n), PSD=True)
+    problem = cvx.Problem(
+        cvx.Maximize(cvx.sum(cvx.multiply(w, 1 - x)) / 4), [cvx.diag(x) == 1]
+    )
+    problem.solve()
+
+    # X is only PSD up to solver accuracy: clip negative eigenvalues
+    eigenvalues, eigenvectors = np.linalg.eigh(x.value)
+    vectors = eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors, float(problem.value)
+
+
+sdp_embedding_cache = CanonicalGraphCache()
+
+
+def get_sdp_embedding(G):
+    """Returns (vectors, bound) of `solve_maxcut_sdp` for G,
+    solved once per canonical graph and kept in `sdp_embedding_cache`
+    """
+    vectors, bound, _ = sdp_embedding_cache.get(
+        G,
+        lambda G: solve_maxcut_sdp(
+            nx.to_numpy_array(G, nodelist=range(G.number_of_nodes()))
+        ),
+    )
+    return vectors, bound
+
+
+def sample_goemans_williamson_cuts(G, nsamples, chunk_size=1024, seed=None):
+    """Random hyperplane rounding of the cached SDP embedding of G
+
+    Cuts are drawn and evaluated chunk_size at a time, so memory does not grow with nsamples.
+
+    input:
+        G (nx.Graph):     graph on which to solve MaxCut
+                            nodes must be labelled 0,..,|V|-1
+        nsamples (int):   number of cuts to draw
+        chunk_size (int): number of cuts drawn per chunk
+        seed (int):       seed of the hyperplanes
+    yields:
+        x (np.array):       (chunk, n) uint8 array of cuts, x[k, i] is the side of node i
+        values (np.array):  (chunk,) array of cut values
+    """
+    vectors, _ = get_sdp_embedding(G)
+    n = G.number_of_nodes()
+    w = nx.to_scipy_sparse_array(G, nodelist=range(n), format="csr")
+    total_weight = w.sum() / 2
+    rng = np.random.default_rng(seed)
+    for start in range(0, nsamples, chunk_size):
+        hyperplanes = rng.standard_normal((min(chunk_size, nsamples - start), n))
+        spins = np.where(hyperplanes @ vectors.T >= 0, 1.0, -1.0)
+        # sum_{i<j} w_ij (1 - s_i s_j) / 2 = total / 2 - s^T W s / 4
+        values = total_weight / 2 - np.einsum("ki,ki->k", (w @ spins.T).T, spins) / 4
+        yield (spins < 0).astype(np.uint8), values
+
+
+def goemans_williamson_maxcut(G, nsamples=1000, chunk_size=1024, seed=None):
+    """Best of nsamples Goemans-Williamson cuts, e.g. as approximation ratio denominator
+    for graphs too large to brute-force
+
+    input:
+        G (nx.Graph):     graph on which to solve MaxCut
+                            nodes must be labelled 0,..,|V|-1
+        nsamples (int):   number of cuts to draw
+        chunk_size (int): number of cuts drawn per chunk
+        seed (int):       seed of the hyperplanes
+    returns:
+        value (float):    best cut value found, a lower bound on the maximal cut
+        x (np.array):     binary string of the best cut
+        bound (float):    SDP optimum, an upper bound on the maximal cut
+    """
+    best_value, best_x = -np.inf, None
+    for x, values in sample_goemans_williamson_cuts(G, nsamples, chunk_size, seed):
+        k = int(np.argmax(values))
+        if values[k] > best_value:
+            best_value, best_x = float(values[k]), x[k]
+    _, bound = get_sdp_embedding(G)
+    return best_value, best_x, bound
@@ -1,9 +1,66 @@
 import networkx as nx
 import numpy as np
 import scipy.sparse
+import scipy.sparse.linalg
 
 
-def thompson_parekh_marwaha(G, nsamples=1, girth=0):
+def get_girth(G):
+    """Length of the shortest cycle of G, by breadth-first search from every node
+
+    Each search stops at the depth where it can no longer find a cycle shorter
+    than the best one so far, so the cost is O(n d^(girth / 2)) on graphs of
+    maximal degree d instead of a minimum cycle basis.
+    Returns np.inf if G has no cycle.
+    """
+    adjacency = {u: list(G[u]) for u in G}
+    girth = np.inf
+    for source in adjacency:
+        dist = {source: 0}
+        parent = {source: None}
+        frontier = [source]
+        depth = 0
+        # a cycle found at depth + 1 has length at least 2 depth + 1
+        while frontier and 2 * depth + 1 < girth:
+            next_frontier = []
+            for u in frontier:
+                for v in adjacency[u]:
+                    if v not in dist:
+                        dist[v] = depth + 1
+                        parent[v] = u
+                        next_frontier.append(v)
+                    elif v != parent[u]:
+                        girth = min(girth, dist[u] + dist[v] + 1)
+            frontier = next_frontier
+            depth += 1
+    return girth
+
+
+def get_truncated_distance_matrix(G, values):
+    """Sparse matrix with entries values[dist(i, j)] for all pairs at distance < len(values)
+
+    Built from a breadth-first search of depth len(values) - 1 from every node
+    """
+    adjacency = {u: list(G[u]) for u in G}
+    rows, cols, data = [], [], []
+    for source in adjacency:
+        dist = {source: 0}
+        frontier = [source]
+        for depth in range(1, len(values)):
+            next_frontier = []
+            for u in frontier:
+                for v in adjacency[u]:
+                    if v not in dist:
+                        dist[v] = depth
+                        next_frontier.append(v)
+            frontier = next_frontier
+        rows.extend([source] * len(dist))
+        cols.extend(dist.keys())
+        data.extend(values[d] for d in dist.values())
+    n = G.number_of_nodes()
+    return scipy.sparse.csr_matrix((data, (rows, cols)), shape=(n, n))
+
+
+def thompson_parekh_marwaha(G, nsamples=1, girth=0, batch_size=1024):
     """An explicit vector algorithm for high-girth MaxCut [1]
     Implementation courtesy of authors, refactored by Jonathan Wurtz
 
@@ -13,6 +70,8 @@ def thompson_parekh_marwaha(G, nsamples=1, girth=0):
         nsamples (int): number of samples to draw
         girth (int):    Assumed girth of the graph. >=2. Unknown behavior if
                          this value is set to be larger than the graph girth.
+                         Computed with `get_girth` if 0
+        batch_size (int): number of samples drawn at a time
     returns:
         x (np.array):   binary string representing an approximate solution as +/-1
         exp (float):    Expected cut fraction over many samples
@@ -26,9 +85,9 @@ def thompson_parekh_marwaha(G, nsamples=1, girth=0):
 
     # Translate variables
     if girth == 0:
-        k = min(
-            [len(q) for q in nx.algorithms.minimum_cycle_basis(G)]
-        )  # This is expensive
+        k = get_girth(G)
+        if k == np.inf:
+            raise ValueError("G has no cycles")
     else:
         k = girth
 
@@ -85,22 +144,20 @@ def thompson_parekh_marwaha(G, nsamples=1, girth=0):
     alphas[1::] = betas[1::] / np.sqrt(d * (d - 1.0) ** np.arange(len(alphas) - 1))
     ###
 
-    V = np.zeros((n, n))
     """
+    V = np.zeros((n, n))
     for i in range(n):
       for j in range(n):
         dist = nx.shortest_path_length(G, source=i, target=j)
         if dist < k:
           V[i,j] = alphas[dist]
     """
-    # Replacement:
-    for i, dist_ in nx.shortest_path_length(G):
-        for j, dist in dist_.items():
-            if dist < k:
-                V[i, j] = alphas[dist]
+    # Replacement: only distances below k are needed, V is sparse
+    V = get_truncated_distance_matrix(G, alphas)
     ###
 
     # Normalized covariance matrix
+    """
     V = V / np.linalg.norm(V, axis=1)
     W = V.T.dot(V)
 
@@ -110,11 +167,25 @@ def thompson_parekh_marwaha(G, nsamples=1, girth=0):
         exp += 0.5 - 0.5 * W[e[0], e[1]]
         exp_round += np.arccos(W[e[0], e[1]])
     exp_round /= np.pi
+    """
+    # Replacement: V is symmetric, so dividing column j by the norm of row j
+    # scales the columns; W is only needed on the edges
+    norms = np.sqrt(np.asarray(V.multiply(V).sum(axis=1)).ravel())
+    V = V.dot(scipy.sparse.diags(1 / norms)).tocsc()
+    edges = np.array(G.edges, dtype=np.int64).reshape(-1, 2)
+    W_edges = np.asarray(
+        V[:, edges[:, 0]].multiply(V[:, edges[:, 1]]).sum(axis=0)
+    ).ravel()
+    exp_round = np.sum(np.arccos(np.clip(W_edges, -1, 1))) / np.pi
+    ###
 
-    # Sample from a Gaussian with covariance V
-    sample0 = np.random.normal(size=[n, nsamples])
-
-    soln = (1 - np.sign(V.dot(sample0)).T) / 2
+    # Sample from a Gaussian with covariance V, batch_size samples at a time
+    V = V.tocsr()
+    soln = np.empty((nsamples, n))
+    for start in range(0, nsamples, batch_size):
+        stop = min(start + batch_size, nsamples)
+        sample0 = np.random.normal(size=[n, stop - start])
+        soln[start:stop] = (1 - np.sign(V.dot(sample0)).T) / 2
     return soln, exp_round / m
 
 
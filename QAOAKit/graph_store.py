@@ -0,0 +1,165 @@
+# Graphs on few nodes encoded as uint64 bitmasks of the upper triangle
+# of their adjacency matrix. Bit k stands for the k-th node pair (u, v), u < v,
+# in row-major order, which is also the edge_id order of the graph files
+# in qaoa-dataset-version1.
+
+import numpy as np
+import networkx as nx
+from functools import lru_cache
+
+# n (n - 1) / 2 node pairs must fit in 64 bits
+MAX_BITMASK_NODES = 11
+
+
+@lru_cache(maxsize=None)
+def get_node_pairs(n):
+    """Node pairs (u, v), u < v, of n nodes in bit order"""
+    if n > MAX_BITMASK_NODES:
+        raise ValueError(
+            f"Bitmasks support graphs with at most {MAX_BITMASK_NODES} nodes"
+        )
+    u, v = np.triu_indices(n, 1)
+    u.setflags(write=False)
+    v.setflags(write=False)
+    return u, v
+
+
+def get_pair_index(n, u, v):
+    """Bit index of the node pair (u, v), u < v, of n nodes"""
+    return u * (2 * n - u - 1) // 2 + v - u - 1
+
+
+def edges_to_bitmask(n, edges):
+    """Encodes the edges (u, v) of a graph on n nodes as a uint64 bitmask"""
+    get_node_pairs(n)
+    bitmask = 0
+    for u, v in edges:
+        u, v = min(u, v), max(u, v)
+        bitmask |= 1 << int(get_pair_index(n, u, v))
+    return np.uint64(bitmask)
+
+
+def graph_to_bitmask(G):
+    """Encodes graph G with nodes 0,..,|V|-1 as a uint64 bitmask"""
+    return edges_to_bitmask(G.number_of_nodes(), G.edges())
+
+
+def bitmasks_to_edge_masks(bitmasks, n):
+    """Decodes bitmasks into a boolean array with a trailing axis
+    of length n (n - 1) / 2, set where the node pair (`get_node_pairs`) is an edge
+    """
+    u, _ = get_node_pairs(n)
+    shifts = np.arange(len(u), dtype=np.uint64)
+    bitmasks = np.asarray(bitmasks, dtype=np.uint64)[..., None]
+    return ((bitmasks >> shifts) & np.uint64(1)).astype(bool)
+
+
+def bitmasks_to_edges(bitmasks, n):
+    """Decodes an array of bitmasks into edge arrays
+
+    Returns
+    -------
+    edges : numpy.ndarray
+        (total number of edges, 2) edges of all graphs, in edge_id order per graph
+    offsets : numpy.ndarray
+        The edges of graph i are edges[offsets[i]:offsets[i + 1]]
+    """
+    u, v = get_node_pairs(n)
+    masks = bitmasks_to_edge_masks(np.ravel(bitmasks), n)
+    _, pairs = np.nonzero(masks)
+    offsets = np.zeros(len(masks) + 1, dtype=np.int64)
+    np.cumsum(masks.sum(axis=1), out=offsets[1:])
+    return np.stack([u[pairs], v[pairs]], axis=1), offsets
+
+
+def bitmasks_to_adjacency_matrices(bitmasks, n):
+    """Decodes an array of k bitmasks into (k, n, n) uint8 adjacency matrices"""
+    u, v = get_node_pairs(n)
+    masks = bitmasks_to_edge_masks(np.ravel(bitmasks), n)
+    w = np.zeros((len(masks), n, n), dtype=np.uint8)
+    w[:, u, v] = masks
+    w[:, v, u] = masks
+    return w
+
+
+def bitmask_to_edges(bitmask, n):
+    """Decodes a bitmask into an (|E|, 2) array of edges in edge_id order"""
+    return bitmasks_to_edges([bitmask], n)[0]
+
+
+def bitmask_to_graph(bitmask, n):
+    """Decodes a bitmask into a networkx.Graph
+    with the edge_id attributes set by `read_graph_from_file`
+    """
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+    G.add_edges_from(
+        (int(u), int(v), {"edge_id": i})
+        for i, (u, v) in enumerate(bitmask_to_edges(bitmask, n))
+    )
+    return G
+
+
+def get_edge_counts(bitmasks):
+    """Number of edges encoded in each bitmask of an array"""
+    bitmasks = np.ascontiguousarray(bitmasks, dtype=np.uint64)
+    bits = np.unpackbits(bitmasks.view(np.uint8).reshape(-1, 8), axis=1)
+    return bits.sum(axis=1).reshape(bitmasks.shape)
+
+
+def get_graph_view(bitmask, n):
+    """Decodes a bitmask into an immutable networkx.Graph (`networkx.freeze`)
+
+    Use networkx.Graph(view) to get a mutable copy
+    """
+    return nx.freeze(bitmask_to_graph(bitmask, n))
+
+
+class GraphStore:
+    """Graphs on n nodes stored as one uint64 bitmask per graph, indexed by graph_id
+
+    Attributes:
+        n (int): number of nodes of every graph
+        graph_ids (numpy.ndarray): sorted graph ids
+        bitmasks (numpy.ndarray): bitmasks[i] encodes the graph with id graph_ids[i]
+    """
+
+    def __init__(self, n, graph_ids, bitmasks):
+        get_node_pairs(n)
+        graph_ids = np.asarray(graph_ids, dtype=np.int64)
+        order = np.argsort(graph_ids, kind="stable")
+        self.n = n
+        self.graph_ids = graph_ids[order]
+        self.bitmasks = np.asarray(bitmasks, dtype=np.uint64)[order]
+        assert len(self.graph_ids) == len(self.bitmasks)
+
+    def __len__(self):
+        return len(self.graph_ids)
+
+    def __contains__(self, graph_id):
+        i = np.searchsorted(self.graph_ids, graph_id)
+        return i < len(self.graph_ids) and self.graph_ids[i] == graph_id
+
+    def get_positions(self, graph_ids):
+        """Positions of graph_ids in graph_ids and bitmasks, raises KeyError if missing"""
+        graph_ids = np.asarray(graph_ids)
+        positions = np.searchsorted(self.graph_ids, graph_ids)
+        positions = np.minimum(positions, len(self.graph_ids) - 1)
+        missing = self.graph_ids[positions] != graph_ids
+        if np.any(missing):
+            raise KeyError(np.asarray(graph_ids)[missing].tolist())
+        return positions
+
+    def get_bitmasks(self, graph_ids):
+        return self.bitmasks[self.get_positions(graph_ids)]
+
+    def get_edges(self, graph_ids):
+        """Edge arrays of graph_ids, see `bitmasks_to_edges`"""
+        return bitmasks_to_edges(self.get_bitmasks(graph_ids), self.n)
+
+    def get_adjacency_matrices(self, graph_ids):
+        return bitmasks_to_adjacency_matrices(self.get_bitmasks(graph_ids), self.n)
+
+    def get_graph(self, graph_id):
+        """Immutable view of the graph with graph_id, see `get_graph_view`"""
+        return get_graph_view(self.get_bitmasks(graph_id), self.n)
@@ -1,10 +1,20 @@
 import pickle
 import numpy as np
+import scipy.optimize
 from pathlib import Path
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.neighbors import KernelDensity
 from sklearn.model_selection import GridSearchCV
 
-from QAOAKit import get_full_qaoa_dataset_table
+from QAOAKit import get_full_qaoa_dataset_arrays
+from QAOAKit.graph_store import get_edge_counts
+from QAOAKit.simulators.statevector import (
+    get_maxcut_diagonal,
+    get_indexed_maxcut_diagonal,
+    get_qaoa_energy_and_gradient,
+    get_qaoa_energies,
+)
 
 parameter_optimization_folder = Path(__file__).parent
 
@@ -33,35 +43,17 @@ def train_kde(p, n, n_jobs=1, bandwidth_range=np.logspace(-2, 1, 20)):
     median, kde : tuple(np.array, sklearn.neighbors.KernelDensity)
         Tuple of median angles and fitted kernel density model
     """
-    df = get_full_qaoa_dataset_table().reset_index().set_index("graph_id")
-    df = df[(df["p_max"] == p) & (df["n"] == n)]
-    df["average degree"] = df.apply(
-        lambda row: 2 * row["G"].number_of_edges() / row["G"].number_of_nodes(),
-        axis=1
-    )
+    arrays = get_full_qaoa_dataset_arrays()
+    rows = (arrays["p_max"] == p) & (arrays["n"] == n)
+    average_degree = 2 * get_edge_counts(arrays["graph"][rows]) / n
+    beta = arrays["beta"][rows, :p]
+    gamma = arrays["gamma"][rows, :p]
 
     if p == 1:
-        data = df.apply(
-            lambda x: np.hstack(
-                [
-                    np.array(x["gamma"])
-                    / np.arctan(1 / np.sqrt(x["average degree"] - 1)),
-                    np.array(x["beta"]),
-                ]
-            ),
-            axis=1,
-        ).values
+        gamma = gamma / np.arctan(1 / np.sqrt(average_degree - 1))[:, None]
     else:
-        data = df.apply(
-            lambda x: np.hstack(
-                [
-                    np.array(x["gamma"]) * np.sqrt(x["average degree"]),
-                    np.array(x["beta"]),
-                ]
-            ),
-            axis=1,
-        ).values
-    data = np.stack(data)
+        gamma = gamma * np.sqrt(average_degree)[:, None]
+    data = np.hstack([gamma, beta])
     median = np.median(data, axis=0)
 
     print(f"Fitting a KDE model on data of shape {data.shape}")
@@ -114,6 +106,299 @@ def get_median_pre_trained_kde(p):
         )
 
 
+def maximize_energy(
+    energy_and_gradient,
+    x0,
+    method="lbfgs",
+    maxiter=200,
+    tol=1e-6,
+    learning_rate=0.05,
+    patience=10,
+):
+    """
+    Maximizes a QAOA energy given a function returning (energy, gradient)
+    Shared by `optimize_angles` and `optimize_fourier_angles`
+
+    Returns
+    -------
+    x, energy, initial_energy, nit, converged : tuple
+        Best parameters and their energy, energy at x0, number of iterations
+        and whether the stopping criterion was met before maxiter
+    """
+    x0 = np.asarray(x0, dtype=float)
+    initial_energy, grad = energy_and_gradient(x0)
+
+    if method == "lbfgs":
+        res = scipy.optimize.minimize(
+            lambda x: tuple(-y for y in energy_and_gradient(x)),
+            x0,
+            jac=True,
+            method="L-BFGS-B",
+            options={"maxiter": maxiter, "ftol": tol, "gtol": tol},
+        )
+        x, energy, nit, converged = res.x, -res.fun, res.nit, bool(res.success)
+    elif method == "adam":
+        x = x0
+        best_x, best_energy = x0, initial_energy
+        m, v = np.zeros_like(x0), np.zeros_like(x0)
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        stalled, converged = 0, False
+        for nit in range(1, maxiter + 1):
+            # gradient ascent on the energy
+            m = beta1 * m + (1 - beta1) * grad
+            v = beta2 * v + (1 - beta2) * grad**2
+            m_hat, v_hat = m / (1 - beta1**nit), v / (1 - beta2**nit)
+            x = x + learning_rate * m_hat / (np.sqrt(v_hat) + eps)
+            energy, grad = energy_and_gradient(x)
+            if energy > best_energy + tol:
+                stalled = 0
+            else:
+                stalled += 1
+            if energy > best_energy:
+                best_x, best_energy = x, energy
+            if stalled >= patience:
+                converged = True
+                break
+        x, energy = best_x, best_energy
+    else:
+        raise ValueError(f"Unknown optimization method {method}")
+    return x, float(energy), float(initial_energy), int(nit), converged
+
+
+def optimize_angles(
+    G,
+    beta,
+    gamma,
+    method="lbfgs",
+    maxiter=200,
+    tol=1e-6,
+    learning_rate=0.05,
+    patience=10,
+    n_threads=None,
+    diagonal=None,
+):
+    """
+    Refines QAOA angles by maximizing the MaxCut energy with the native simulator
+    Gradients are computed with the adjoint method (`get_qaoa_energy_and_gradient`)
+    qaoa format (`angles_to_qaoa_format`) used for beta, gamma
+
+    Parameters
+    ----------
+    G : networkx.Graph
+        Graph to solve MaxCut on, nodes labelled 0,..,|V|-1
+    beta, gamma : list-like
+        Warm-start angles, e.g. the output of any initialisation strategy
+    method : str
+        "lbfgs" for scipy L-BFGS-B or "adam"
+    maxiter : int
+        Maximal number of iterations
+    tol : float
+        L-BFGS-B: ftol and gtol; Adam: stop once the energy improved
+        by less than tol for patience consecutive steps
+    learning_rate : float
+        Adam step size
+    patience : int
+        Adam early stopping patience
+    n_threads : int
+        Number of simulator threads
+    diagonal : numpy.ndarray or IndexedDiagonal
+        Precomputed cut diagonal of G, computed if None
+
+    Returns
+    -------
+    res : dict
+        'beta', 'gamma': refined angles; 'energy', 'initial_energy': expected cuts;
+        'nfev', 'ngev': function and gradient evaluations; 'nit': iterations;
+        'converged': whether the stopping criterion was met before maxiter
+    """
+    assert len(beta) == len(gamma)
+    p = len(beta)
+    if diagonal is None:
+        diagonal = get_cut_diagonal(G, n_threads)
+    counts = {"nfev": 0, "ngev": 0}
+
+    def energy_and_gradient(x):
+        counts["nfev"] += 1
+        counts["ngev"] += 1
+        energy, grad_beta, grad_gamma = get_qaoa_energy_and_gradient(
+            diagonal, x[:p], x[p:], n_threads
+        )
+        return energy, np.hstack([grad_beta, grad_gamma])
+
+    x, energy, initial_energy, nit, converged = maximize_energy(
+        energy_and_gradient,
+        np.hstack([beta, gamma]),
+        method,
+        maxiter,
+        tol,
+        learning_rate,
+        patience,
+    )
+    return {
+        "beta": x[:p],
+        "gamma": x[p:],
+        "energy": energy,
+        "initial_energy": initial_energy,
+        "nfev": counts["nfev"],
+        "ngev": counts["ngev"],
+        "nit": nit,
+        "converged": converged,
+    }
+
+
+def get_cut_diagonal(G, n_threads=None):
+    """Phase-table diagonal of G if its weights allow it, dense diagonal otherwise"""
+    diagonal = get_indexed_maxcut_diagonal(G, n_threads)
+    if diagonal is None:
+        diagonal = get_maxcut_diagonal(G, n_threads)
+    return diagonal
+
+
+def get_fourier_basis(p, q):
+    """
+    FOURIER[q] reparameterisation of Zhou et al. https://arxiv.org/abs/1812.01041
+
+    gamma_i = sum_k u_k sin((k - 1/2)(i - 1/2) pi / p)
+    beta_i = sum_k v_k cos((k - 1/2)(i - 1/2) pi / p)
+    for i = 1..p and k = 1..q
+
+    Returns
+    -------
+    sin_basis, cos_basis : tuple(np.array, np.array)
+        (p, q) matrices with gamma = sin_basis @ u and beta = cos_basis @ v
+    """
+    phase = np.outer(np.arange(p) + 0.5, np.arange(q) + 0.5) * np.pi / p
+    return np.sin(phase), np.cos(phase)
+
+
+def fourier_to_angles(u, v, p):
+    """Returns beta, gamma at level p for the FOURIER amplitudes u, v"""
+    sin_basis, cos_basis = get_fourier_basis(p, len(u))
+    return cos_basis @ np.asarray(v), sin_basis @ np.asarray(u)
+
+
+def angles_to_fourier(beta, gamma, q):
+    """Least-squares FOURIER[q] amplitudes u, v for angles beta, gamma; exact for q >= p"""
+    p = len(beta)
+    sin_basis, cos_basis = get_fourier_basis(p, min(q, p))
+    u = np.linalg.lstsq(sin_basis, np.asarray(gamma), rcond=None)[0]
+    v = np.linalg.lstsq(cos_basis, np.asarray(beta), rcond=None)[0]
+    return u, v
+
+
+def optimize_fourier_angles(
+    G,
+    u,
+    v,
+    p,
+    method="lbfgs",
+    maxiter=200,
+    tol=1e-6,
+    learning_rate=0.05,
+    patience=10,
+    n_threads=None,
+    diagonal=None,
+):
+    """
+    Refines the FOURIER[q] amplitudes u, v (q = len(u)) of the angles at level p
+    Angle gradients from `get_qaoa_energy_and_gradient` are mapped to the
+    amplitudes with the transposed basis; see `optimize_angles` for the parameters
+
+    Returns
+    -------
+    res : dict
+        As `optimize_angles` with additionally the refined amplitudes 'u' and 'v'
+    """
+    assert len(u) == len(v)
+    q = len(u)
+    sin_basis, cos_basis = get_fourier_basis(p, q)
+    if diagonal is None:
+        diagonal = get_cut_diagonal(G, n_threads)
+    counts = {"nfev": 0, "ngev": 0}
+
+    def energy_and_gradient(x):
+        counts["nfev"] += 1
+        counts["ngev"] += 1
+        energy, grad_beta, grad_gamma = get_qaoa_energy_and_gradient(
+            diagonal, cos_basis @ x[q:], sin_basis @ x[:q], n_threads
+        )
+        return energy, np.hstack([sin_basis.T @ grad_gamma, cos_basis.T @ grad_beta])
+
+    x, energy, initial_energy, nit, converged = maximize_energy(
+        energy_and_gradient,
+        np.hstack([u, v]),
+        method,
+        maxiter,
+        tol,
+        learning_rate,
+        patience,
+    )
+    return {
+        "beta": cos_basis @ x[q:],
+        "gamma": sin_basis @ x[:q],
+        "u": x[:q],
+        "v": x[q:],
+        "energy": energy,
+        "initial_energy": initial_energy,
+        "nfev": counts["nfev"],
+        "ngev": counts["ngev"],
+        "nit": nit,
+        "converged": converged,
+    }
+
+
+@lru_cache(maxsize=None)
+def get_process_pool(n_workers):
+    """Process pool shared by all `multistart_optimize` calls with n_workers"""
+    return ProcessPoolExecutor(max_workers=n_workers)
+
+
+def multistart_optimize(G, betas, gammas, top_m=4, n_workers=1, **optimizer_options):
+    """
+    Best-of-K angle search: scores K candidate angle sets in one batched pass
+    (`get_qaoa_energies`) and refines the top_m of them with `optimize_angles`
+    qaoa format (`angles_to_qaoa_format`) used for betas, gammas
+
+    Parameters
+    ----------
+    G : networkx.Graph
+        Graph to solve MaxCut on, nodes labelled 0,..,|V|-1
+    betas, gammas : array-like
+        Candidate angles of shape (K, p), e.g. samples of a KDE
+    top_m : int
+        Number of best-scoring candidates that are optimized
+    n_workers : int
+        Number of processes the local optimizations are spread over;
+        1 runs them in this process. Each worker simulates with one thread
+    optimizer_options :
+        Passed to `optimize_angles` (method, maxiter, tol, ...)
+
+    Returns
+    -------
+    best, results, scores : tuple(dict, list, np.array)
+        The best refined result, all top_m refined results sorted by decreasing
+        energy and the energies of all K candidates before optimization
+    """
+    betas, gammas = np.atleast_2d(betas), np.atleast_2d(gammas)
+    diagonal = get_cut_diagonal(G)
+    scores = get_qaoa_energies(diagonal, betas, gammas)
+    top = np.argsort(-scores, kind="stable")[:top_m]
+    if n_workers == 1 or len(top) == 1:
+        results = [
+            optimize_angles(G, betas[i], gammas[i], diagonal=diagonal, **optimizer_options)
+            for i in top
+        ]
+    else:
+        pool = get_process_pool(n_workers)
+        futures = [
+            pool.submit(optimize_angles, G, betas[i], gammas[i], n_threads=1, **optimizer_options)
+            for i in top
+        ]
+        results = [f.result() for f in futures]
+    results.sort(key=lambda res: -res["energy"])
+    return results[0], results, scores
+
+
 # Main function
 def main():
     n = 8  # Number of nodes
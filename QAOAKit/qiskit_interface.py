@@ -1,10 +1,10 @@
 import numpy as np
 import networkx as nx
 from qiskit_optimization import QuadraticProgram
-from qiskit_optimization.algorithms import GoemansWilliamsonOptimizer
 from qiskit.circuit.library import QAOAAnsatz
 
 from .utils import get_adjacency_matrix
+from .classical.goemans_williamson import sample_goemans_williamson_cuts
 
 
 def get_maxcut_quadratic_problem(G):
@@ -12,22 +12,23 @@ def get_maxcut_quadratic_problem(G):
     Construct Qiskit QuadraticProgram for MaxCut on graph G
     """
     n_qubits = G.number_of_nodes()
+    w = get_adjacency_matrix(G)
     problem = QuadraticProgram()
     _ = [problem.binary_var("x{}".format(i)) for i in range(n_qubits)]
     problem.maximize(
-        linear=get_adjacency_matrix(G).dot(np.ones(n_qubits)),
-        quadratic=-get_adjacency_matrix(G),
+        linear=w.dot(np.ones(n_qubits)),
+        quadratic=-w,
     )
     return problem
 
 
 def goemans_williamson(G, nsamples):
     """
-    Get GoemansWilliamson solutions using qiskit implementation
+    Get GoemansWilliamson solutions
+    The SDP is solved once per canonical graph and cached (`sdp_embedding_cache`),
+    further calls only draw new random hyperplanes
     """
-    problem = get_maxcut_quadratic_problem(G)
-    algorithm = GoemansWilliamsonOptimizer(num_cuts=nsamples, unique_cuts=False)
-    return [z.x for z in algorithm.solve(problem).samples]
+    return [x for cuts, _ in sample_goemans_williamson_cuts(G, nsamples) for x in cuts]
 
 
 def get_maxcut_qaoa_qiskit_circuit(G, p, qiskit_angles):
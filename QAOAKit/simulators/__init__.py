@@ -0,0 +1,15 @@
+from .symmetric import (
+    get_symmetric_structure,
+    symmetric_qaoa_maxcut_energy,
+    qaoa_maxcut_energy_symmetric,
+)
+from .mps import MatrixProductState, qaoa_maxcut_energy_mps
+from .statevector import (
+    get_maxcut_diagonal,
+    get_indexed_maxcut_diagonal,
+    get_qaoa_statevector,
+    get_expectation,
+    qaoa_maxcut_energy_statevector,
+    get_qaoa_energies,
+)
+from .analytic import qaoa_maxcut_energy_p1
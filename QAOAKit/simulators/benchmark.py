@@ -0,0 +1,142 @@
+# Benchmarks for the native statevector simulator
+#
+# Usage: python -m QAOAKit.simulators.benchmark
+
+import time
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from QAOAKit.graph_store import bitmask_to_graph
+from QAOAKit.utils import (
+    get_full_qaoa_dataset_arrays,
+    beta_to_qaoa_format,
+    gamma_to_qaoa_format,
+)
+from .statevector import (
+    get_maxcut_diagonal,
+    get_qaoa_statevector,
+    get_expectation,
+    qaoa_maxcut_energy_statevector,
+)
+
+
+def benchmark_threads(
+    n_range=range(22, 29, 2), thread_counts=(1, 2, 4, 8, 16), p=1, repeats=3, seed=0
+):
+    """Times one QAOA energy evaluation on random 3-regular graphs
+
+    Parameters
+    ----------
+    n_range : list-like
+        Numbers of qubits to benchmark; must be even
+    thread_counts : list-like
+        Numbers of threads to benchmark
+    p : int
+        Number of QAOA layers
+    repeats : int
+        The best of repeats runs is reported
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        Columns n, threads, seconds and speedup relative to the first thread count
+    """
+    rows = []
+    for n in n_range:
+        G = nx.random_regular_graph(3, n, seed=seed)
+        diagonal = get_maxcut_diagonal(G)
+        for n_threads in thread_counts:
+            seconds = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                state = get_qaoa_statevector(
+                    diagonal, [0.3] * p, [0.2] * p, n_threads=n_threads
+                )
+                get_expectation(state, diagonal, n_threads=n_threads)
+                seconds = min(seconds, time.perf_counter() - start)
+                del state
+            rows.append({"n": n, "threads": n_threads, "seconds": seconds})
+        del diagonal
+    df = pd.DataFrame(rows)
+    df["speedup"] = df.groupby("n")["seconds"].transform(lambda x: x.iloc[0] / x)
+    return df
+
+
+def get_atlas_instances(max_n=7, p_range=(1, 2, 3), seed=0):
+    """Yields (G, beta, gamma) for all connected graphs on 3..max_n nodes
+    from the networkx graph atlas (max_n <= 7) with random angles in qaoa format
+    """
+    rng = np.random.default_rng(seed)
+    for G in nx.graph_atlas_g():
+        if G.number_of_nodes() < 3 or G.number_of_nodes() > max_n:
+            continue
+        if not nx.is_connected(G):
+            continue
+        for p in p_range:
+            yield G, rng.uniform(-np.pi / 4, np.pi / 4, p), rng.uniform(
+                -np.pi, np.pi, p
+            )
+
+
+def get_dataset_instances(p_range=(1, 2, 3)):
+    """Yields (G, beta, gamma) for every row of the full_qaoa_dataset_table
+    with optimal angles converted to qaoa format
+    """
+    arrays = get_full_qaoa_dataset_arrays()
+    for row in np.flatnonzero(np.isin(arrays["p_max"], p_range)):
+        p = arrays["p_max"][row]
+        G = bitmask_to_graph(arrays["graph"][row], arrays["n"][row])
+        yield G, beta_to_qaoa_format(arrays["beta"][row, :p]), gamma_to_qaoa_format(
+            arrays["gamma"][row, :p]
+        )
+
+
+def compare_precision(instances):
+    """Compares "single" against "double" precision energies
+
+    Parameters
+    ----------
+    instances : iterable
+        (G, beta, gamma) tuples, e.g. from get_dataset_instances
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        Columns n, p, double, single, abs_error and rel_error
+    """
+    rows = []
+    for G, beta, gamma in instances:
+        double = qaoa_maxcut_energy_statevector(G, beta, gamma, n_threads=1)
+        single = qaoa_maxcut_energy_statevector(
+            G, beta, gamma, n_threads=1, precision="single"
+        )
+        rows.append(
+            {
+                "n": G.number_of_nodes(),
+                "p": len(beta),
+                "double": double,
+                "single": single,
+            }
+        )
+    df = pd.DataFrame(rows)
+    df["abs_error"] = (df["single"] - df["double"]).abs()
+    df["rel_error"] = df["abs_error"] / df["double"].abs()
+    return df
+
+
+def main():
+    df = benchmark_threads()
+    print(df.to_string(index=False, float_format="{:.3f}".format))
+
+    try:
+        instances = list(get_dataset_instances())
+    except FileNotFoundError:
+        print("Lookup tables not found, comparing precision on the graph atlas")
+        instances = get_atlas_instances()
+    df = compare_precision(instances)
+    print(df.groupby("p")[["abs_error", "rel_error"]].agg(["mean", "max"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# Matrix-product-state simulator for shallow MaxCut QAOA on sparse graphs
+
+import numpy as np
+import networkx as nx
+import scipy.sparse
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+PAULI_Z = np.diag([1.0, -1.0])
+SWAP = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]], dtype=complex)
+
+
+def get_zz_gate(theta):
+    """exp(-i theta Z Z) as a 4x4 matrix on two adjacent sites"""
+    return np.diag(np.exp(-1j * theta * np.array([1, -1, -1, 1])))
+
+
+def get_x_gate(beta):
+    """exp(-i beta X) as a 2x2 matrix"""
+    return np.array(
+        [[np.cos(beta), -1j * np.sin(beta)], [-1j * np.sin(beta), np.cos(beta)]]
+    )
+
+
+class MatrixProductState:
+    """Open-boundary MPS on n qubits with a movable orthogonality center
+
+    Qubits are placed on sites according to `order`; two-qubit gates between
+    qubits that are not on adjacent sites are routed with SWAP gates.
+
+    Attributes:
+        tensors (list): site tensors of shape (left bond, 2, right bond)
+        site_of (numpy.ndarray): site_of[qubit] is the site holding qubit
+        qubit_at (numpy.ndarray): qubit_at[site] is the qubit held at site
+        center (int): site of the orthogonality center
+        max_bond_dim (int): maximal bond dimension kept after each SVD
+        cutoff (float): maximal discarded weight per SVD
+        truncation_error (float): accumulated discarded weight over all SVDs
+        max_bond_dim_reached (int): largest bond dimension seen so far
+    """
+
+    def __init__(self, n, order=None, max_bond_dim=64, cutoff=1e-10):
+        plus = np.full((1, 2, 1), 1 / np.sqrt(2), dtype=complex)
+        self.tensors = [plus.copy() for _ in range(n)]
+        if order is None:
+            order = np.arange(n)
+        self.qubit_at = np.array(order)
+        self.site_of = np.argsort(self.qubit_at)
+        self.center = 0
+        self.max_bond_dim = max_bond_dim
+        self.cutoff = cutoff
+        self.truncation_error = 0.0
+        self.max_bond_dim_reached = 1
+
+    def move_center(self, site):
+        """Moves the orthogonality center to site with QR decompositions"""
+        while self.center < site:
+            c = self.center
+            dl, d, dr = self.tensors[c].shape
+            q, r = np.linalg.qr(self.tensors[c].reshape(dl * d, dr))
+            self.tensors[c] = q.reshape(dl, d, -1)
+            self.tensors[c + 1] = np.tensordot(r, self.tensors[c + 1], axes=1)
+            self.center += 1
+        while self.center > site:
+            c = self.center
+            dl, d, dr = self.tensors[c].shape
+            q, r = np.linalg.qr(self.tensors[c].reshape(dl, d * dr).T)
+            self.tensors[c] = q.T.reshape(-1, d, dr)
+            self.tensors[c - 1] = np.tensordot(self.tensors[c - 1], r.T, axes=1)
+            self.center -= 1
+
+    def apply_single_site(self, site, gate):
+        """Applies a 2x2 unitary to site; canonical form is preserved"""
+        self.tensors[site] = np.einsum("st,atb->asb", gate, self.tensors[site])
+
+    def apply_two_site(self, site, gate, move_right=True):
+        """Applies a 4x4 gate to sites (site, site + 1) and truncates with an SVD
+
+        The orthogonality center ends up on site + 1 if move_right else on site.
+        """
+        if self.center < site:
+            self.move_center(site)
+        elif self.center > site + 1:
+            self.move_center(site + 1)
+        left, right = self.tensors[site], self.tensors[site + 1]
+        dl, dr = left.shape[0], right.shape[2]
+        theta = np.tensordot(left, right, axes=1)
+        theta = np.einsum("ijkl,aklb->aijb", gate.reshape(2, 2, 2, 2), theta)
+        u, s, vh = np.linalg.svd(theta.reshape(dl * 2, 2 * dr), full_matrices=False)
+
+        weights = s**2
+        norm = weights.sum()
+        # discarded[k] is the relative weight dropped when keeping k singular values
+        discarded = (norm - np.cumsum(weights)) / norm
+        chi = int(np.argmax(discarded <= self.cutoff)) + 1
+        chi = min(chi, self.max_bond_dim)
+        self.truncation_error += max(discarded[chi - 1], 0.0)
+        self.max_bond_dim_reached = max(self.max_bond_dim_reached, chi)
+
+        u, s, vh = u[:, :chi], s[:chi] / np.sqrt(weights[:chi].sum()), vh[:chi]
+        if move_right:
+            self.tensors[site] = u.reshape(dl, 2, chi)
+            self.tensors[site + 1] = (s[:, None] * vh).reshape(chi, 2, dr)
+            self.center = site + 1
+        else:
+            self.tensors[site] = (u * s).reshape(dl, 2, chi)
+            self.tensors[site + 1] = vh.reshape(chi, 2, dr)
+            self.center = site
+
+    def apply_zz(self, qubit_1, qubit_2, theta):
+        """Applies exp(-i theta Z Z) to two qubits, routing them through SWAPs
+
+        The qubit on the left site is swapped rightwards until it is adjacent to
+        the other and swapped back after the ZZ gate, so the ordering is preserved.
+        """
+        i, j = sorted([self.site_of[qubit_1], self.site_of[qubit_2]])
+        for site in range(i, j - 1):
+            self.apply_two_site(site, SWAP, move_right=True)
+        self.apply_two_site(j - 1, get_zz_gate(theta), move_right=False)
+        for site in range(j - 2, i - 1, -1):
+            self.apply_two_site(site, SWAP, move_right=False)
+
+    def expectation_zz(self, edges):
+        """Returns <Z_u Z_v> for each (u, v) in edges"""
+        n = len(self.tensors)
+        left_envs = [np.ones((1, 1))]
+        for a in self.tensors:
+            left_envs.append(np.einsum("ab,asc,bsd->cd", left_envs[-1], a.conj(), a))
+        right_envs = [np.ones((1, 1))]
+        for a in reversed(self.tensors):
+            right_envs.append(np.einsum("asc,bsd,cd->ab", a.conj(), a, right_envs[-1]))
+        right_envs = right_envs[::-1]
+        norm = left_envs[n][0, 0].real
+
+        res = []
+        for u, v in edges:
+            i, j = sorted([self.site_of[u], self.site_of[v]])
+            env = left_envs[i]
+            for site in range(i, j + 1):
+                a = self.tensors[site]
+                if site == i or site == j:
+                    env = np.einsum("ab,asc,st,btd->cd", env, a.conj(), PAULI_Z, a)
+                else:
+                    env = np.einsum("ab,asc,bsd->cd", env, a.conj(), a)
+            res.append(np.sum(env * right_envs[j + 1]).real / norm)
+        return np.array(res)
+
+
+def get_mps_qubit_order(G):
+    """Reverse Cuthill-McKee ordering of the nodes of G
+
+    Reduces the bandwidth of the adjacency matrix, so edges connect
+    nearby sites and need few SWAPs
+    """
+    w = nx.to_scipy_sparse_array(G, nodelist=range(G.number_of_nodes()))
+    return reverse_cuthill_mckee(scipy.sparse.csr_matrix(w), symmetric_mode=True)
+
+
+def qaoa_maxcut_energy_mps(
+    G, beta, gamma, max_bond_dim=64, cutoff=1e-10, return_truncation_error=False
+):
+    """Computes approximate MaxCut QAOA energy for graph G with an MPS
+    qaoa format (`angles_to_qaoa_format`) used for beta, gamma
+
+    Parameters
+    ----------
+    G : networkx.Graph
+        Graph to solve MaxCut on, nodes labelled 0,..,|V|-1
+    beta : list-like
+        QAOA parameter beta
+    gamma : list-like
+        QAOA parameter gamma
+    max_bond_dim : int, default 64
+        Bond dimension cap applied after every two-site gate
+    cutoff : float, default 1e-10
+        Maximal relative weight of singular values discarded by every SVD
+    return_truncation_error : bool, default False
+        Also return the accumulated discarded weight and the largest bond dimension
+
+    Returns
+    -------
+    energy : float
+        Expected cut value
+    info : dict
+        Only if return_truncation_error;
+        {'truncation_error': float, 'max_bond_dim': int}
+        The energy is exact if truncation_error is 0
+    """
+    assert len(beta) == len(gamma)
+    edges = [(u, v, d.get("weight", 1)) for u, v, d in G.edges(data=True)]
+    mps = MatrixProductState(
+        G.number_of_nodes(),
+        order=get_mps_qubit_order(G),
+        max_bond_dim=max_bond_dim,
+        cutoff=cutoff,
+    )
+    # ZZ terms commute, so apply them in order of their leftmost site
+    edges.sort(key=lambda e: sorted([mps.site_of[e[0]], mps.site_of[e[1]]]))
+    for b, g in zip(beta, gamma):
+        for u, v, w in edges:
+            mps.apply_zz(u, v, g * w)
+        x_gate = get_x_gate(b)
+        for site in range(G.number_of_nodes()):
+            mps.apply_single_site(site, x_gate)
+
+    weights = np.array([w for _, _, w in edges])
+    zz = mps.expectation_zz([(u, v) for u, v, _ in edges])
+    energy = float(np.sum(weights * (1 - zz) / 2))
+    if return_truncation_error:
+        return energy, {
+            "truncation_error": float(mps.truncation_error),
+            "max_bond_dim": mps.max_bond_dim_reached,
+        }
+    return energy
@@ -0,0 +1,470 @@
+# Native NumPy statevector simulator for MaxCut QAOA
+#
+# Amplitude arrays are processed in cache-sized chunks on a thread pool;
+# NumPy releases the GIL inside element-wise ufuncs, so chunks run concurrently.
+
+import os
+import math
+import numpy as np
+from fractions import Fraction
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+# Chunks of 2**14 complex128 amplitudes (256 KiB) fit in L2 cache
+DEFAULT_CHUNK_BITS = 14
+
+# precision -> (dtype of the cut diagonal, dtype of the statevector)
+# "single" halves the memory traffic on 2**n-sized arrays. Over all 2982
+# (graph, p) pairs of connected graphs with 3 <= n <= 7 at p = 1..3 and random
+# angles its energies differ from "double" by 2.8e-7 relative on average and
+# 1.4e-6 at most (benchmark.compare_precision; rerun on the lookup tables
+# with benchmark.get_dataset_instances)
+PRECISIONS = {
+    "double": (np.float64, np.complex128),
+    "single": (np.float32, np.complex64),
+}
+
+
+def get_default_n_threads():
+    """Number of threads used when n_threads is None;
+    set QAOAKIT_NUM_THREADS to override the CPU count
+    """
+    return int(os.environ.get("QAOAKIT_NUM_THREADS", os.cpu_count() or 1))
+
+
+@lru_cache(maxsize=None)
+def get_executor(n_threads):
+    return ThreadPoolExecutor(max_workers=n_threads)
+
+
+def parallel_for(fn, n_items, n_threads):
+    """Calls fn(start, stop) on n_threads contiguous blocks of range(n_items)
+    and returns the list of results
+    """
+    n_threads = max(1, min(n_threads, n_items))
+    if n_threads == 1:
+        return [fn(0, n_items)]
+    bounds = np.linspace(0, n_items, n_threads + 1).astype(int)
+    futures = [
+        get_executor(n_threads).submit(fn, start, stop)
+        for start, stop in zip(bounds[:-1], bounds[1:])
+    ]
+    return [f.result() for f in futures]
+
+
+def get_edge_list(G):
+    """Returns (edges, weights) of G as an (E, 2) int array and an (E,) float array"""
+    edges = np.array([(u, v) for u, v in G.edges()], dtype=np.int64).reshape(-1, 2)
+    weights = np.array([d.get("weight", 1) for _, _, d in G.edges(data=True)])
+    return edges, weights.astype(float)
+
+
+def get_maxcut_diagonal(
+    G, n_threads=None, chunk_bits=DEFAULT_CHUNK_BITS, precision="double"
+):
+    """Computes the cut value of every basis state
+
+    Bit q of the basis state index is the value of qubit q (Qiskit ordering),
+    so the result matches `precompute_energies` with `maxcut_obj`.
+
+    Parameters
+    ----------
+    G : networkx.Graph
+        Graph to solve MaxCut on, nodes labelled 0,..,|V|-1
+    n_threads : int, default None
+        Number of threads, see `get_default_n_threads`
+    chunk_bits : int, default DEFAULT_CHUNK_BITS
+        log2 of the number of entries processed per chunk
+    precision : str, default "double"
+        "double" returns float64 values, "single" float32, see PRECISIONS
+
+    Returns
+    -------
+    diagonal : numpy.ndarray
+        Array of shape (2**n,) with the cut values
+    """
+    if n_threads is None:
+        n_threads = get_default_n_threads()
+    dtype, _ = PRECISIONS[precision]
+    n = G.number_of_nodes()
+    edges, weights = get_edge_list(G)
+    weights = weights.astype(dtype)
+    diagonal = np.zeros(2**n, dtype=dtype)
+    chunk_size = 2 ** min(chunk_bits, n)
+    index_dtype = np.uint32 if n <= 32 else np.uint64
+
+    def fill(start, stop):
+        for chunk in range(start, stop):
+            offset = chunk * chunk_size
+            index = np.arange(offset, offset + chunk_size, dtype=index_dtype)
+            out = diagonal[offset : offset + chunk_size]
+            for (u, v), w in zip(edges, weights):
+                out += w * (((index >> u) ^ (index >> v)) & 1)
+
+    parallel_for(fill, 2**n // chunk_size, n_threads)
+    return diagonal
+
+
+class IndexedDiagonal:
+    """Cost diagonal with few distinct values stored as values[index]
+
+    Attributes:
+        index (numpy.ndarray): uint8 or uint16 array of shape (2**n,)
+        values (numpy.ndarray): the distinct diagonal values; the phase table of
+            a layer is exp(2 i gamma values), so each layer gathers from a table
+            of len(values) entries instead of evaluating 2**n exponentials
+    """
+
+    def __init__(self, index, values):
+        self.index = index
+        self.values = values
+
+    @property
+    def shape(self):
+        return self.index.shape
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    def __getitem__(self, key):
+        return self.values[self.index[key]]
+
+
+def get_integer_weights(weights, max_denominator=1000):
+    """Writes weights as integer multiples of a common unit
+
+    Returns
+    -------
+    integer_weights, unit : tuple(numpy.ndarray, float) or None
+        None if some weight is not a multiple of 1/max_denominator
+        up to floating point error
+    """
+    fractions = [Fraction(w).limit_denominator(max_denominator) for w in weights]
+    if not np.allclose([float(f) for f in fractions], weights, rtol=1e-12, atol=0):
+        return None
+    denominator = math.lcm(*(f.denominator for f in fractions))
+    numerators = [int(f * denominator) for f in fractions]
+    divisor = math.gcd(*numerators) or 1
+    integer_weights = np.array([x // divisor for x in numerators], dtype=np.int64)
+    return integer_weights, divisor / denominator
+
+
+def get_indexed_maxcut_diagonal(
+    G, n_threads=None, chunk_bits=DEFAULT_CHUNK_BITS, precision="double"
+):
+    """Computes the cut diagonal of G as an IndexedDiagonal
+
+    Applies when all weights are integer multiples of a common unit
+    (e.g. unweighted or integer-weighted graphs) and the cut takes at most
+    2**16 values, so that the index fits in 1 or 2 bytes per amplitude.
+    Parameters are the same as for `get_maxcut_diagonal`.
+
+    Returns
+    -------
+    diagonal : IndexedDiagonal or None
+        None if the weights do not allow a compact index
+    """
+    if n_threads is None:
+        n_threads = get_default_n_threads()
+    dtype, _ = PRECISIONS[precision]
+    n = G.number_of_nodes()
+    edges, weights = get_edge_list(G)
+    integer_weights = get_integer_weights(weights)
+    if integer_weights is None:
+        return None
+    integer_weights, unit = integer_weights
+    lowest = int(integer_weights[integer_weights < 0].sum())
+    n_values = int(np.abs(integer_weights).sum()) + 1
+    if n_values <= 2**8:
+        index_dtype = np.uint8
+    elif n_values <= 2**16:
+        index_dtype = np.uint16
+    else:
+        return None
+
+    index = np.empty(2**n, dtype=index_dtype)
+    chunk_size = 2 ** min(chunk_bits, n)
+    state_dtype = np.uint32 if n <= 32 else np.uint64
+
+    def fill(start, stop):
+        for chunk in range(start, stop):
+            offset = chunk * chunk_size
+            states = np.arange(offset, offset + chunk_size, dtype=state_dtype)
+            cut = np.full(chunk_size, -lowest, dtype=np.int32)
+            for (u, v), w in zip(edges, integer_weights):
+                cut += int(w) * (((states >> u) ^ (states >> v)) & 1).astype(np.int32)
+            index[offset : offset + chunk_size] = cut
+
+    parallel_for(fill, 2**n // chunk_size, n_threads)
+    values = (unit * (lowest + np.arange(n_values))).astype(dtype)
+    return IndexedDiagonal(index, values)
+
+
+def apply_rotation(a0, a1, c, s):
+    """In place: (a0, a1) <- (c a0 - i s a1, -i s a0 + c a1)"""
+    t = a1 * (-1j * s)
+    a1 *= c
+    a1 += a0 * (-1j * s)
+    a0 *= c
+    a0 += t
+
+
+def apply_qaoa_layer(
+    state, diagonal, beta, gamma, n_threads, chunk_bits, cost=True, mixer=True
+):
+    """Applies exp(-i beta B) exp(-i gamma sum w ZZ) to state in place
+
+    exp(-i gamma sum w ZZ) equals exp(2 i gamma C) up to a global phase.
+    The phase and the mixer on the low qubits act within a chunk and are
+    applied chunk by chunk while it is in cache; mixers on the high qubits
+    pair up amplitudes in different chunks and are applied in a second pass.
+    cost=False or mixer=False skips the corresponding operator.
+    """
+    n = int(np.log2(state.shape[0]))
+    chunk_bits = min(chunk_bits, n)
+    chunk_size = 2**chunk_bits
+    n_chunks = 2 ** (n - chunk_bits)
+    # Python scalars keep complex64 arrays in single precision
+    c, s = float(np.cos(beta)), float(np.sin(beta))
+    phase = complex(2j * gamma)
+    if isinstance(diagonal, IndexedDiagonal):
+        phase_table = np.exp(phase * diagonal.values).astype(state.dtype)
+
+    def low_qubits(start, stop):
+        for chunk in range(start, stop):
+            offset = chunk * chunk_size
+            amplitudes = state[offset : offset + chunk_size]
+            if not cost:
+                pass
+            elif isinstance(diagonal, IndexedDiagonal):
+                index = diagonal.index[offset : offset + chunk_size]
+                amplitudes *= phase_table[index]
+            else:
+                amplitudes *= np.exp(phase * diagonal[offset : offset + chunk_size])
+            if not mixer:
+                continue
+            for q in range(chunk_bits):
+                view = amplitudes.reshape(-1, 2, 2**q)
+                apply_rotation(view[:, 0, :], view[:, 1, :], c, s)
+
+    parallel_for(low_qubits, n_chunks, n_threads)
+
+    if not mixer:
+        return
+    for q in range(chunk_bits, n):
+        # view[h, bit q, j] is a chunk of amplitudes paired with view[h, 1 - bit q, j]
+        view = state.reshape(-1, 2, 2 ** (q - chunk_bits), chunk_size)
+
+        def high_qubit(start, stop, view=view):
+            for task in range(start, stop):
+                h, j = divmod(task, view.shape[2])
+                apply_rotation(view[h, 0, j], view[h, 1, j], c, s)
+
+        parallel_for(high_qubit, view.shape[0] * view.shape[2], n_threads)
+
+
+def get_expectation(state, diagonal, n_threads=None, chunk_bits=DEFAULT_CHUNK_BITS):
+    """Returns sum_x diagonal[x] |state[x]|^2
+
+    Each chunk is reduced with NumPy's pairwise summation in the dtype of state
+    and the chunk sums are added exactly with math.fsum, so the accumulated
+    rounding error grows as O(log(chunk size)) and not with 2**n.
+    """
+    if n_threads is None:
+        n_threads = get_default_n_threads()
+    chunk_size = 2 ** min(chunk_bits, int(np.log2(state.shape[0])))
+
+    def partial_sum(start, stop):
+        sums = []
+        for chunk in range(start, stop):
+            amplitudes = state[chunk * chunk_size : (chunk + 1) * chunk_size]
+            probabilities = amplitudes.real**2 + amplitudes.imag**2
+            if isinstance(diagonal, IndexedDiagonal):
+                index = diagonal.index[chunk * chunk_size : (chunk + 1) * chunk_size]
+                counts = np.bincount(
+                    index, weights=probabilities, minlength=len(diagonal.values)
+                )
+                sums.append(float(np.dot(counts, diagonal.values)))
+                continue
+            probabilities *= diagonal[chunk * chunk_size : (chunk + 1) * chunk_size]
+            sums.append(float(np.sum(probabilities)))
+        return sums
+
+    chunk_sums = parallel_for(partial_sum, state.shape[0] // chunk_size, n_threads)
+    return math.fsum(x for sums in chunk_sums for x in sums)
+
+
+def get_qaoa_statevector(
+    diagonal, beta, gamma, n_threads=None, chunk_bits=DEFAULT_CHUNK_BITS
+):
+    """Simulates MaxCut QAOA for a cost diagonal returned by `get_maxcut_diagonal`
+    or `get_indexed_maxcut_diagonal`
+    qaoa format (`angles_to_qaoa_format`) used for beta, gamma
+    The statevector is complex64 for a float32 diagonal, complex128 otherwise
+
+    Returns
+    -------
+    state : numpy.ndarray
+        QAOA statevector, Qiskit qubit ordering
+    """
+    assert len(beta) == len(gamma)
+    if n_threads is None:
+        n_threads = get_default_n_threads()
+    dtype = np.complex64 if diagonal.dtype == np.float32 else np.complex128
+    state = np.full(diagonal.shape[0], 1 / np.sqrt(diagonal.shape[0]), dtype=dtype)
+    for b, g in zip(beta, gamma):
+        apply_qaoa_layer(state, diagonal, b, g, n_threads, chunk_bits)
+    return state
+
+
+def get_mixer_matrix_element(bra, ket):
+    """Returns <bra| sum_q X_q |ket>"""
+    n = int(np.log2(ket.shape[0]))
+    res = 0j
+    for q in range(n):
+        bra_view = bra.reshape(-1, 2, 2**q)
+        ket_view = ket.reshape(-1, 2, 2**q)
+        res += np.vdot(bra_view[:, 0, :], ket_view[:, 1, :])
+        res += np.vdot(bra_view[:, 1, :], ket_view[:, 0, :])
+    return res
+
+
+def get_qaoa_energy_and_gradient(
+    diagonal, beta, gamma, n_threads=None, chunk_bits=DEFAULT_CHUNK_BITS
+):
+    """Computes the QAOA energy and its gradient with the adjoint method
+
+    One forward sweep prepares the state; one backward sweep un-applies the
+    layers to the state and to lambda = C |psi>, reading off all 2p
+    derivatives on the way, so the cost is about three energy evaluations
+    independently of p.
+    qaoa format (`angles_to_qaoa_format`) used for beta, gamma
+
+    Returns
+    -------
+    energy, grad_beta, grad_gamma : tuple(float, numpy.ndarray, numpy.ndarray)
+    """
+    if n_threads is None:
+        n_threads = get_default_n_threads()
+    p = len(beta)
+    psi = get_qaoa_statevector(diagonal, beta, gamma, n_threads, chunk_bits)
+    lam = psi * diagonal[:]
+    energy = float(np.vdot(psi, lam).real)
+    grad_beta = np.zeros(p)
+    grad_gamma = np.zeros(p)
+    for layer in reversed(range(p)):
+        # d/d beta of exp(-i beta B) is -i B exp(-i beta B)
+        grad_beta[layer] = 2 * get_mixer_matrix_element(lam, psi).imag
+        for state in (psi, lam):
+            apply_qaoa_layer(
+                state, diagonal, -beta[layer], 0, n_threads, chunk_bits, cost=False
+            )
+        # d/d gamma of exp(2 i gamma C) is 2 i C exp(2 i gamma C)
+        grad_gamma[layer] = -4 * np.vdot(lam, psi * diagonal[:]).imag
+        for state in (psi, lam):
+            apply_qaoa_layer(
+                state, diagonal, 0, -gamma[layer], n_threads, chunk_bits, mixer=False
+            )
+    return energy, grad_beta, grad_gamma
+
+
+def qaoa_maxcut_energy_statevector(
+    G,
+    beta,
+    gamma,
+    precomputed_energies=None,
+    n_threads=None,
+    chunk_bits=DEFAULT_CHUNK_BITS,
+    precision="double",
+    phase_table=True,
+):
+    """Computes MaxCut QAOA energy for graph G with the native simulator
+    qaoa format (`angles_to_qaoa_format`) used for beta, gamma
+    precomputed_energies can hold the output of `get_maxcut_diagonal`
+    to skip recomputing it on every call; its dtype then sets the precision
+    precision "single" simulates in complex64, see PRECISIONS
+    phase_table uses an IndexedDiagonal when the cut takes few values
+    """
+    if precomputed_energies is None and phase_table:
+        precomputed_energies = get_indexed_maxcut_diagonal(
+            G, n_threads, chunk_bits, precision=precision
+        )
+    if precomputed_energies is None:
+        precomputed_energies = get_maxcut_diagonal(
+            G, n_threads, chunk_bits, precision=precision
+        )
+    state = get_qaoa_statevector(
+        precomputed_energies, beta, gamma, n_threads, chunk_bits
+    )
+    return get_expectation(state, precomputed_energies, n_threads, chunk_bits)
+
+
+def get_qaoa_energies(diagonal, betas, gammas, max_batch_amplitudes=2**22):
+    """Evaluates the QAOA energy of many angle sets in batched passes
+
+    The statevectors of a batch are stored as the rows of one array and every
+    layer is applied to all rows at once, so the per-call overhead of
+    `get_qaoa_statevector` is paid once per batch and not once per angle set.
+    qaoa format (`angles_to_qaoa_format`) used for betas, gammas
+
+    Parameters
+    ----------
+    diagonal : numpy.ndarray or IndexedDiagonal
+        Cut diagonal from `get_maxcut_diagonal` or `get_indexed_maxcut_diagonal`
+    betas, gammas : array-like
+        Angles of shape (K, p)
+    max_batch_amplitudes : int, default 2**22
+        Bound on the number of amplitudes held at once (64 MiB in double precision),
+        batches have max(1, max_batch_amplitudes // 2**n) rows
+
+    Returns
+    -------
+    energies : numpy.ndarray
+        Array of shape (K,)
+    """
+    betas, gammas = np.atleast_2d(betas), np.atleast_2d(gammas)
+    assert betas.shape == gammas.shape
+    dim = diagonal.shape[0]
+    n = int(np.log2(dim))
+    dtype = np.complex64 if diagonal.dtype == np.float32 else np.complex128
+    if isinstance(diagonal, IndexedDiagonal):
+        values = diagonal.values.astype(float)
+        cut = values[diagonal.index]
+    else:
+        values = cut = np.asarray(diagonal, dtype=float)
+    batch_size = max(1, max_batch_amplitudes // dim)
+    energies = np.empty(betas.shape[0])
+    for start in range(0, betas.shape[0], batch_size):
+        beta, gamma = betas[start : start + batch_size], gammas[start : start + batch_size]
+        state = np.full((beta.shape[0], dim), 1 / np.sqrt(dim), dtype=dtype)
+        for layer in range(beta.shape[1]):
+            phase = np.exp(2j * np.outer(gamma[:, layer], values)).astype(dtype)
+            if isinstance(diagonal, IndexedDiagonal):
+                state *= phase[:, diagonal.index]
+            else:
+                state *= phase
+            c = np.cos(beta[:, layer]).astype(dtype)[:, None, None]
+            s = np.sin(beta[:, layer]).astype(dtype)[:, None, None]
+            for q in range(n):
+                view = state.reshape(state.shape[0], -1, 2, 2**q)
+                apply_rotation(view[:, :, 0, :], view[:, :, 1, :], c, s)
+        probabilities = state.real**2 + state.imag**2
+        energies[start : start + batch_size] = probabilities @ cut
+    return energies
+
+
+def get_qaoa_landscape(diagonal, betas, gammas):
+    """Evaluates the p = 1 QAOA energy on the grid betas x gammas
+    qaoa format (`angles_to_qaoa_format`) used for betas, gammas
+
+    Returns
+    -------
+    energies : numpy.ndarray
+        energies[i, j] is the energy at (betas[i], gammas[j])
+    """
+    beta_grid, gamma_grid = np.meshgrid(betas, gammas, indexing="ij")
+    energies = get_qaoa_energies(
+        diagonal, beta_grid.reshape(-1, 1), gamma_grid.reshape(-1, 1)
+    )
+    return energies.reshape(len(betas), len(gammas))
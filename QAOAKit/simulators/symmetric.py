@@ -0,0 +1,139 @@
+# Permutation-symmetric QAOA simulator for complete and complete-bipartite graphs
+
+import numpy as np
+import networkx as nx
+from functools import lru_cache
+from scipy.linalg import eigh_tridiagonal
+from scipy.special import gammaln
+
+from QAOAKit.utils import qaoa_maxcut_energy
+
+
+def get_symmetric_structure(w, atol=1e-9):
+    """Detects complete or complete-bipartite structure with uniform weights
+
+    Parameters
+    ----------
+    w : numpy.ndarray
+        Symmetric adjacency matrix with zero diagonal
+    atol : float, default 1e-9
+        Tolerance used when comparing edge weights
+
+    Returns
+    -------
+    structure : dict or None
+        {'parts': (n,), 'weight': w} for a complete graph,
+        {'parts': (a, b), 'weight': w} for a complete bipartite graph K_{a,b},
+        None if the graph has neither structure
+    """
+    w = np.asarray(w, dtype=float)
+    n = w.shape[0]
+    if n < 2:
+        return None
+    off_diagonal = ~np.eye(n, dtype=bool)
+    weight = w[0][off_diagonal[0]].max()
+    if weight == 0:
+        return None
+    if np.allclose(w[off_diagonal], weight, atol=atol):
+        return {"parts": (n,), "weight": weight}
+    # node 0 is in part A, its neighbours form part B
+    in_b = ~np.isclose(w[0], 0, atol=atol)
+    in_a = ~in_b
+    if not in_b.any():
+        return None
+    if not (
+        np.allclose(w[np.ix_(in_a, in_a)], 0, atol=atol)
+        and np.allclose(w[np.ix_(in_b, in_b)], 0, atol=atol)
+        and np.allclose(w[np.ix_(in_a, in_b)], weight, atol=atol)
+    ):
+        return None
+    return {"parts": (int(in_a.sum()), int(in_b.sum())), "weight": weight}
+
+
+@lru_cache(maxsize=32)
+def get_dicke_mixer_eigensystem(n):
+    """Eigendecomposition of sum_i X_i restricted to the Dicke states of n qubits
+
+    In the Dicke basis |D_k>, k = 0..n ones, sum_i X_i is tridiagonal with
+    off-diagonal elements sqrt((k + 1) * (n - k)).
+    """
+    k = np.arange(n)
+    off_diagonal = np.sqrt((k + 1) * (n - k))
+    return eigh_tridiagonal(np.zeros(n + 1), off_diagonal)
+
+
+def get_dicke_mixer(eigensystem, beta):
+    """Returns exp(-i beta sum_i X_i) in the Dicke basis"""
+    eigenvalues, eigenvectors = eigensystem
+    return (eigenvectors * np.exp(-1j * beta * eigenvalues)) @ eigenvectors.T
+
+
+def get_dicke_plus_state(n):
+    """Amplitudes of |+>^n in the Dicke basis: sqrt(C(n, k) / 2^n)"""
+    k = np.arange(n + 1)
+    log_binomial = gammaln(n + 1) - gammaln(k + 1) - gammaln(n - k + 1)
+    return np.exp(0.5 * (log_binomial - n * np.log(2))).astype(complex)
+
+
+def symmetric_qaoa_maxcut_energy(structure, beta, gamma):
+    """Computes MaxCut QAOA energy in the symmetric subspace of each part
+
+    Parameters
+    ----------
+    structure : dict
+        Output of get_symmetric_structure
+    beta : list-like
+        QAOA parameter beta, qaoa format (`angles_to_qaoa_format`)
+    gamma : list-like
+        QAOA parameter gamma, qaoa format (`angles_to_qaoa_format`)
+
+    Returns
+    -------
+    energy : float
+        Expected cut value
+    """
+    assert len(beta) == len(gamma)
+    parts = structure["parts"]
+    weight = structure["weight"]
+    if len(parts) == 1:
+        (n,) = parts
+        k = np.arange(n + 1)
+        cut = weight * k * (n - k)
+        eigensystem = get_dicke_mixer_eigensystem(n)
+        state = get_dicke_plus_state(n)
+        for b, g in zip(beta, gamma):
+            # exp(-i gamma sum w ZZ) equals exp(2 i gamma C) up to a global phase
+            state = state * np.exp(2j * g * cut)
+            state = get_dicke_mixer(eigensystem, b) @ state
+        return float(np.dot(cut, np.abs(state) ** 2))
+
+    a, b_size = parts
+    k_a = np.arange(a + 1)[:, None]
+    k_b = np.arange(b_size + 1)[None, :]
+    cut = weight * (k_a * (b_size - k_b) + (a - k_a) * k_b)
+    eigensystem_a = get_dicke_mixer_eigensystem(a)
+    eigensystem_b = get_dicke_mixer_eigensystem(b_size)
+    state = np.outer(get_dicke_plus_state(a), get_dicke_plus_state(b_size))
+    for b, g in zip(beta, gamma):
+        state = state * np.exp(2j * g * cut)
+        state = (
+            get_dicke_mixer(eigensystem_a, b)
+            @ state
+            @ get_dicke_mixer(eigensystem_b, b).T
+        )
+    return float(np.sum(cut * np.abs(state) ** 2))
+
+
+def qaoa_maxcut_energy_symmetric(G, beta, gamma):
+    """Computes MaxCut QAOA energy for graph G
+    using the permutation-symmetric simulator when G is a complete
+    or complete bipartite graph with uniform weights,
+    and falling back to `qaoa_maxcut_energy` otherwise.
+    qaoa format (`angles_to_qaoa_format`) used for beta, gamma
+    """
+    # get_adjacency_matrix loops over edges in Python, too slow for dense graphs
+    w = nx.to_numpy_array(G, nodelist=range(G.number_of_nodes()))
+    structure = get_symmetric_structure(w)
+    if structure is None:
+        return qaoa_maxcut_energy(G, beta, gamma)
+    return symmetric_qaoa_maxcut_energy(structure, beta, gamma)
@@ -9,12 +9,74 @@ from functools import partial
 from qiskit_aer import AerSimulator
 import json
 import re
+import hashlib
 import warnings
+from collections import deque
+from itertools import chain, islice
 
 from QAOAKit.qaoa import get_maxcut_qaoa_circuit
+from QAOAKit.graph_store import bitmask_to_graph
 
 utils_folder = Path("/app")
 
+# weighted stores in lookup_tables (`QAOAKit.weighted_store`) probed
+# by `get_weighted_opt_angles`, in order
+WEIGHTED_STORES = ("weighted_angle_dat", "weighted_transfer")
+
+# names of the numeric columns of the full_qaoa_dataset_table
+# in its columnar file (`QAOAKit.build_tables.build_full_qaoa_dataset`)
+FULL_QAOA_DATASET_COLUMNS = {
+    "C_{true opt}": "C_true_opt",
+    "C_init": "C_init",
+    "C_opt": "C_opt",
+    "pr(max)": "pr_max",
+}
+
+
+def full_qaoa_dataset_arrays_to_frame(arrays):
+    """Converts the columns of the full_qaoa_dataset_table into a pandas.DataFrame
+    indexed by pynauty_cert and p_max
+
+    beta and gamma are views into the angle matrices trimmed to p_max,
+    graphs are kept as bitmasks in the graph_bitmask column
+    and can be materialized with `QAOAKit.graph_store.bitmask_to_graph`
+    """
+    p_max = arrays["p_max"]
+    df = pd.DataFrame(
+        {
+            "graph_id": arrays["graph_id"],
+            "n": arrays["n"],
+            **{
+                column: arrays[name]
+                for column, name in FULL_QAOA_DATASET_COLUMNS.items()
+            },
+            "p": arrays["p"],
+            "p_max": p_max,
+            "graph_bitmask": arrays["graph"],
+        }
+    )
+    for column in ["beta", "gamma"]:
+        angles = np.empty(len(p_max), dtype=object)
+        for p in np.unique(p_max):
+            rows = np.flatnonzero(p_max == p)
+            for row, x in zip(rows, arrays[column][rows, :p]):
+                angles[row] = x
+        df[column] = angles
+    # building the index from the distinct certificates is much faster
+    # than hashing one bytes object per row in set_index
+    lengths = arrays["pynauty_cert_length"].astype(np.uint16)
+    keys = np.hstack([arrays["pynauty_cert"], lengths.view(np.uint8).reshape(-1, 2)])
+    keys = np.ascontiguousarray(keys).view(f"V{keys.shape[1]}").ravel()
+    _, first, cert_codes = np.unique(keys, return_index=True, return_inverse=True)
+    certs = [arrays["pynauty_cert"][i, : lengths[i]].tobytes() for i in first]
+    p_values, p_codes = np.unique(p_max, return_inverse=True)
+    df.index = pd.MultiIndex(
+        levels=[pd.Index(certs, dtype=object), p_values],
+        codes=[cert_codes.ravel(), p_codes.ravel()],
+        names=["pynauty_cert", "p_max"],
+    )
+    return df.drop(columns="p_max")
+
 
 class LookupTableHandler:
     """Singleton handling all the tables
@@ -26,20 +88,28 @@ class LookupTableHandler:
         graph2angles (dict): maps from n_qubits, p and graph_id to optimal parameters
                 graph2angles[n_qubits][p][graph_id] = {'beta':optimal_beta, 'gamma':optimal_gamma}
         graph2pynauty (dict): maps from pynauty certificate to graph_id
-        full_qaoa_dataset_table (pandas.DataFrame) : TBD
+        full_qaoa_dataset_arrays (dict) : columns of the full_qaoa_dataset_table
+                as numpy arrays, see `QAOAKit.build_tables.build_full_qaoa_dataset`
+        full_qaoa_dataset_table (pandas.DataFrame) : full_qaoa_dataset_arrays
+                as a DataFrame indexed by pynauty_cert and p_max
+        weighted_stores (dict) : maps the names in WEIGHTED_STORES to their
+                QAOAKit.weighted_store.WeightedDatasetStore, None if it was not built
     """
 
     def __init__(self):
         self.graph2angles = None
         self.graph2pynauty = None
         # dictionary with mapping from nqubits to dictionary containing
-        # 'graph_id2graph', 'graph_id2pynautycert', 'pynautycert2graph_id', 'pynautycert2graph' tables
-        # example: large_graph_table[5]['graph_id2graph']
+        # 'graph_id2pynautycert' and 'pynautycert2graph_id' tables
+        # and the 'graph_store' (QAOAKit.graph_store.GraphStore) of all graphs
+        # example: large_graph_table[5]['graph_store'].get_graph(graph_id)
         self.large_graph_table = None
+        self.full_qaoa_dataset_arrays = None
         self.full_qaoa_dataset_table = None
         self.three_reg_dataset_table = None
         self.fixed_angle_dataset_table = None
         self.full_weighted_qaoa_dataset_table = None
+        self.weighted_stores = {}
 
     def get_graph2angles(self):
         if self.graph2angles is None:
@@ -70,30 +140,68 @@ class LookupTableHandler:
             )
         return self.large_graph_table[nqubits]
 
-    def get_full_qaoa_dataset_table(self):
-        if self.full_qaoa_dataset_table is None:
+    def get_full_qaoa_dataset_arrays(self):
+        if self.full_qaoa_dataset_arrays is None:
             # Assume the data directory is directly under /app
-            file_path = Path("/app/data/lookup_tables/full_qaoa_dataset_table.p")
-            
+            file_path = Path("/app/data/lookup_tables/full_qaoa_dataset_table.npz")
+
             if not file_path.exists():
-                raise FileNotFoundError(f"The file 'full_qaoa_dataset_table.p' could not be found. "
-                                        f"Expected location: {file_path}. "
-                                        f"Please ensure the data files are correctly mounted in the Docker container.")
-            
-            self.full_qaoa_dataset_table = pd.read_pickle(file_path).set_index(["pynauty_cert", "p_max"])
+                raise FileNotFoundError(
+                    f"The file 'full_qaoa_dataset_table.npz' could not be found. "
+                    f"Expected location: {file_path}. "
+                    f"Please ensure the data files are correctly mounted in the Docker container."
+                )
+
+            with np.load(file_path) as arrays:
+                self.full_qaoa_dataset_arrays = dict(arrays)
+        return self.full_qaoa_dataset_arrays
+
+    def get_full_qaoa_dataset_table(self):
+        if self.full_qaoa_dataset_table is None:
+            self.full_qaoa_dataset_table = full_qaoa_dataset_arrays_to_frame(
+                self.get_full_qaoa_dataset_arrays()
+            )
         return self.full_qaoa_dataset_table
 
-    def get_full_weighted_qaoa_dataset_table(self):
-        if self.full_weighted_qaoa_dataset_table is None:
-            self.full_weighted_qaoa_dataset_table = pd.read_json(
-                Path(utils_folder, "../data/transfer_qaoa_weighted/all_transfer.zip")
+    def get_weighted_store(self, name):
+        if name not in self.weighted_stores:
+            # imported here, QAOAKit.weighted_store depends on this module
+            from QAOAKit.weighted_store import WeightedDatasetStore
+
+            folder = Path(utils_folder, "data/lookup_tables", name)
+            self.weighted_stores[name] = (
+                WeightedDatasetStore(folder) if folder.is_dir() else None
             )
-            self.full_weighted_qaoa_dataset_table[
-                "G"
-            ] = self.full_weighted_qaoa_dataset_table.apply(
-                lambda row: nx.node_link_graph(row["G_json"]),
-                axis=1,
+        return self.weighted_stores[name]
+
+    def get_weighted_transfer_store(self):
+        store = self.get_weighted_store("weighted_transfer")
+        if store is None:
+            raise FileNotFoundError(
+                f"The weighted transfer store could not be found. "
+                f"Expected location: "
+                f"{Path(utils_folder, 'data/lookup_tables/weighted_transfer')}. "
+                f"Build it with python -m QAOAKit.build_tables."
             )
+        return store
+
+    def get_full_weighted_qaoa_dataset_table(self):
+        if self.full_weighted_qaoa_dataset_table is None:
+            store = self.get_weighted_store("weighted_transfer")
+            if store is not None:
+                self.full_weighted_qaoa_dataset_table = store.to_frame()
+            else:
+                self.full_weighted_qaoa_dataset_table = pd.read_json(
+                    Path(
+                        utils_folder, "../data/transfer_qaoa_weighted/all_transfer.zip"
+                    )
+                )
+                self.full_weighted_qaoa_dataset_table[
+                    "G"
+                ] = self.full_weighted_qaoa_dataset_table.apply(
+                    lambda row: nx.node_link_graph(row["G_json"]),
+                    axis=1,
+                )
         return self.full_weighted_qaoa_dataset_table
 
     def get_3_reg_dataset_table(self):
@@ -191,6 +299,74 @@ def isomorphic(G1, G2):
     return pynauty.isomorphic(g1, g2)
 
 
+def get_canonical_graph_hash(G, decimals=8, return_labeling=False):
+    """Hash identifying a (weighted) graph up to isomorphism
+
+    The weights are quantized by rounding them to decimals. Graphs with
+    more than one distinct weight are labelled canonically with pynauty
+    after subdividing every edge by a vertex coloured by its weight,
+    so the labeling accounts for the weights and isomorphic weighted graphs
+    always share the hash. The edges are then relabelled with their
+    canonical positions and hashed with their quantized weights.
+
+    Parameters
+    ----------
+    G : networkx.Graph
+        Graph with nodes labelled 0,..,|V|-1
+    decimals : int, default 8
+        Number of decimals kept from the weights
+    return_labeling : bool, default False
+        Also return the canonical labeling
+
+    Returns
+    -------
+    hash : str
+        sha256 hex digest
+    canon : list
+        Only if return_labeling; canon[i] is the node of G at canonical position i,
+        so data stored per canonical position can be shared by graphs with the same hash
+    """
+    n = G.number_of_nodes()
+    edges = np.array(
+        [(u, v, d.get("weight", 1)) for u, v, d in G.edges(data=True)], dtype=float
+    ).reshape(-1, 3)
+    ends = edges[:, :2].astype(np.int64)
+    weights = np.round(edges[:, 2], decimals) + 0.0  # + 0.0 drops -0.0
+    levels, classes = np.unique(weights, return_inverse=True)
+    if len(levels) <= 1:
+        g = pynauty.Graph(
+            number_of_vertices=n,
+            directed=nx.is_directed(G),
+            adjacency_dict=get_adjacency_dict(G),
+        )
+    else:
+        # edge i becomes vertex n + i adjacent to both its ends; the colour
+        # classes are the nodes of G first, then the edges by increasing weight
+        adjacency_dict = {n + i: [int(u), int(v)] for i, (u, v) in enumerate(ends)}
+        g = pynauty.Graph(
+            number_of_vertices=n + len(ends),
+            adjacency_dict=adjacency_dict,
+            vertex_coloring=[set(range(n))]
+            + [set(n + np.flatnonzero(classes == k)) for k in range(len(levels))],
+        )
+    # the nodes of G make up the first colour class, so they come first
+    canon = pynauty.canon_label(g)[:n]
+    # position[node] is the canonical position of node; hash the sorted edge list
+    # in canonical positions rather than a dense matrix, so large sparse graphs are cheap
+    position = np.empty(n, dtype=np.int64)
+    position[canon] = np.arange(n)
+    ends = np.sort(position[ends], axis=1)
+    order = np.lexsort((ends[:, 1], ends[:, 0]))
+    digest = hashlib.sha256(
+        np.int64(G.number_of_nodes()).tobytes()
+        + ends[order].tobytes()
+        + weights[order].tobytes()
+    ).hexdigest()
+    if return_labeling:
+        return digest, canon
+    return digest
+
+
 def get_graph_id(G):
     graph2pynauty = lookup_table_handler.get_graph2pynauty()
 
@@ -205,13 +381,48 @@ def get_graph_id(G):
 
 
 def get_graph_from_id(graph_id, nqubits):
-    graph_id2graph = lookup_table_handler.get_large_graph_table(nqubits)[
-        "graph_id2graph"
-    ]
-    return copy.deepcopy(graph_id2graph[graph_id])
+    """Returns the graph with graph_id on nqubits nodes from qaoa-dataset-version1
+    as an immutable graph; use networkx.Graph(G) to get a mutable copy
+    """
+    graph_store = lookup_table_handler.get_large_graph_table(nqubits)["graph_store"]
+    return graph_store.get_graph(graph_id)
+
+
+def get_weighted_opt_angles(G, p):
+    """Optimal angles of the weighted graph G from the weighted datasets
+
+    G is looked up by `get_canonical_graph_hash` in the WEIGHTED_STORES
+    built by QAOAKit.build_tables, each probe being a single dictionary lookup.
+    If a store has several rows for G, the one with the largest C_opt is used.
+
+    Returns
+    -------
+    angles : dict
+        beta and gamma in the format of graph2angles, None if G is in no store
+    """
+    graph_hash = get_canonical_graph_hash(G)
+    for name in WEIGHTED_STORES:
+        store = lookup_table_handler.get_weighted_store(name)
+        if store is None:
+            continue
+        rows = store.get(graph_hash, p, with_graphs=False)
+        if rows is None:
+            continue
+        row = rows.iloc[np.argmax(rows["C_opt"]) if "C_opt" in rows else 0]
+        return {
+            "beta": np.array(row["beta"]),
+            "gamma": np.array(row["gamma"]),
+            "optimal_angles": True,
+            "source": "weighted_lookup_table",
+        }
+    return None
 
 
 def opt_angles_for_graph(G, p):
+    if nx.is_weighted(G):
+        angles = get_weighted_opt_angles(G, p)
+        if angles is not None:
+            return angles
     if G.number_of_nodes() <= 9 and p <= 3:
         graph2angles = lookup_table_handler.get_graph2angles()
         graph_id = get_graph_id(G)
@@ -265,10 +476,21 @@ def get_full_qaoa_dataset_table():
     return lookup_table_handler.get_full_qaoa_dataset_table()
 
 
+def get_full_qaoa_dataset_arrays():
+    return lookup_table_handler.get_full_qaoa_dataset_arrays()
+
+
 def get_full_weighted_qaoa_dataset_table():
     return lookup_table_handler.get_full_weighted_qaoa_dataset_table()
 
 
+def get_weighted_transfer_store():
+    """Lazy, indexed access to the weighted transfer dataset,
+    see `QAOAKit.weighted_store.WeightedDatasetStore`
+    """
+    return lookup_table_handler.get_weighted_transfer_store()
+
+
 def get_3_reg_dataset_table():
     return lookup_table_handler.get_3_reg_dataset_table()
 
@@ -300,7 +522,9 @@ def get_full_qaoa_dataset_table_row(G, p):
     )
     cert = pynauty.certificate(g)
 
-    return full_qaoa_dataset_table.loc[(cert, p)]
+    row = full_qaoa_dataset_table.loc[(cert, p)].copy()
+    row["G"] = bitmask_to_graph(row["graph_bitmask"], row["n"])
+    return row
 
 
 def get_3_reg_dataset_table_row(G, p):
@@ -396,78 +620,179 @@ def read_graph_from_file(f, expected_nnodes=None):
     ]
     if expected_nnodes is not None:
         assert graph_order == expected_nnodes
+    # next lines are the rows of upper triangle of adjacency matrix (without the diagonal element);
+    # concatenated they list the node pairs (u, v), u < v, in row-major order
+    rows = "".join(f.readline(-1).strip() for _ in range(graph_order - 1))
+    bits = np.frombuffer(rows.encode(), dtype=np.uint8) == ord("1")
+    u, v = np.triu_indices(graph_order, 1)
     G = nx.Graph()
-    for n in range(graph_order):
-        G.add_nodes_from([n])
-    edge_id = 0
-    # third line is first row of upper triangle of adjacency matrix (without the diagonal element)
-    for n in range(graph_order - 1):
-        adj_str = f.readline(-1)
-        for m in range(graph_order - 1 - n):
-            q_num = n + m + 1
-            if adj_str[m] == "1":
-                G.add_edge(n, q_num, edge_id=edge_id)
-                edge_id += 1
+    G.add_nodes_from(range(graph_order))
+    G.add_edges_from(
+        (int(a), int(b), {"edge_id": edge_id})
+        for edge_id, (a, b) in enumerate(zip(u[bits], v[bits]))
+    )
     return G, graph_id
 
 
-def load_results_file_into_dataframe(n_qubits, p):
+def iter_graph_file(path, n_qubits, batch_size=8192, start=0, stop=None):
+    """Streams the graphs of a graph file of qaoa-dataset-version1 in batches
+
+    Every graph takes a blank line, a line with its id and order
+    and n_qubits - 1 rows of the upper triangle of its adjacency matrix.
+    Concatenated, the rows are the bits of the bitmask of the graph
+    (`QAOAKit.graph_store`), which are decoded for a whole batch at once.
+    Only one batch of lines is held in memory.
+
+    Parameters
+    ----------
+    path : path-like
+        Graph file, e.g. ../data/qaoa-dataset-version1/Graphs/graph9c.txt
+    n_qubits : int
+        Number of nodes of every graph in the file, at most 11
+    batch_size : int, default 8192
+        Number of graphs per batch
+    start : int, default 0
+        Position of the first graph to read
+    stop : int, default None
+        Position after the last graph to read, None to read to the end of the file
+
+    Yields
+    ------
+    graph_ids : numpy.ndarray
+        IDs of the graphs in the batch
+    bitmasks : numpy.ndarray
+        uint64 bitmasks of the graphs in the batch
+    """
+    lines_per_graph = n_qubits + 1
+    n_pairs = n_qubits * (n_qubits - 1) // 2
+    shifts = np.arange(n_pairs, dtype=np.uint64)
+    position = start
+    with open(path, "rb") as f:
+        deque(islice(f, start * lines_per_graph), maxlen=0)
+        while stop is None or position < stop:
+            count = batch_size if stop is None else min(batch_size, stop - position)
+            lines = list(islice(f, count * lines_per_graph))
+            count = len(lines) // lines_per_graph
+            if count == 0:
+                break
+            ids_and_orders = np.array(
+                [re.findall(rb"\d+", line)[:2] for line in lines[1::lines_per_graph]],
+                dtype=np.int64,
+            )[:count]
+            if not (ids_and_orders[:, 1] == n_qubits).all():
+                raise ValueError(f"Expected graphs on {n_qubits} nodes in {path}")
+            # rows of graph i are lines[i * lines_per_graph + 2 + j], j < n_qubits - 1
+            rows = [lines[2 + j :: lines_per_graph][:count] for j in range(n_qubits - 1)]
+            chars = np.frombuffer(
+                b"".join(chain.from_iterable(zip(*rows))), dtype=np.uint8
+            )
+            # drop the line breaks
+            chars = chars[chars >= ord("0")]
+            if len(chars) != count * n_pairs:
+                raise ValueError(f"Malformed adjacency rows in {path}")
+            bits = chars.reshape(count, n_pairs) == ord("1")
+            bitmasks = (bits.astype(np.uint64) << shifts).sum(axis=1, dtype=np.uint64)
+            yield ids_and_orders[:, 0], bitmasks
+            position += count
+
+
+def get_results_file(n_qubits, p, data_folder=None):
+    if data_folder is None:
+        data_folder = Path(utils_folder, "../data")
+    return Path(
+        data_folder, f"qaoa-dataset-version1/Results/p={p}/n={n_qubits}_p={p}.txt"
+    )
+
+
+def load_results_file(n_qubits, p, data_folder=None):
+    """Loads one file from ../data/qaoa-dataset-version1/Results/ into numpy arrays
+    (or from data_folder/qaoa-dataset-version1/Results/ if data_folder is passed)
+    Column names are from ../data/qaoa-dataset-version1/Results/How_to_read_data_columns.txt
+
+    Returns
+    -------
+    arrays : dict
+        graph_id, C_{true opt}, C_init, C_opt, pr(max), p : one entry per graph
+        beta, gamma : contiguous (graphs, p) matrices of beta_i, gamma_i
+    """
+    values = pd.read_csv(
+        get_results_file(n_qubits, p, data_folder),
+        sep=r"\s+",
+        header=None,
+        dtype=float,
+    ).to_numpy()
+    if values.shape[1] != 6 + 2 * p:
+        raise ValueError(
+            f"Expected {6 + 2 * p} columns in the results for n = {n_qubits}, p = {p}"
+        )
+    arrays = {
+        "graph_id": values[:, 0].astype(np.int64),
+        "C_{true opt}": values[:, 1],
+        "C_init": values[:, 2],
+        "C_opt": values[:, 3],
+        "pr(max)": values[:, 4],
+        "p": values[:, 5].astype(np.int64),
+        "beta": np.ascontiguousarray(values[:, 6 : 6 + p]),
+        "gamma": np.ascontiguousarray(values[:, 6 + p : 6 + 2 * p]),
+    }
+    assert (arrays["p"] <= p).all()
+    return arrays
+
+
+def load_results_file_into_dataframe(n_qubits, p, data_folder=None):
     """Loads one file from ../data/qaoa-dataset-version1/Results/ into a pandas.DataFrame
+    (or from data_folder/qaoa-dataset-version1/Results/ if data_folder is passed)
     Column names are from ../data/qaoa-dataset-version1/Results/How_to_read_data_columns.txt
     Columns added:
     p_max : maximal p allowed; this is to differentiate from p in the original dataset, which can be lower due to achieving optimal solution
     beta : concatenated beta_i
     gamma : concatenated gamma_i
     """
-    colnames = ["graph_id", "C_{true opt}", "C_init", "C_opt", "pr(max)", "p"]
-    for i in range(p):
-        colnames.append(f"beta_{i}/pi")
-    for i in range(p):
-        colnames.append(f"gamma_{i}/pi")
-    df = pd.read_csv(
-        Path(
-            utils_folder,
-            f"../data/qaoa-dataset-version1/Results/p={p}/n={n_qubits}_p={p}.txt",
-        ),
-        sep='\s+',
-        names=colnames,
-        header=None,
+    arrays = load_results_file(n_qubits, p, data_folder)
+    df = pd.DataFrame(
+        {
+            column: arrays[column]
+            for column in ["graph_id", "C_{true opt}", "C_init", "C_opt", "pr(max)", "p"]
+        }
     )
     df[
         "p_max"
     ] = p  # maximal p allowed; this is to differentiate from p in the original dataset, which can be lower due to achieving optimal solution
-    df["beta"] = df.apply(
-        lambda row: np.array([row[f"beta_{i}/pi"] for i in range(p)]), axis=1
-    )
-    df["gamma"] = df.apply(
-        lambda row: np.array([row[f"gamma_{i}/pi"] for i in range(p)]), axis=1
-    )
-    assert (df["p_max"] >= df["p"]).all()
-    return df[
-        [
-            "graph_id",
-            "C_{true opt}",
-            "C_init",
-            "C_opt",
-            "pr(max)",
-            "p",
-            "p_max",
-            "beta",
-            "gamma",
-        ]
-    ].set_index("graph_id")
-
-
-def get_graph_and_assign_weights(graph_id, weight_id, nqubits, df_weights, graphs_dict):
+    # rows are views into the contiguous angle matrices
+    df["beta"] = list(arrays["beta"])
+    df["gamma"] = list(arrays["gamma"])
+    return df.set_index("graph_id")
+
+
+def get_weight_index(df_weights):
+    """Maps (graph_id, weight_id) to the list of weight arrays for it in df_weights,
+    weights[edge_id] is the weight of the edge with edge_id
+    """
+    index = {}
+    for graph_id, weight_id, weights in zip(
+        df_weights["graph_id"], df_weights["weight_id"], df_weights["weights"]
+    ):
+        index.setdefault((int(graph_id), int(weight_id)), []).append(
+            np.asarray(weights, dtype=float)
+        )
+    return index
+
+
+def get_graph_and_assign_weights(
+    graph_id, weight_id, nqubits, df_weights, graphs_dict, weight_index=None
+):
     """Retrieves a graph from graph_id and nqubits and assigns weights
-    from df_weights
+    from df_weights (or from weight_index, see `get_weight_index`, if passed)
     """
-    weights = list(
-        df_weights[
-            (df_weights["graph_id"] == graph_id)
-            & (df_weights["weight_id"] == weight_id)
-        ]["weights"]
-    )
+    if weight_index is None:
+        weights = list(
+            df_weights[
+                (df_weights["graph_id"] == graph_id)
+                & (df_weights["weight_id"] == weight_id)
+            ]["weights"]
+        )
+    else:
+        weights = weight_index.get((graph_id, weight_id), [])
     if len(weights) != 1:
         raise ValueError(
             f"For graph_id={graph_id}, weight_id={weight_id} found unexpected number ({len(weights)}) weights"
@@ -480,9 +805,11 @@ def get_graph_and_assign_weights(graph_id, weight_id, nqubits, df_weights, graph
         G = get_graph_from_id(graph_id, nqubits)
     else:
         G = graphs_dict[graph_id]
+    # copy so that the stored graph is left unchanged
+    G = nx.Graph(G)
     for u, v, attr_dict in G.edges(data=True):
-        G[u][v]["weight"] = weights[attr_dict["edge_id"]]
-    return copy.deepcopy(G)
+        attr_dict["weight"] = weights[attr_dict["edge_id"]]
+    return G
 
 
 def load_weighted_results_into_dataframe(
@@ -493,8 +820,12 @@ def load_weighted_results_into_dataframe(
     the graphs should be loaded from the full_qaoa_dataset_table
     df_weights is a dataframe mapping graph_id and weight_id to list of weights
     The column names and conventions are described in ../data/weighted_angle_dat/Readme.txt
-    One column is added:
+    Columns added:
     p_max : maximal p allowed; this is to differentiate from p in the original dataset, which can be lower due to achieving optimal solution
+    beta : concatenated beta_i
+    gamma : concatenated gamma_i
+    G : networkx.Graph with weights assigned
+    weights : weights[edge_id] is the weight of the edge with edge_id
     """
     colnames = [
         "graph_id",
@@ -516,7 +847,7 @@ def load_weighted_results_into_dataframe(
         dfs.append(
             pd.read_csv(
                 fname,
-                delim_whitespace=True,
+                sep=r"\s+",
                 usecols=list(range(len(colnames))),
                 names=colnames,
                 header=None,
@@ -526,13 +857,13 @@ def load_weighted_results_into_dataframe(
     df[
         "p_max"
     ] = p  # maximal p allowed; this is to differentiate from p in the original dataset, which can be lower due to achieving optimal solution
-    df["beta"] = df.apply(lambda row: [row[f"beta_{i}/pi"] for i in range(p)], axis=1)
-    df["gamma"] = df.apply(lambda row: [row[f"gamma_{i}/pi"] for i in range(p)], axis=1)
+    # rows are views into the contiguous angle matrices
+    df["beta"] = list(df[[f"beta_{i}/pi" for i in range(p)]].to_numpy())
+    df["gamma"] = list(df[[f"gamma_{i}/pi" for i in range(p)]].to_numpy())
     # load graphs if needed
     if graphs_file_path is not None:
         graphs_dict = {}
         with open(graphs_file_path, "r") as f:
-            graph_ids = []
             while True:
                 try:
                     G, graph_id = read_graph_from_file(f)
@@ -540,38 +871,40 @@ def load_weighted_results_into_dataframe(
                 except ValueError:
                     break
     else:
-        graphs_dict = None
-    df["G"] = df.apply(
-        lambda row: get_graph_and_assign_weights(
-            row["graph_id"], row["weight_id"], nqubits, df_weights, graphs_dict
-        ),
-        axis=1,
-    )
-    assert np.all(
-        np.isclose(
-            df.apply(
-                lambda row: np.mean(
-                    [x[2]["weight"] for x in row["G"].edges(data=True)]
-                ),
-                axis=1,
-            ),
-            df["mean(weight)"],
-            atol=1e-07,
+        assert (
+            nqubits <= 9
+        ), "If the number of nodes is greater than 9, must pass graphs file path"
+        graphs_dict = {
+            graph_id: get_graph_from_id(graph_id, nqubits)
+            for graph_id in df["graph_id"].unique()
+        }
+    weight_index = get_weight_index(df_weights)
+    df["G"] = [
+        get_graph_and_assign_weights(
+            graph_id, weight_id, nqubits, df_weights, graphs_dict, weight_index
         )
-        | np.isnan(df["std(weight)"])
-    )
+        for graph_id, weight_id in zip(df["graph_id"], df["weight_id"])
+    ]
+    # weights[edge_id] is the weight of the edge with edge_id
+    n_edges = np.array([G.number_of_edges() for G in df["G"]])
+    df["weights"] = [
+        weight_index[(graph_id, weight_id)][0][:m]
+        for graph_id, weight_id, m in zip(df["graph_id"], df["weight_id"], n_edges)
+    ]
 
+    # mean and std of the weights of every row at once
+    offsets = np.concatenate([[0], np.cumsum(n_edges)[:-1]])
+    weights = np.concatenate(df["weights"].to_list())
+    means = np.add.reduceat(weights, offsets) / n_edges
+    deviations = (weights - np.repeat(means, n_edges)) ** 2
+    stds = np.sqrt(np.add.reduceat(deviations, offsets) / n_edges)
     assert np.all(
-        np.isclose(
-            df.apply(
-                lambda row: np.std([x[2]["weight"] for x in row["G"].edges(data=True)]),
-                axis=1,
-            ),
-            df["std(weight)"],
-            atol=1e-07,
-        )
+        np.isclose(means, df["mean(weight)"], atol=1e-07)
         | np.isnan(df["std(weight)"])
     )
+    assert np.all(
+        np.isclose(stds, df["std(weight)"], atol=1e-07) | np.isnan(df["std(weight)"])
+    )
 
     if nqubits <= 10:
         number_of_rows_to_check = 20
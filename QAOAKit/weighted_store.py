@@ -0,0 +1,201 @@
+# Indexed on-disk store for weighted QAOA datasets
+#
+# Every row (a weighted graph and its QAOA data for one p) keeps its scalar
+# and angle columns in a pickled DataFrame, together with the canonical hash
+# of its weighted graph (`get_canonical_graph_hash`) and its weight statistics.
+# The weighted edge lists of all rows are stored in flat .npy arrays that are
+# memory-mapped, so graphs are only materialized for the rows that are read.
+
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import networkx as nx
+from pathlib import Path
+
+from QAOAKit.utils import get_canonical_graph_hash
+
+META_FILE = "meta.p"
+ARRAYS = ("edges", "weights", "offsets", "n_nodes")
+
+
+def build_weighted_store(df, folder, graph_column="G"):
+    """Writes the rows of df into a store in folder
+
+    The store is written to a temporary folder first
+    and replaces folder once complete.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        One row per weighted graph and p; graphs in graph_column
+        with nodes labelled 0,..,|V|-1 and edge attribute 'weight'
+    folder : path-like
+        Folder of the store
+    graph_column : str, default "G"
+        Column holding the graphs; it is not stored in the metadata,
+        neither is "G_json"
+
+    Returns
+    -------
+    store : WeightedDatasetStore
+    """
+    folder = Path(folder)
+    graphs = list(df[graph_column])
+    meta = df.drop(columns=[c for c in (graph_column, "G", "G_json") if c in df])
+    meta = meta.reset_index(drop=True)
+    if "p_max" not in meta:
+        meta["p_max"] = meta["p"]
+
+    n_nodes = np.array([G.number_of_nodes() for G in graphs], dtype=np.int32)
+    n_edges = np.array([G.number_of_edges() for G in graphs], dtype=np.int64)
+    offsets = np.zeros(len(graphs) + 1, dtype=np.int64)
+    np.cumsum(n_edges, out=offsets[1:])
+    edges = np.empty((offsets[-1], 2), dtype=np.int32)
+    weights = np.empty(offsets[-1], dtype=float)
+    for i, G in enumerate(graphs):
+        assert set(G.nodes()) == set(range(n_nodes[i]))
+        rows = slice(offsets[i], offsets[i + 1])
+        edges[rows] = np.array(list(G.edges()), dtype=np.int32).reshape(-1, 2)
+        weights[rows] = [w for _, _, w in G.edges(data="weight", default=1)]
+
+    meta["n"] = n_nodes
+    meta["n_edges"] = n_edges
+    with np.errstate(invalid="ignore"):
+        means = np.add.reduceat(weights, offsets[:-1]) / n_edges
+        deviations = (weights - np.repeat(means, n_edges)) ** 2
+        stds = np.sqrt(np.add.reduceat(deviations, offsets[:-1]) / n_edges)
+    meta["mean(weight)"] = np.where(n_edges > 0, means, np.nan)
+    meta["std(weight)"] = np.where(n_edges > 0, stds, np.nan)
+    meta["graph_hash"] = [get_canonical_graph_hash(G) for G in graphs]
+
+    tmp_folder = folder.with_name(folder.name + ".tmp")
+    shutil.rmtree(tmp_folder, ignore_errors=True)
+    tmp_folder.mkdir(parents=True)
+    for name, array in zip(ARRAYS, (edges, weights, offsets, n_nodes)):
+        np.save(Path(tmp_folder, f"{name}.npy"), array)
+    meta.to_pickle(Path(tmp_folder, META_FILE))
+    shutil.rmtree(folder, ignore_errors=True)
+    os.replace(tmp_folder, folder)
+    return WeightedDatasetStore(folder)
+
+
+class WeightedDatasetStore:
+    """Read access to a store written by `build_weighted_store`
+
+    The metadata is loaded on first use, the edge arrays are memory-mapped.
+
+    Attributes:
+        folder (pathlib.Path): folder of the store
+    """
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self._meta = None
+        self._index = None
+        self._arrays = {}
+
+    @property
+    def meta(self):
+        """Metadata of all rows: the dataset columns without graphs,
+        n, n_edges, mean(weight), std(weight) and graph_hash
+        """
+        if self._meta is None:
+            self._meta = pd.read_pickle(Path(self.folder, META_FILE))
+        return self._meta
+
+    @property
+    def index(self):
+        """Maps (graph_hash, p_max) to the positions of its rows"""
+        if self._index is None:
+            self._index = {}
+            for row, key in enumerate(zip(self.meta["graph_hash"], self.meta["p_max"])):
+                self._index.setdefault((key[0], int(key[1])), []).append(row)
+        return self._index
+
+    def get_array(self, name):
+        if name not in self._arrays:
+            self._arrays[name] = np.load(
+                Path(self.folder, f"{name}.npy"), mmap_mode="r"
+            )
+        return self._arrays[name]
+
+    def __len__(self):
+        return len(self.meta)
+
+    def get_graph(self, row):
+        """Materializes the weighted graph of row"""
+        offsets = self.get_array("offsets")
+        start, stop = offsets[row], offsets[row + 1]
+        G = nx.Graph()
+        G.add_nodes_from(range(int(self.get_array("n_nodes")[row])))
+        G.add_weighted_edges_from(
+            (int(u), int(v), float(w))
+            for (u, v), w in zip(
+                self.get_array("edges")[start:stop],
+                self.get_array("weights")[start:stop],
+            )
+        )
+        return G
+
+    def get_rows(self, rows, with_graphs=True):
+        """Metadata of rows, with their graphs in column "G" if with_graphs"""
+        df = self.meta.iloc[rows].copy()
+        if with_graphs:
+            df["G"] = [self.get_graph(row) for row in rows]
+        return df
+
+    def get(self, graph_hash, p, with_graphs=True):
+        """Rows of the graph with graph_hash for p (p_max), None if there are none"""
+        rows = self.index.get((graph_hash, int(p)))
+        if rows is None:
+            return None
+        return self.get_rows(rows, with_graphs)
+
+    def lookup(self, G, p, with_graphs=True):
+        """Rows of the weighted graph G (up to isomorphism) for p, see `get`"""
+        return self.get(get_canonical_graph_hash(G), p, with_graphs)
+
+    def scan(
+        self,
+        n=None,
+        p=None,
+        mean_weight=None,
+        std_weight=None,
+        with_graphs=True,
+        batch_size=1024,
+    ):
+        """Yields the rows matching all filters in DataFrames of at most batch_size rows
+
+        Parameters
+        ----------
+        n, p : int or list-like, default None
+            Keep rows with these numbers of nodes and values of p_max
+        mean_weight, std_weight : tuple, default None
+            Keep rows with mean (std) of the weights in the closed interval (low, high)
+        with_graphs : bool, default True
+            Materialize the graphs of the rows yielded in column "G"
+        batch_size : int, default 1024
+        """
+        meta = self.meta
+        mask = np.ones(len(meta), dtype=bool)
+        if n is not None:
+            mask &= np.isin(meta["n"], np.atleast_1d(n))
+        if p is not None:
+            mask &= np.isin(meta["p_max"], np.atleast_1d(p))
+        for column, bounds in [
+            ("mean(weight)", mean_weight),
+            ("std(weight)", std_weight),
+        ]:
+            if bounds is not None:
+                low, high = bounds
+                mask &= (meta[column] >= low).to_numpy() & (
+                    meta[column] <= high
+                ).to_numpy()
+        rows = np.flatnonzero(mask)
+        for start in range(0, len(rows), batch_size):
+            yield self.get_rows(rows[start : start + batch_size], with_graphs)
+
+    def to_frame(self):
+        """All rows with their graphs materialized"""
+        return self.get_rows(np.arange(len(self)))
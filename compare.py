@@ -80,8 +80,13 @@ def maxcut_value(bitstring, w):
 
 def compute_maxcut_optimal(G):
     """
-    Compute the optimal MaxCut value using a brute-force approach.
+    Compute the optimal MaxCut value with the /graph/maxcut_baseline endpoint,
+    falling back to a brute-force approach if the server does not return an exact value.
     """
+    data = {"adjacency_matrix": nx.to_numpy_array(G).tolist(), "method": "exact"}
+    result = make_request("/graph/maxcut_baseline", data)
+    if result is not None and result["exact"]:
+        return result["value"]
     num_nodes = len(G.nodes)
     max_cut = 0
     for bits in range(2**num_nodes):
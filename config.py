@@ -4,4 +4,12 @@ from dotenv import load_dotenv
 load_dotenv()
 
 BASIC_AUTH_USERNAME = os.getenv('BASIC_AUTH_USERNAME', 'default_user')
-BASIC_AUTH_PASSWORD = os.getenv('BASIC_AUTH_PASSWORD', 'default_password')
\ No newline at end of file
+BASIC_AUTH_PASSWORD = os.getenv('BASIC_AUTH_PASSWORD', 'default_password')
+
+# Job queue for long-running evaluations (see utils/jobs.py)
+JOBS_DB_PATH = os.getenv('JOBS_DB_PATH', 'data/jobs.sqlite')
+JOBS_MAX_WORKERS = int(os.getenv('JOBS_MAX_WORKERS', '2'))
+JOBS_MAX_QUEUE = int(os.getenv('JOBS_MAX_QUEUE', '16'))
+
+# Process pool of the multi-start search (see routes/multistart.py)
+MULTISTART_MAX_WORKERS = int(os.getenv('MULTISTART_MAX_WORKERS', '2'))
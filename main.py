@@ -1,5 +1,5 @@
 from fastapi import FastAPI
-from routes import qaoakit, qibpi, random, tqa, constant, interp
+from routes import qaoakit, qibpi, random, tqa, constant, interp, optimize, jobs, multistart, baseline
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.openapi.utils import get_openapi
@@ -23,6 +23,10 @@ app.include_router(qaoakit.router)
 app.include_router(tqa.router)
 app.include_router(constant.router)
 app.include_router(interp.router)
+app.include_router(optimize.router)
+app.include_router(jobs.router)
+app.include_router(multistart.router)
+app.include_router(baseline.router)
 
 # TODO: If you want to add more routers, add them here.
 # e.g. app.include_router(interp.router)
@@ -23,6 +23,38 @@ class WeightType(str, Enum):
     LOG_NORMAL = "log-normal"
     CAUCHY = "cauchy"
 
+class OptimizerMethod(str, Enum):
+    LBFGS = "lbfgs"
+    ADAM = "adam"
+
+class LadderStrategy(str, Enum):
+    INTERP = "interp"
+    FOURIER = "fourier"
+
+class MultiStartStrategy(str, Enum):
+    KDE = "kde"
+    RANDOM = "random"
+    TQA = "tqa"
+
+class BaselineMethod(str, Enum):
+    AUTO = "auto"
+    EXACT = "exact"
+    GW = "gw"
+    TPM = "tpm"
+    LOCAL_SEARCH = "local_search"
+
+class JobKind(str, Enum):
+    OPTIMIZE = "optimize"
+    MAXCUT = "maxcut"
+    LANDSCAPE = "landscape"
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
 class GraphDTO(BaseModel):
     instance_id: int
     adjacency_matrix: list
@@ -33,6 +65,49 @@ class OptimalAnglesResponseDTO(BaseModel):
     optimal_angles: Optional[bool] = Field(None, example=False)
     source: Optional[str] = Field("Strategy", example="Example")
 
+class OptimizedAnglesResponseDTO(OptimalAnglesResponseDTO):
+    energy: float = Field(..., example=11.3, description="Expected cut value at the refined angles")
+    initial_energy: float = Field(..., example=6.0, description="Expected cut value at the warm-start angles")
+    nfev: int = Field(..., example=17, description="Number of energy evaluations")
+    ngev: int = Field(..., example=17, description="Number of gradient evaluations")
+    nit: int = Field(..., example=9, description="Number of optimizer iterations")
+    converged: bool = Field(..., example=True, description="Whether the optimizer stopped before reaching maxiter")
+
+class LadderLevelResponseDTO(OptimizedAnglesResponseDTO):
+    p: int = Field(..., example=2, description="QAOA level of this line")
+    u: Optional[List[float]] = Field(None, example=[0.6], description="FOURIER gamma amplitudes, only for the 'fourier' strategy")
+    v: Optional[List[float]] = Field(None, example=[0.35], description="FOURIER beta amplitudes, only for the 'fourier' strategy")
+
+class TQAResponseDTO(OptimalAnglesResponseDTO):
+    t_max: float = Field(..., example=1.0, description="Total annealing time of the returned schedule")
+    energy: Optional[float] = Field(None, example=11.3, description="Expected cut value of the schedule, only in 'auto' mode")
+    nfev: Optional[int] = Field(None, example=40, description="Number of energy evaluations, only in 'auto' mode")
+    scan: Optional[dict] = Field(None, example={"t_max": [0.5, 1.0, 1.5], "energy": [9.2, 11.3, 10.4]},
+                                 description="Scanned and refined t_max values with their energies, sorted by t_max, only in 'auto' mode")
+
+class MultiStartResponseDTO(OptimizedAnglesResponseDTO):
+    n_samples: int = Field(..., example=256, description="Number of candidates drawn and scored")
+    optimized_energies: List[float] = Field(..., example=[11.8, 11.8, 11.3, 10.9], description="Energies of the top-m candidates after optimization, best first")
+    sample_energies: dict = Field(..., example={"min": 2.1, "median": 6.4, "max": 10.2, "mean": 6.2, "std": 1.9},
+                                  description="Spread of the energies of all candidates before optimization")
+
+class MaxCutBaselineResponseDTO(BaseModel):
+    value: float = Field(..., example=16.0, description="Cut value of the best cut found")
+    cut: List[int] = Field(..., example=[0, 1, 0, 1], description="Side of every node in the best cut found")
+    method: BaselineMethod = Field(..., example=BaselineMethod.EXACT, description="Method that produced the cut")
+    exact: bool = Field(..., example=True, description="Whether value is the maximal cut; otherwise it is a lower bound")
+    upper_bound: Optional[float] = Field(None, example=16.0, description="Upper bound on the maximal cut: the SDP optimum for 'gw', the value for 'exact'")
+    cached: bool = Field(..., example=False, description="Whether the result was served from the cache")
+
+class JobResponseDTO(BaseModel):
+    id: str = Field(..., example="3f2b9c0e8d7a4f4f9a4b1c2d3e4f5a6b")
+    kind: JobKind = Field(..., example=JobKind.MAXCUT)
+    status: JobStatus = Field(..., example=JobStatus.DONE)
+    result: Optional[dict] = Field(None, example={"maxcut": 4.0}, description="Job result once the status is 'done'")
+    error: Optional[str] = Field(None, example=None, description="Error message if the status is 'failed'")
+    created: float = Field(..., example=1718000000.0, description="Submission time (UNIX timestamp)")
+    updated: float = Field(..., example=1718000002.5, description="Time of the last status change (UNIX timestamp)")
+
 class BaseQAOADTO(BaseModel):
     adjacency_matrix: List[List[float]] = Field(..., example=[[0.0, 1.0], [1.0, 0.0]])
     p: int = Field(1, ge=1, le=100, example=1, description="Number of QAOA layers")
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field, validator
 from enum import Enum
-from typing import List, Optional
-from .base import BaseQAOADTO, InstanceClass, WeightType
+from typing import List, Optional, Dict, Any, Union
+from .base import BaseQAOADTO, InstanceClass, WeightType, OptimizerMethod, JobKind, LadderStrategy, MultiStartStrategy, BaselineMethod
 import math
 
 
@@ -48,11 +48,17 @@ class QIBPIDTO(BaseQAOADTO):
         use_enum_values = True
         
 class TQADTO(BaseQAOADTO):
-    t_max: float = Field(..., example=1.0, description="Total annealing time for TQA initialization")
+    t_max: Union[float, str] = Field(..., example=1.0, description="Total annealing time for TQA initialization, or 'auto' to pick the t_max with the highest energy")
+    t_max_bounds: Optional[List[float]] = Field(None, example=[0.1, 2.0], description="Range of t_max scanned in 'auto' mode, defaults to [0.1 p, 2 p]")
+    n_scan: int = Field(32, ge=4, le=512, example=32, description="Number of t_max values scanned in 'auto' mode before refinement")
     
     # Validate t_max is greater than 0 
     @validator('t_max')
     def validate_t_max(cls, v):
+        if isinstance(v, str):
+            if v != "auto":
+                raise ValueError("t_max must be a positive number or 'auto'")
+            return v
         if v <= 0:
             raise ValueError("Total annealing time (t_max) must be positive")
         return v
@@ -62,6 +68,12 @@ class TQADTO(BaseQAOADTO):
         if v <= 0:
             raise ValueError("Number of layers (p) must be positive")
         return v
+
+    @validator('t_max_bounds')
+    def validate_t_max_bounds(cls, v):
+        if v is not None and (len(v) != 2 or not 0 < v[0] < v[1]):
+            raise ValueError("t_max_bounds must be two increasing positive numbers")
+        return v
     
     
 class FixedAnglesDTO(BaseQAOADTO):
@@ -83,4 +95,127 @@ class FixedAnglesDTO(BaseQAOADTO):
     
 class INTERPInitDTO(BaseQAOADTO):
     gamma: List[float] = Field(..., example=[0.1, 0.2], description="Optimized gamma angles for the current level")
-    beta: List[float] = Field(..., example=[0.3, 0.4], description="Optimized beta angles for the current level")
\ No newline at end of file
+    beta: List[float] = Field(..., example=[0.3, 0.4], description="Optimized beta angles for the current level")
+
+class INTERPLadderDTO(INTERPInitDTO):
+    k: int = Field(..., ge=1, le=20, example=3, description="Number of levels to climb, the last streamed level is p + k")
+    strategy: LadderStrategy = Field(LadderStrategy.INTERP, example=LadderStrategy.INTERP, description="Initialisation of each next level")
+    q: Optional[int] = Field(None, ge=1, example=None, description="Number of FOURIER amplitudes, None for FOURIER[infinity] (q = p)")
+    method: OptimizerMethod = Field(OptimizerMethod.LBFGS, example=OptimizerMethod.LBFGS, description="Optimizer used at every level")
+    maxiter: int = Field(200, ge=1, le=10000, example=200, description="Maximal number of optimizer iterations per level")
+    tol: float = Field(1e-6, gt=0, example=1e-6, description="Tolerance used for early stopping")
+
+    @validator('adjacency_matrix')
+    def validate_number_of_nodes(cls, v):
+        if len(v) > 24:
+            raise ValueError("The depth ladder supports graphs with at most 24 nodes")
+        return v
+
+    @validator('beta')
+    def validate_beta(cls, v, values):
+        if 'gamma' in values and len(v) != len(values['gamma']):
+            raise ValueError("Betas and gammas must have the same length")
+        if 'p' in values and len(v) != values['p']:
+            raise ValueError("The number of provided angles must match 'p'")
+        return v
+
+    @validator('k')
+    def validate_k(cls, v, values):
+        if 'p' in values and values['p'] + v > 100:
+            raise ValueError("p + k exceeds maximum allowed number of QAOA layers")
+        return v
+
+    class Config:
+        use_enum_values = True
+
+class OptimizeDTO(BaseQAOADTO):
+    beta: List[float] = Field(..., example=[0.1], description="Warm-start beta angles, e.g. the output of any initialisation strategy")
+    gamma: List[float] = Field(..., example=[0.2], description="Warm-start gamma angles, e.g. the output of any initialisation strategy")
+    method: OptimizerMethod = Field(OptimizerMethod.LBFGS, example=OptimizerMethod.LBFGS, description="Optimizer to use")
+    maxiter: int = Field(200, ge=1, le=10000, example=200, description="Maximal number of optimizer iterations")
+    tol: float = Field(1e-6, gt=0, example=1e-6, description="Tolerance used for early stopping")
+    learning_rate: float = Field(0.05, gt=0, example=0.05, description="Step size, only used by Adam")
+
+    @validator('adjacency_matrix')
+    def validate_number_of_nodes(cls, v):
+        if len(v) > 24:
+            raise ValueError("Angle optimization supports graphs with at most 24 nodes")
+        return v
+
+    @validator('gamma')
+    def validate_gamma(cls, v, values):
+        if 'beta' in values and len(v) != len(values['beta']):
+            raise ValueError("Betas and gammas must have the same length")
+        if 'p' in values and len(v) != values['p']:
+            raise ValueError("The number of provided angles must match 'p'")
+        return v
+
+    class Config:
+        use_enum_values = True
+
+
+class MultiStartDTO(BaseQAOADTO):
+    strategy: MultiStartStrategy = Field(MultiStartStrategy.KDE, example=MultiStartStrategy.KDE, description="Distribution the candidates are drawn from")
+    n_samples: int = Field(256, ge=1, le=4096, example=256, description="Number of candidates K that are drawn and scored")
+    top_m: int = Field(4, ge=1, le=32, example=4, description="Number of best-scoring candidates that are optimized")
+    method: OptimizerMethod = Field(OptimizerMethod.LBFGS, example=OptimizerMethod.LBFGS, description="Optimizer used for the top-m candidates")
+    maxiter: int = Field(200, ge=1, le=10000, example=200, description="Maximal number of optimizer iterations per candidate")
+    tol: float = Field(1e-6, gt=0, example=1e-6, description="Tolerance used for early stopping")
+    seed: Optional[int] = Field(None, example=42, description="Seed of the candidate sampler")
+
+    @validator('adjacency_matrix')
+    def validate_number_of_nodes(cls, v):
+        if len(v) > 20:
+            raise ValueError("Multi-start search supports graphs with at most 20 nodes")
+        return v
+
+    @validator('strategy')
+    def validate_strategy(cls, v, values):
+        if v == MultiStartStrategy.KDE and values.get('p') not in [1, 2, 3]:
+            raise ValueError("The pre-trained KDE only supports p values of 1, 2, or 3")
+        return v
+
+    @validator('top_m')
+    def validate_top_m(cls, v, values):
+        if 'n_samples' in values and v > values['n_samples']:
+            raise ValueError("top_m cannot exceed n_samples")
+        return v
+
+    class Config:
+        use_enum_values = True
+
+class MaxCutBaselineDTO(BaseQAOADTO):
+    method: BaselineMethod = Field(BaselineMethod.AUTO, example=BaselineMethod.AUTO, description="MaxCut method; 'auto' enumerates graphs with up to 20 nodes, uses Goemans-Williamson up to 100 nodes and TPM or local search beyond")
+    nsamples: int = Field(1000, ge=1, le=100000, example=1000, description="Number of sampled cuts or local search starts")
+    seed: Optional[int] = Field(None, example=42, description="Seed of the sampler")
+
+    @validator('method')
+    def validate_method(cls, v, values):
+        if v == BaselineMethod.EXACT and len(values.get('adjacency_matrix', [])) > 26:
+            raise ValueError("Exact MaxCut supports graphs with at most 26 nodes")
+        return v
+
+    class Config:
+        use_enum_values = True
+
+class JobDTO(BaseQAOADTO):
+    kind: JobKind = Field(..., example=JobKind.MAXCUT, description="The type of job to run")
+    params: Dict[str, Any] = Field({}, example={}, description="Extra job arguments. optimize: beta, gamma and optionally method, maxiter, tol, learning_rate. landscape: n_beta, n_gamma")
+
+    @validator('adjacency_matrix')
+    def validate_number_of_nodes(cls, v):
+        if len(v) > 26:
+            raise ValueError("Jobs support graphs with at most 26 nodes")
+        return v
+
+    @validator('params')
+    def validate_params(cls, v, values):
+        if values.get('kind') == JobKind.OPTIMIZE:
+            if 'beta' not in v or 'gamma' not in v:
+                raise ValueError("optimize jobs need 'beta' and 'gamma' in params")
+            if len(v['beta']) != len(v['gamma']):
+                raise ValueError("Betas and gammas must have the same length")
+        return v
+
+    class Config:
+        use_enum_values = True
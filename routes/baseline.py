@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Body, Depends
+import networkx as nx
+import numpy as np
+from QAOAKit.classical import maxcut_baseline
+from models.dto import MaxCutBaselineDTO
+from models.base import MaxCutBaselineResponseDTO
+from utils.auth import authenticate_user
+
+router = APIRouter()
+
+@router.post("/graph/maxcut_baseline", response_model=MaxCutBaselineResponseDTO, tags=["Classical"],
+             summary="Get the Best Known MaxCut",
+             response_description="The best cut found, whether it is optimal and an upper bound if available.",
+             responses={
+                 200: {"description": "Successfully computed or retrieved the MaxCut baseline.",
+                       "content": {"application/json": {"example": {"value": 16.0, "cut": [0, 1, 0, 1], "method": "exact", "exact": True,
+                                                                    "upper_bound": 16.0, "cached": False}}}},
+                 400: {"description": "Invalid input data."},
+                 500: {"description": "Server error during MaxCut computation."}
+             },
+             dependencies=[Depends(authenticate_user)])
+def get_maxcut_baseline(dto: MaxCutBaselineDTO = Body(...)):
+    """
+    Endpoint to compute the classical MaxCut baseline of a graph, e.g. the denominator of QAOA approximation ratios.
+
+    Small graphs are solved exactly by enumeration. Larger graphs use the best of `nsamples` Goemans-Williamson cuts
+    (which also gives the SDP upper bound), Thompson-Parekh-Marwaha samples on regular unweighted graphs, or random starts,
+    all refined with a vectorized 1-flip/2-flip local search. Results are cached by canonical weighted-graph hash,
+    so isomorphic copies of a solved graph are answered immediately.
+    """
+    try:
+        G = nx.from_numpy_array(np.array(dto.adjacency_matrix))
+        x, info = maxcut_baseline(G, dto.method, dto.nsamples, dto.seed)
+        return MaxCutBaselineResponseDTO(cut=[int(b) for b in x], **info)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
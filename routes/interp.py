@@ -1,8 +1,17 @@
+import json
 from fastapi import APIRouter, HTTPException, Body, Depends
 from fastapi.security import HTTPBasic
+from fastapi.responses import StreamingResponse
+import networkx as nx
 import numpy as np
-from models.dto import INTERPInitDTO
-from models.base import OptimalAnglesResponseDTO
+from QAOAKit.parameter_optimization import (
+    get_cut_diagonal,
+    optimize_angles,
+    optimize_fourier_angles,
+    angles_to_fourier,
+)
+from models.dto import INTERPInitDTO, INTERPLadderDTO
+from models.base import OptimalAnglesResponseDTO, LadderLevelResponseDTO
 from utils.auth import authenticate_user
 
 router = APIRouter()
@@ -47,14 +56,94 @@ def get_interp_initialisation(dto: INTERPInitDTO = Body(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/graph/interp/ladder", tags=["INTERP"],
+             summary="Stream an Optimized INTERP/FOURIER Depth Ladder",
+             response_description="Newline-delimited JSON, one line with the optimized angles per level p, p + 1, .., p + k.",
+             responses={
+                 200: {"description": "Streams every level as soon as its optimization has converged.",
+                       "content": {"application/x-ndjson": {"example": {"beta": [0.35, 0.2], "gamma": [0.3, 0.6], "optimal_angles": False, "source": "INTERP",
+                                                                        "energy": 11.8, "initial_energy": 11.3, "nfev": 12, "ngev": 12, "nit": 7, "converged": True,
+                                                                        "p": 2, "u": None, "v": None}}}},
+                 400: {"description": "Invalid input data."},
+                 500: {"description": "Server error during angle calculation."}
+             },
+             dependencies=[Depends(authenticate_user)])
+def get_interp_ladder(dto: INTERPLadderDTO = Body(...)):
+    """
+    Endpoint to climb from the angles at level p (len(beta) = len(gamma) = p) to level p + k in one call.
+
+    Every level is optimized with the native statevector simulator and adjoint gradients, then the next level is initialised
+    with INTERP or with the FOURIER[q] reparameterisation, both from Zhou et al.: https://arxiv.org/abs/1812.01041
+    The result of each level, starting with level p itself, is streamed as one NDJSON line once it has converged.
+    If a level fails, the last line contains an "error" field.
+    """
+    try:
+        G = nx.from_numpy_array(np.array(dto.adjacency_matrix))
+        levels = interp_ladder(G, dto.beta, dto.gamma, dto.k, dto.strategy, dto.q,
+                               method=dto.method, maxiter=dto.maxiter, tol=dto.tol)
+        source = "INTERP" if dto.strategy == "interp" else "FOURIER"
+
+        def lines():
+            try:
+                for res in levels:
+                    yield LadderLevelResponseDTO(
+                        beta=list(res["beta"]),
+                        gamma=list(res["gamma"]),
+                        optimal_angles=False,
+                        source=source,
+                        energy=res["energy"],
+                        initial_energy=res["initial_energy"],
+                        nfev=res["nfev"],
+                        ngev=res["ngev"],
+                        nit=res["nit"],
+                        converged=res["converged"],
+                        p=res["p"],
+                        u=None if "u" not in res else list(res["u"]),
+                        v=None if "v" not in res else list(res["v"]),
+                    ).model_dump_json() + "\n"
+            except Exception as e:
+                yield json.dumps({"error": str(e)}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 def interp_p_series(angles: np.ndarray) -> np.ndarray:
     """
     Interpolates p-series of QAOA angles at level p to generate good initial guess for level p + 1.
+
+    new_angles[i] = i / p * angles[i - 1] + (1 - i / p) * angles[i] for i = 0..p, with angles[-1] = angles[p] = 0
     """
+    angles = np.asarray(angles, dtype=float)
     p = len(angles)
-    new_angles = np.zeros(p + 1)
-    new_angles[0] = angles[0]
-    for i in range(1, p):
-        new_angles[i] = i / p * angles[i - 1] + (1 - i / p) * angles[i]
-    new_angles[-1] = angles[-1]
-    return new_angles
\ No newline at end of file
+    padded = np.concatenate([[0.0], angles, [0.0]])
+    i = np.arange(p + 1)
+    return i / p * padded[i] + (1 - i / p) * padded[i + 1]
+
+def interp_ladder(G, beta, gamma, k, strategy="interp", q=None, **optimizer_options):
+    """
+    Optimizes the angles at level p = len(beta) and climbs to level p + k, yielding the result of every level
+
+    strategy "interp" initialises level p + 1 with `interp_p_series`; strategy "fourier" optimizes the
+    FOURIER[q] amplitudes u, v instead of the angles and pads them with zeros when q grows with p.
+    q = None gives FOURIER[infinity] with q = p. The cut diagonal is computed once for all levels.
+    """
+    diagonal = get_cut_diagonal(G)
+    p = len(beta)
+    if strategy == "interp":
+        for level in range(p, p + k + 1):
+            res = optimize_angles(G, beta, gamma, diagonal=diagonal, **optimizer_options)
+            yield dict(res, p=level)
+            beta, gamma = interp_p_series(res["beta"]), interp_p_series(res["gamma"])
+    elif strategy == "fourier":
+        u, v = angles_to_fourier(beta, gamma, p if q is None else q)
+        for level in range(p, p + k + 1):
+            size = level if q is None else min(q, level)
+            u, v = np.pad(u, (0, size - len(u))), np.pad(v, (0, size - len(v)))
+            res = optimize_fourier_angles(G, u, v, level, diagonal=diagonal, **optimizer_options)
+            yield dict(res, p=level)
+            u, v = res["u"], res["v"]
+    else:
+        raise ValueError(f"Unknown ladder strategy {strategy}")
@@ -0,0 +1,95 @@
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Body, Depends
+from fastapi.responses import StreamingResponse
+from models.dto import JobDTO
+from models.base import JobResponseDTO
+from utils.auth import authenticate_user
+from utils.jobs import job_manager, JobQueueFullError, TERMINAL_STATUSES
+
+router = APIRouter()
+
+def to_response(job):
+    return JobResponseDTO(**{k: v for k, v in job.items() if k not in ("key", "request")})
+
+def get_job_or_404(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@router.post("/jobs", response_model=JobResponseDTO, status_code=202, tags=["Jobs"],
+             summary="Submit a Long-Running Job",
+             response_description="The submitted job, or the existing job for an identical submission.",
+             responses={
+                 202: {"description": "Job accepted.",
+                       "content": {"application/json": {"example": {"id": "3f2b9c0e8d7a4f4f9a4b1c2d3e4f5a6b", "kind": "maxcut", "status": "queued",
+                                                                    "result": None, "error": None, "created": 1718000000.0, "updated": 1718000000.0}}}},
+                 400: {"description": "Invalid input data."},
+                 503: {"description": "The job queue is full."},
+                 500: {"description": "Server error during job submission."}
+             },
+             dependencies=[Depends(authenticate_user)])
+def submit_job(dto: JobDTO = Body(...)):
+    """
+    Endpoint to submit a brute-force MaxCut, angle optimization or p=1 landscape job that may take longer than an HTTP request.
+
+    Jobs run on a local process pool and their results are stored on disk. Submissions with the same graph (up to isomorphism),
+    p, kind and params are deduplicated and return the existing job. Poll `GET /jobs/{id}` or stream `GET /jobs/{id}/stream` for the result.
+    """
+    try:
+        job = job_manager.submit(dto.kind, dto.adjacency_matrix, dto.p, dto.params)
+        return to_response(job)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/{job_id}", response_model=JobResponseDTO, tags=["Jobs"],
+            summary="Get a Job",
+            response_description="The job status and, once done, its result.",
+            responses={404: {"description": "Unknown job."}},
+            dependencies=[Depends(authenticate_user)])
+def get_job(job_id: str):
+    """
+    Endpoint to poll the status and result of a job.
+    """
+    return to_response(get_job_or_404(job_id))
+
+@router.get("/jobs/{job_id}/stream", tags=["Jobs"],
+            summary="Stream a Job",
+            response_description="Newline-delimited JSON job states, one line per status change, ending with the final state.",
+            responses={404: {"description": "Unknown job."}},
+            dependencies=[Depends(authenticate_user)])
+async def stream_job(job_id: str):
+    """
+    Endpoint to stream the status changes of a job as NDJSON until it is done, failed or cancelled.
+    """
+    get_job_or_404(job_id)
+
+    async def states():
+        last_status = None
+        while True:
+            job = job_manager.get(job_id)
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield to_response(job).model_dump_json() + "\n"
+            if job["status"] in TERMINAL_STATUSES:
+                break
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(states(), media_type="application/x-ndjson")
+
+@router.delete("/jobs/{job_id}", response_model=JobResponseDTO, tags=["Jobs"],
+               summary="Cancel a Job",
+               response_description="The job after cancellation.",
+               responses={404: {"description": "Unknown job."}},
+               dependencies=[Depends(authenticate_user)])
+def cancel_job(job_id: str):
+    """
+    Endpoint to cancel a job. Queued jobs never run; a running job finishes in its worker but its result is discarded.
+    """
+    get_job_or_404(job_id)
+    return to_response(job_manager.cancel(job_id))
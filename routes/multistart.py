@@ -0,0 +1,96 @@
+from fastapi import APIRouter, HTTPException, Body, Depends
+import networkx as nx
+import numpy as np
+from QAOAKit.parameter_optimization import get_median_pre_trained_kde, multistart_optimize
+from models.dto import MultiStartDTO
+from models.base import MultiStartResponseDTO
+from routes.qaoakit import get_average_degree_and_weight, kde_to_qaoa_format
+from routes.tqa import get_tqa_schedule
+from utils.auth import authenticate_user
+from config import MULTISTART_MAX_WORKERS
+
+router = APIRouter()
+
+def sample_candidates(G, p, strategy, n_samples, rng):
+    """
+    Draws n_samples candidate angle sets of shape (n_samples, p) in qaoa format
+
+    kde: samples of the pre-trained KernelDensity, rescaled like the KDE median
+    random: beta uniform in [-pi/4, pi/4], gamma uniform in [-pi, pi]
+    tqa: TQA schedules with time step t_max / p uniform in [0.1, 1.5]; as the initial state is the
+         ground state of -sum_i X_i, the mixer angles are negated in qaoa format
+    """
+    if strategy == "kde":
+        _, kde = get_median_pre_trained_kde(p)
+        d_w, w = get_average_degree_and_weight(G)
+        samples = kde.sample(n_samples, random_state=rng.integers(2**31))
+        return kde_to_qaoa_format(samples, p, d_w, w)
+    elif strategy == "random":
+        beta = rng.uniform(-np.pi/4, np.pi/4, (n_samples, p))
+        gamma = rng.uniform(-np.pi, np.pi, (n_samples, p))
+        return beta, gamma
+    elif strategy == "tqa":
+        beta, gamma = get_tqa_schedule(p * rng.uniform(0.1, 1.5, n_samples), p)
+        return -beta, gamma
+    raise ValueError(f"Unknown multi-start strategy {strategy}")
+
+@router.post("/graph/multistart", response_model=MultiStartResponseDTO, tags=["Multi-start"],
+             summary="Best-of-K Multi-Start Angle Search",
+             response_description="The best optimized angles, the energies of all optimized candidates and the spread of the sampled energies.",
+             responses={
+                 200: {"description": "Successfully sampled, scored and optimized the candidates.",
+                       "content": {"application/json": {"example": {"beta": [-0.35], "gamma": [0.62], "optimal_angles": False, "source": "MultiStart_kde",
+                                                                    "energy": 11.8, "initial_energy": 10.2, "nfev": 9, "ngev": 9, "nit": 6, "converged": True,
+                                                                    "n_samples": 256, "optimized_energies": [11.8, 11.8, 11.3, 10.9],
+                                                                    "sample_energies": {"min": 2.1, "median": 6.4, "max": 10.2, "mean": 6.2, "std": 1.9}}}}},
+                 400: {"description": "Invalid input data."},
+                 500: {"description": "Server error during angle calculation."}
+             },
+             dependencies=[Depends(authenticate_user)])
+def get_multistart_angles(dto: MultiStartDTO = Body(...)):
+    """
+    Endpoint to run a best-of-K search for QAOA angles.
+
+    K candidates are drawn from the pre-trained KDE of QAOAKit or from the random or TQA strategies and their energies are
+    evaluated in one batched pass of the native statevector simulator. The top-m candidates are then optimized in parallel
+    on a process pool (MULTISTART_MAX_WORKERS processes) with adjoint gradients, and the best result is returned.
+    """
+    try:
+        G = nx.from_numpy_array(np.array(dto.adjacency_matrix))
+        rng = np.random.default_rng(dto.seed)
+        betas, gammas = sample_candidates(G, dto.p, dto.strategy, dto.n_samples, rng)
+        best, results, scores = multistart_optimize(
+            G,
+            betas,
+            gammas,
+            top_m=dto.top_m,
+            n_workers=MULTISTART_MAX_WORKERS,
+            method=dto.method,
+            maxiter=dto.maxiter,
+            tol=dto.tol,
+        )
+        return MultiStartResponseDTO(
+            beta=list(best["beta"]),
+            gamma=list(best["gamma"]),
+            optimal_angles=False,
+            source=f"MultiStart_{dto.strategy}",
+            energy=best["energy"],
+            initial_energy=best["initial_energy"],
+            nfev=best["nfev"],
+            ngev=best["ngev"],
+            nit=best["nit"],
+            converged=best["converged"],
+            n_samples=dto.n_samples,
+            optimized_energies=[res["energy"] for res in results],
+            sample_energies={
+                "min": float(np.min(scores)),
+                "median": float(np.median(scores)),
+                "max": float(np.max(scores)),
+                "mean": float(np.mean(scores)),
+                "std": float(np.std(scores)),
+            },
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
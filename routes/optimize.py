@@ -0,0 +1,58 @@
+from fastapi import APIRouter, HTTPException, Body, Depends
+import networkx as nx
+import numpy as np
+from QAOAKit.parameter_optimization import optimize_angles
+from models.dto import OptimizeDTO
+from models.base import OptimizedAnglesResponseDTO
+from utils.auth import authenticate_user
+
+router = APIRouter()
+
+@router.post("/graph/optimize", response_model=OptimizedAnglesResponseDTO, tags=["Optimize"],
+             summary="Refine QAOA Angles",
+             response_description="The refined beta and gamma angles, their energy and the optimizer statistics.",
+             responses={
+                 200: {"description": "Successfully refined the warm-start angles.",
+                       "content": {"application/json": {"example": {"beta": [0.35], "gamma": [0.62], "optimal_angles": False, "source": "Optimize",
+                                                                    "energy": 11.3, "initial_energy": 6.0, "nfev": 17, "ngev": 17, "nit": 9, "converged": True}}}},
+                 400: {"description": "Invalid input data."},
+                 500: {"description": "Server error during angle optimization."}
+             },
+             dependencies=[Depends(authenticate_user)])
+def get_optimized_angles(dto: OptimizeDTO = Body(...)):
+    """
+    Endpoint to refine warm-start QAOA angles on the server, e.g. the output of any initialisation strategy.
+
+    The MaxCut energy is maximized with the native statevector simulator. Gradients for all 2p angles
+    are computed with the adjoint method (one forward and one backward sweep), and either L-BFGS-B
+    or Adam with early stopping is used.
+
+    Angles follow the QAOAKit convention: each layer applies exp(-i gamma sum_ij w_ij Z_i Z_j) followed by exp(-i beta sum_i X_i).
+    """
+    try:
+        G = nx.from_numpy_array(np.array(dto.adjacency_matrix))
+        res = optimize_angles(
+            G,
+            dto.beta,
+            dto.gamma,
+            method=dto.method,
+            maxiter=dto.maxiter,
+            tol=dto.tol,
+            learning_rate=dto.learning_rate,
+        )
+        return OptimizedAnglesResponseDTO(
+            beta=list(res["beta"]),
+            gamma=list(res["gamma"]),
+            optimal_angles=False,
+            source="Optimize",
+            energy=res["energy"],
+            initial_energy=res["initial_energy"],
+            nfev=res["nfev"],
+            ngev=res["ngev"],
+            nit=res["nit"],
+            converged=res["converged"],
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -12,6 +12,34 @@ from utils.auth import authenticate_user
 
 router = APIRouter()
 
+def get_average_degree_and_weight(graph):
+    """Average node degree and average absolute edge (and node) weight used to rescale the KDE gammas"""
+    d_w = 0
+    no_nodes = 0
+    no_weighted_nodes = 0
+    w = 0
+    no_edges = 0
+    for (node, weight) in graph.nodes(data="weight"):
+        d_w += graph.degree(node)
+        if weight is not None:
+            w += abs(weight)
+            no_weighted_nodes += 1
+        no_nodes += 1
+    for (u, v, data) in graph.edges(data=True):
+        w += abs(data["weight"])
+        no_edges += 1
+
+    d_w /= no_nodes  # average node degree
+    w /= no_edges  # average edge weight
+    return d_w, w
+
+def kde_to_qaoa_format(x, p, d_w, w):
+    """Converts KDE points [gamma_1..gamma_p, beta_1..beta_p], a single point or an array of shape (K, 2p), to qaoa format beta, gamma"""
+    x = np.asarray(x)
+    beta = beta_to_qaoa_format(x[..., p:])
+    gamma = gamma_to_qaoa_format(x[..., :p] * np.arctan(1/np.sqrt(d_w-1)) / w)
+    return beta, gamma
+
 @router.post("/graph/QAOAKit/optimal_angles_kde", response_model=OptimalAnglesResponseDTO, tags=["QAOAKit"],
              summary="Get Optimal Angles from QAOAKit using the KDE Estimation",
              response_description="The optimal beta and gamma angles for the QAOA algorithm.",
@@ -31,30 +59,12 @@ def get_optimal_angles_kde(dto: QAOAKitKDEDTO = Body(...)):
     try:
         adjacency_matrix = np.array(dto.adjacency_matrix)
         G = nx.from_numpy_array(adjacency_matrix)
-        graph = G
         qaoa_depth = dto.p
 
-        d_w = 0
-        no_nodes = 0
-        no_weighted_nodes = 0
-        w = 0
-        no_edges = 0
-        for (node, weight) in graph.nodes(data="weight"):
-            d_w += graph.degree(node)
-            if weight is not None:
-                w += abs(weight)
-                no_weighted_nodes += 1
-            no_nodes += 1
-        for (u, v, data) in graph.edges(data=True):
-            w += abs(data["weight"])
-            no_edges += 1
-        
-        d_w /= no_nodes  # average node degree
-        w /= no_edges  # average edge weight
+        d_w, w = get_average_degree_and_weight(G)
         median, kde = get_median_pre_trained_kde(qaoa_depth)
         params = {}
-        params["beta"] = beta_to_qaoa_format(median[qaoa_depth:])
-        params["gamma"] = gamma_to_qaoa_format(median[:qaoa_depth] * np.arctan(1/np.sqrt(d_w-1)) / w)
+        params["beta"], params["gamma"] = kde_to_qaoa_format(median, qaoa_depth, d_w, w)
 
         return OptimalAnglesResponseDTO(beta=params["beta"], gamma=params["gamma"], source="QAOAKit_KDE", optimal_angles=False)
 
@@ -1,18 +1,100 @@
 from fastapi import APIRouter, HTTPException, Body, Depends
 from fastapi.security import HTTPBasic
+import networkx as nx
 import numpy as np
+from QAOAKit.parameter_optimization import get_cut_diagonal
+from QAOAKit.simulators import get_qaoa_energies, qaoa_maxcut_energy_p1
 from models.dto import TQADTO
-from models.base import OptimalAnglesResponseDTO
+from models.base import TQAResponseDTO
 from utils.auth import authenticate_user
 
 router = APIRouter()
 
-@router.post("/graph/tqa_initialisation", response_model=OptimalAnglesResponseDTO, tags=["TQA"],
+# Largest graph for which schedules with p > 1 are evaluated on the statevector simulator
+MAX_TQA_AUTO_QUBITS = 24
+INVERSE_GOLDEN_RATIO = (np.sqrt(5) - 1) / 2
+
+def get_tqa_schedule(t_max, p):
+    """
+    TQA angles beta_i = (1 - t_i / t_max) dt, gamma_i = (t_i / t_max) dt with dt = t_max / p and t_i = (i - 1/2) dt
+
+    A scalar t_max gives arrays of shape (p,), an array of T values gives arrays of shape (T, p)
+    """
+    t_max = np.asarray(t_max, dtype=float)
+    s = (np.arange(1, p + 1) - 0.5) / p
+    dt = t_max[..., None] / p
+    return (1 - s) * dt, s * dt
+
+def get_tqa_energies(G, diagonal, t_max, p):
+    """
+    Energies of the TQA schedules for an array of t_max values in one batched pass
+
+    The initial state is the ground state of -sum_i X_i, so in qaoa format (`angles_to_qaoa_format`)
+    the schedule is evaluated with negated beta. p = 1 uses the closed-form evaluator.
+    """
+    beta, gamma = get_tqa_schedule(t_max, p)
+    if p == 1:
+        return qaoa_maxcut_energy_p1(G, -beta[:, 0], gamma[:, 0])
+    return get_qaoa_energies(diagonal, -beta, gamma)
+
+def tune_tqa_t_max(G, p, t_max_bounds=None, n_scan=32, rtol=1e-3, max_refinements=20):
+    """
+    Finds the t_max whose TQA schedule has the highest energy
+
+    All n_scan values of a uniform grid over t_max_bounds (default [0.1 p, 2 p]) are evaluated
+    in one batched pass, then golden-section search refines t_max between the neighbours of the
+    best grid point until the bracket is narrower than rtol * t_max.
+
+    Returns
+    -------
+    res : dict
+        't_max', 'energy': best point; 'nfev': number of evaluated schedules;
+        'scan': {'t_max': [...], 'energy': [...]} of all evaluated points sorted by t_max
+    """
+    if p > 1 and G.number_of_nodes() > MAX_TQA_AUTO_QUBITS:
+        raise ValueError(f"t_max 'auto' supports graphs with at most {MAX_TQA_AUTO_QUBITS} nodes for p > 1")
+    if t_max_bounds is None:
+        t_max_bounds = (0.1 * p, 2.0 * p)
+    diagonal = None if p == 1 else get_cut_diagonal(G)
+    grid = np.linspace(*t_max_bounds, n_scan)
+    energies = get_tqa_energies(G, diagonal, grid, p)
+    points = dict(zip(grid, energies))
+
+    def energy(t_max):
+        points[t_max] = get_tqa_energies(G, diagonal, [t_max], p)[0]
+        return points[t_max]
+
+    best = int(np.argmax(energies))
+    a, b = grid[max(best - 1, 0)], grid[min(best + 1, n_scan - 1)]
+    c, d = b - INVERSE_GOLDEN_RATIO * (b - a), a + INVERSE_GOLDEN_RATIO * (b - a)
+    energy_c, energy_d = energy(c), energy(d)
+    for _ in range(max_refinements):
+        if b - a < rtol * (a + b) / 2:
+            break
+        if energy_c > energy_d:
+            b, d, energy_d = d, c, energy_c
+            c = b - INVERSE_GOLDEN_RATIO * (b - a)
+            energy_c = energy(c)
+        else:
+            a, c, energy_c = c, d, energy_d
+            d = a + INVERSE_GOLDEN_RATIO * (b - a)
+            energy_d = energy(d)
+
+    t_max = max(points, key=points.get)
+    scan = sorted(points.items())
+    return {
+        "t_max": float(t_max),
+        "energy": float(points[t_max]),
+        "nfev": len(points),
+        "scan": {"t_max": [float(x) for x, _ in scan], "energy": [float(y) for _, y in scan]},
+    }
+
+@router.post("/graph/tqa_initialisation", response_model=TQAResponseDTO, tags=["TQA"],
              summary="Get TQA Initialisation Angles",
              response_description="The TQA initialisation beta and gamma angles for the QAOA algorithm.",
              responses={
                  200: {"description": "Successfully calculated and returned the TQA initialisation angles.",
-                       "content": {"application/json": {"example": {"beta": [0.1, 0.2, 0.3, 0.4], "gamma": [0.4, 0.3, 0.2, 0.1], "source": "TQA"}}}},
+                       "content": {"application/json": {"example": {"beta": [0.1, 0.2, 0.3, 0.4], "gamma": [0.4, 0.3, 0.2, 0.1], "source": "TQA", "t_max": 1.0}}}},
                  400: {"description": "Invalid input data."},
                  500: {"description": "Server error during angle calculation."}
              },
@@ -36,27 +118,34 @@ def get_tqa_initialisation(dto: TQADTO = Body(...)):
     The number of layers and total annealing time are extracted from the input.
     
     To read more about the TQA method checkout the paper by Sack et al.: https://arxiv.org/abs/2101.05742
+
+    With t_max set to "auto", the schedules for a grid of n_scan values of t_max in t_max_bounds are evaluated in one batched pass
+    (in closed form at p = 1, on the native statevector simulator otherwise) and the best t_max is refined with golden-section search.
+    The response then also contains the energy of the returned schedule and the scanned curve. Energies are those of the
+    schedule in qaoa format, which negates beta since the initial state is the ground state of -sum_i X_i.
     """
     try:
         # Extract number of layers and total annealing time from input
         p = dto.p
         t_max = dto.t_max
-        
-        # Calculate time step
-        dt = t_max / p
-        
-        # Calculate time points
-        t = dt * (np.arange(1, p + 1) - 0.5)
-        
+        tuning = None
+        if t_max == "auto":
+            G = nx.from_numpy_array(np.array(dto.adjacency_matrix))
+            tuning = tune_tqa_t_max(G, p, dto.t_max_bounds, dto.n_scan)
+            t_max = tuning["t_max"]
+
         # Calculate gamma and beta values
-        gamma = (t / t_max) * dt
-        beta = (1 - (t / t_max)) * dt
+        beta, gamma = get_tqa_schedule(t_max, p)
         
         # Create response
-        return OptimalAnglesResponseDTO(
+        return TQAResponseDTO(
             beta=list(beta),
             gamma=list(gamma),
-            source="TQA"
+            source="TQA",
+            t_max=t_max,
+            energy=None if tuning is None else tuning["energy"],
+            nfev=None if tuning is None else tuning["nfev"],
+            scan=None if tuning is None else tuning["scan"],
         )
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
@@ -0,0 +1,410 @@
+import json
+import pickle
+import pytest
+import networkx as nx
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from QAOAKit.build_tables import (
+    MANIFEST_FILE,
+    build_tables,
+    certify_graph_shard,
+    get_graph_shards,
+    get_graph_file,
+    get_table_inputs,
+)
+from QAOAKit.graph_store import graph_to_bitmask
+from QAOAKit.weighted_store import WeightedDatasetStore
+from QAOAKit.parameter_optimization import train_kde
+from QAOAKit.utils import (
+    beta_to_qaoa_format,
+    gamma_to_qaoa_format,
+    get_canonical_graph_hash,
+    get_weighted_opt_angles,
+    opt_angles_for_graph,
+    qaoa_maxcut_energy,
+    load_weights_into_dataframe,
+    load_weighted_results_into_dataframe,
+    full_qaoa_dataset_arrays_to_frame,
+    get_pynauty_certificate,
+    get_results_file,
+    iter_graph_file,
+    load_results_file_into_dataframe,
+    lookup_table_handler,
+    read_graph_from_file,
+)
+
+graph_counts = {3: 2, 4: 6, 5: 21}
+
+
+def write_graph_file(path, graphs):
+    with open(path, "w") as f:
+        for graph_id, G in enumerate(graphs, start=1):
+            n = G.number_of_nodes()
+            f.write(f"\nGraph {graph_id}, order {n}.\n")
+            for u in range(n - 1):
+                f.write("".join(str(int(G.has_edge(u, v))) for v in range(u + 1, n)))
+                f.write("\n")
+
+
+@pytest.fixture
+def data_folder(tmp_path):
+    rng = np.random.default_rng(0)
+    dataset = Path(tmp_path, "qaoa-dataset-version1")
+    Path(dataset, "Graphs").mkdir(parents=True)
+    for n, count in graph_counts.items():
+        graphs = [
+            G
+            for G in nx.graph_atlas_g()
+            if G.number_of_nodes() == n and nx.is_connected(G)
+        ]
+        assert len(graphs) == count
+        write_graph_file(Path(dataset, f"Graphs/graph{n}c.txt"), graphs)
+        for p in (1, 2):
+            Path(dataset, f"Results/p={p}").mkdir(parents=True, exist_ok=True)
+            with open(Path(dataset, f"Results/p={p}/n={n}_p={p}.txt"), "w") as f:
+                for graph_id in range(1, count + 1):
+                    angles = " ".join(f"{x:.6f}" for x in rng.uniform(-1, 1, 2 * p))
+                    f.write(f"{graph_id} 3.0 2.0 2.5 0.5 {p} {angles}\n")
+
+    Path(tmp_path, "3_regular").mkdir()
+    row = {"edges": list(nx.complete_graph(4).edges()), "0": {"MaxCut": 4}}
+    for p in range(1, 11):
+        row[str(p)] = {
+            "fixed_val": 3.0,
+            "optimized_val": 3.5,
+            "angles": [{"beta": [0.1] * p, "gamma": [0.2] * p}],
+        }
+    with open(Path(tmp_path, "3_regular/3r_WURTZ_ensemble.json"), "w") as f:
+        json.dump([row], f)
+    return tmp_path
+
+
+def test_iter_graph_file(data_folder):
+    with open(get_graph_file(5, data_folder)) as f:
+        expected = [read_graph_from_file(f, expected_nnodes=5) for _ in range(21)]
+    assert [d["edge_id"] for _, _, d in expected[-1][0].edges(data=True)] == list(
+        range(expected[-1][0].number_of_edges())
+    )
+
+    batches = list(iter_graph_file(get_graph_file(5, data_folder), 5, batch_size=8))
+    assert [len(graph_ids) for graph_ids, _ in batches] == [8, 8, 5]
+    graph_ids = np.concatenate([graph_ids for graph_ids, _ in batches])
+    bitmasks = np.concatenate([bitmasks for _, bitmasks in batches])
+    assert graph_ids.tolist() == [graph_id for _, graph_id in expected]
+    assert bitmasks.tolist() == [graph_to_bitmask(G) for G, _ in expected]
+
+    ((graph_ids, bitmasks),) = iter_graph_file(
+        get_graph_file(5, data_folder), 5, start=3, stop=7
+    )
+    assert graph_ids.tolist() == [4, 5, 6, 7]
+    with pytest.raises(ValueError):
+        next(iter_graph_file(get_graph_file(5, data_folder), 4))
+
+
+def test_load_results_file_into_dataframe(data_folder):
+    df = load_results_file_into_dataframe(4, 2, data_folder)
+    assert df.index.name == "graph_id" and len(df) == 6
+    assert list(df.columns) == [
+        "C_{true opt}",
+        "C_init",
+        "C_opt",
+        "pr(max)",
+        "p",
+        "p_max",
+        "beta",
+        "gamma",
+    ]
+    line = get_results_file(4, 2, data_folder).read_text().splitlines()[2].split()
+    row = df.loc[int(line[0])]
+    assert row["C_opt"] == float(line[3]) and row["p"] == 2 and row["p_max"] == 2
+    assert row["beta"].tolist() == [float(x) for x in line[6:8]]
+    assert row["gamma"].tolist() == [float(x) for x in line[8:10]]
+
+
+def test_certify_graph_shard(data_folder):
+    with open(get_graph_file(5, data_folder)) as f:
+        expected = [read_graph_from_file(f, expected_nnodes=5) for _ in range(21)]
+
+    shards = get_graph_shards({5: 21}, shard_size=4)
+    assert len(shards) == 6
+    records = [r for shard in shards for r in certify_graph_shard(*shard, data_folder)]
+    assert [r[0] for r in records] == [graph_id for _, graph_id in expected]
+    for (_, cert, bitmask), (G, _) in zip(records, expected):
+        assert cert == get_pynauty_certificate(G)
+        assert bitmask == graph_to_bitmask(G)
+
+
+def test_build_tables(data_folder, monkeypatch):
+    timer = build_tables(
+        data_folder, n_workers=2, p_range=(1, 2), graph_counts=graph_counts
+    )
+    assert "parse and certify graphs" in timer.stages
+
+    lookup_tables = Path(data_folder, "lookup_tables")
+    graph2pynauty = pickle.load(open(Path(lookup_tables, "graph2pynauty.p"), "rb"))
+    assert len(graph2pynauty) == sum(graph_counts.values())
+    graph2angles = pickle.load(open(Path(lookup_tables, "graph2angles.p"), "rb"))
+    assert len(graph2angles[4][2]) == 6
+    assert len(graph2angles[4][2][1]["beta"]) == 2
+
+    for n, count in graph_counts.items():
+        table = pickle.load(
+            open(Path(lookup_tables, f"graph2pynauty_large_{n}.p"), "rb")
+        )
+        assert len(table["graph_store"]) == count
+        with open(get_graph_file(n, data_folder)) as f:
+            for _ in range(count):
+                G, graph_id = read_graph_from_file(f, expected_nnodes=n)
+                cert = table["graph_id2pynautycert"][graph_id]
+                assert cert == get_pynauty_certificate(G)
+                assert graph2pynauty[cert] == graph_id
+                assert table["pynautycert2graph_id"][cert] == graph_id
+                H = table["graph_store"].get_graph(graph_id)
+                assert list(H.edges(data=True)) == list(G.edges(data=True))
+
+    with np.load(Path(lookup_tables, "full_qaoa_dataset_table.npz")) as f:
+        arrays = dict(f)
+    assert len(arrays["graph_id"]) == 2 * sum(graph_counts.values())
+    assert arrays["beta"].shape == (2 * sum(graph_counts.values()), 2)
+    df = full_qaoa_dataset_arrays_to_frame(arrays)
+    assert df.index.is_unique
+    table = pickle.load(open(Path(lookup_tables, "graph2pynauty_large_5.p"), "rb"))
+    for graph_id, cert in table["graph_id2pynautycert"].items():
+        row = df.loc[(cert, 2)]
+        assert row["graph_id"] == graph_id and row["n"] == 5
+        angles = graph2angles[5][2][graph_id]
+        assert np.array_equal(row["beta"], angles["beta"])
+        assert np.array_equal(row["gamma"], angles["gamma"])
+        assert row["graph_bitmask"] == table["graph_store"].get_bitmasks(graph_id)
+    assert len(df.xs(1, level="p_max")["beta"].iloc[0]) == 1
+
+    # train_kde reads the same columns without building the DataFrame
+    monkeypatch.setattr(lookup_table_handler, "full_qaoa_dataset_arrays", arrays)
+    median, kde = train_kde(2, 5, bandwidth_range=[0.1, 1.0])
+    assert median.shape == (4,)
+    assert kde.sample(3).shape == (3, 4)
+
+    df_3_reg = pd.read_pickle(Path(lookup_tables, "3_reg_dataset_table.p"))
+    assert len(df_3_reg) == 10
+
+
+def get_mtimes(folder):
+    files = list(folder.glob("*.p")) + list(folder.glob("*.npz"))
+    return {f.name: f.stat().st_mtime_ns for f in files}
+
+
+def test_build_tables_incremental(data_folder, capsys):
+    options = dict(n_workers=1, p_range=(1, 2), graph_counts=graph_counts)
+    build_tables(data_folder, **options)
+    lookup_tables = Path(data_folder, "lookup_tables")
+    manifest = json.load(open(Path(lookup_tables, MANIFEST_FILE)))
+    assert set(manifest) == set(get_table_inputs(data_folder, (1, 2), graph_counts))
+    assert not Path(lookup_tables, "shards").exists()
+    mtimes = get_mtimes(lookup_tables)
+
+    timer = build_tables(data_folder, **options)
+    assert set(timer.stages) == {"download", "hash inputs"}
+    assert get_mtimes(lookup_tables) == mtimes
+
+    # changing a results file rebuilds only the tables built from results
+    results_file = get_results_file(4, 2, data_folder)
+    results_file.write_text(results_file.read_text().replace(" 0.5 ", " 0.25 "))
+    capsys.readouterr()
+    build_tables(data_folder, **options)
+    assert (
+        "Tables to build: full_qaoa_dataset_table.npz, graph2angles.p"
+        in capsys.readouterr().out
+    )
+    for name, mtime in mtimes.items():
+        changed = name in ("full_qaoa_dataset_table.npz", "graph2angles.p")
+        assert (Path(lookup_tables, name).stat().st_mtime_ns != mtime) == changed
+    with np.load(Path(lookup_tables, "full_qaoa_dataset_table.npz")) as f:
+        rows = (f["n"] == 4) & (f["p_max"] == 2)
+        assert (f["pr_max"][rows] == 0.25).all()
+
+
+def test_build_tables_resumes_from_shards(data_folder, capsys):
+    options = dict(n_workers=1, p_range=(1, 2), graph_counts=graph_counts)
+    inputs = get_table_inputs(data_folder, (1, 2), graph_counts)
+    # checkpoint of a build interrupted after certifying the n = 5 graphs
+    shards_folder = Path(data_folder, "lookup_tables/shards")
+    shards_folder.mkdir(parents=True)
+    records = certify_graph_shard(5, 0, 21, data_folder)
+    digest = inputs["graph2pynauty_large_5.p"][:16]
+    with open(Path(shards_folder, f"graph5_0_21_{digest}.p"), "wb") as f:
+        pickle.dump(records, f)
+
+    build_tables(data_folder, **options)
+    assert "Resuming from 1 of 3 shards" in capsys.readouterr().out
+    table = pickle.load(
+        open(Path(data_folder, "lookup_tables/graph2pynauty_large_5.p"), "rb")
+    )
+    assert list(table["graph_id2pynautycert"].items()) == [
+        (graph_id, cert) for graph_id, cert, _ in records
+    ]
+
+
+def write_weighted_angle_dat(folder, graphs_file):
+    """Writes weights and results files for two weightings of the graphs with 4 nodes
+
+    Returns
+    -------
+    graphs : dict
+        Maps graph_id to the unweighted graph read from graphs_file
+    """
+    folder.mkdir(parents=True)
+    with open(graphs_file) as f:
+        graphs = dict(read_graph_from_file(f)[::-1] for _ in range(6))
+    rng = np.random.default_rng(1)
+    weight_lines, result_lines = [], []
+    for graph_id, G in graphs.items():
+        for _ in range(2):
+            weights = rng.integers(1, 3, G.number_of_edges() + 2).astype(float)
+            weight_lines.append(" ".join(map(str, [graph_id, *weights])))
+            weight_id = len(weight_lines)
+            H = nx.Graph(G)
+            for u, v, d in H.edges(data=True):
+                d["weight"] = weights[d["edge_id"]]
+            beta, gamma = rng.uniform(-0.5, 0.5, 2), rng.uniform(-0.5, 0.5, 2)
+            energy = qaoa_maxcut_energy(
+                H, beta_to_qaoa_format(beta), gamma_to_qaoa_format(gamma)
+            )
+            w = weights[: G.number_of_edges()]
+            values = [graph_id, weight_id, 5, 1, energy, 0.5, 2, *beta, *gamma]
+            result_lines.append(" ".join(map(str, values + [w.mean(), w.std()])))
+    Path(folder, "weights_4.txt").write_text("\n".join(weight_lines) + "\n")
+    Path(folder, "QAOA_dat_weighted_4").write_text("\n".join(result_lines) + "\n")
+    return graphs
+
+
+def test_load_weighted_results_into_dataframe(data_folder):
+    folder = Path(data_folder, "weighted_angle_dat")
+    graphs_file = get_graph_file(4, data_folder)
+    graphs = write_weighted_angle_dat(folder, graphs_file)
+
+    df_weights = load_weights_into_dataframe(folder)
+    df = load_weighted_results_into_dataframe(
+        folder, 2, 4, df_weights, graphs_file_path=graphs_file
+    )
+    assert len(df) == 12
+    for row in df.itertuples():
+        assert len(row.weights) == row.G.number_of_edges()
+        for u, v, d in row.G.edges(data=True):
+            assert d["weight"] == row.weights[d["edge_id"]]
+        assert row.beta.shape == (2,)
+    # the graphs passed in are left unchanged
+    assert all(
+        "weight" not in d for G in graphs.values() for _, _, d in G.edges(data=True)
+    )
+
+    df_weights = pd.concat([df_weights, df_weights.head(1)])
+    with pytest.raises(ValueError, match=r"unexpected number \(2\)"):
+        load_weighted_results_into_dataframe(
+            folder, 2, 4, df_weights, graphs_file_path=graphs_file
+        )
+
+
+def test_weighted_transfer_store(data_folder):
+    rng = np.random.default_rng(1)
+    rows = []
+    for n in (4, 5, 6):
+        G = nx.cycle_graph(n)
+        for u, v in G.edges():
+            G[u][v]["weight"] = round(rng.uniform(0, 1), 6)
+        for p in (1, 2):
+            rows.append(
+                {
+                    "G_json": nx.node_link_data(G),
+                    "p_max": p,
+                    "beta": rng.uniform(-1, 1, p).tolist(),
+                    "gamma": rng.uniform(-1, 1, p).tolist(),
+                    "C_opt": float(n),
+                }
+            )
+    Path(data_folder, "transfer_qaoa_weighted").mkdir()
+    pd.DataFrame(rows).to_json(
+        Path(data_folder, "transfer_qaoa_weighted/all_transfer.zip")
+    )
+
+    build_tables(data_folder, n_workers=1, p_range=(1, 2), graph_counts=graph_counts)
+    store = WeightedDatasetStore(Path(data_folder, "lookup_tables/weighted_transfer"))
+    assert len(store) == 6
+    assert "G" not in store.meta and "G_json" not in store.meta
+
+    G = nx.node_link_graph(rows[2]["G_json"])
+    # the lookup is invariant under relabelling the nodes
+    H = nx.relabel_nodes(G, {u: (u + 2) % 5 for u in G.nodes()})
+    df = store.lookup(H, 2)
+    assert len(df) == 1
+    assert np.allclose(df["beta"].iloc[0], rows[3]["beta"])
+    assert nx.utils.edges_equal(df["G"].iloc[0].edges(data=True), G.edges(data=True))
+    assert store.lookup(H, 3) is None
+
+    weights = [w for _, _, w in G.edges(data="weight")]
+    assert np.isclose(df["mean(weight)"].iloc[0], np.mean(weights))
+    assert np.isclose(df["std(weight)"].iloc[0], np.std(weights))
+
+    batches = list(store.scan(p=1, batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert all(batch["p_max"].eq(1).all() for batch in batches)
+    ((df,),) = [list(store.scan(n=[6], p=1, with_graphs=False))]
+    assert len(df) == 1 and "G" not in df
+    low = store.meta["mean(weight)"].median()
+    (df,) = store.scan(mean_weight=(low, np.inf))
+    assert (df["mean(weight)"] >= low).all() and len(df) >= 3
+
+
+def test_weighted_opt_angles(data_folder, monkeypatch):
+    write_weighted_angle_dat(
+        Path(data_folder, "weighted_angle_dat/2"), get_graph_file(4, data_folder)
+    )
+    build_tables(data_folder, n_workers=1, p_range=(1, 2), graph_counts=graph_counts)
+    lookup_tables = Path(data_folder, "lookup_tables")
+    monkeypatch.setattr(
+        lookup_table_handler,
+        "weighted_stores",
+        {
+            "weighted_angle_dat": WeightedDatasetStore(
+                Path(lookup_tables, "weighted_angle_dat")
+            ),
+            "weighted_transfer": None,
+        },
+    )
+
+    df = load_weighted_results_into_dataframe(
+        Path(data_folder, "weighted_angle_dat/2"),
+        2,
+        4,
+        load_weights_into_dataframe(Path(data_folder, "weighted_angle_dat/2")),
+        graphs_file_path=get_graph_file(4, data_folder),
+    )
+    rng = np.random.default_rng(2)
+    for row in df.itertuples():
+        perm = rng.permutation(4)
+        H = nx.Graph()
+        H.add_nodes_from(range(4))
+        H.add_edges_from(
+            nx.relabel_nodes(row.G, dict(enumerate(perm))).edges(data=True)
+        )
+        angles = opt_angles_for_graph(H, 2)
+        assert angles["source"] == "weighted_lookup_table"
+        assert angles["optimal_angles"]
+        # the angles of a graph with the same weighted isomorphism class
+        assert np.isclose(
+            qaoa_maxcut_energy(
+                H,
+                beta_to_qaoa_format(angles["beta"]),
+                gamma_to_qaoa_format(angles["gamma"]),
+            ),
+            df[
+                [
+                    get_canonical_graph_hash(G) == get_canonical_graph_hash(H)
+                    for G in df["G"]
+                ]
+            ]["C_opt"].max(),
+        )
+    assert get_weighted_opt_angles(H, 1) is None
+    H[0][next(iter(H[0]))]["weight"] = 0.5
+    assert get_weighted_opt_angles(H, 2) is None
@@ -0,0 +1,78 @@
+import pytest
+import networkx as nx
+import numpy as np
+
+from QAOAKit.classical import (
+    thompson_parekh_marwaha,
+    maxcut_brute_force,
+    local_search_maxcut,
+    goemans_williamson_maxcut,
+    sample_goemans_williamson_cuts,
+    sdp_embedding_cache,
+)
+from QAOAKit.classical.thompson_parekh_marwaha import get_girth
+
+
+def cut_value(G, x):
+    return sum(d.get("weight", 1) for u, v, d in G.edges(data=True) if x[u] != x[v])
+
+
+@pytest.mark.parametrize(
+    "G",
+    [
+        nx.petersen_graph(),
+        nx.heawood_graph(),
+        nx.complete_graph(5),
+        nx.random_regular_graph(3, 40, seed=2),
+    ],
+)
+def test_girth(G):
+    assert get_girth(G) == min(len(c) for c in nx.minimum_cycle_basis(G))
+    assert get_girth(nx.path_graph(5)) == np.inf
+
+
+def test_thompson_parekh_marwaha():
+    G = nx.random_regular_graph(3, 50, seed=1)
+    x, expected_fraction = thompson_parekh_marwaha(G, nsamples=300, batch_size=64)
+    assert x.shape == (300, 50)
+    assert set(np.unique(x)) <= {0, 1}
+    fractions = [cut_value(G, sample) / G.number_of_edges() for sample in x]
+    assert abs(np.mean(fractions) - expected_fraction) < 0.02
+
+
+def test_goemans_williamson_bounds_and_cache():
+    pytest.importorskip("cvxpy")
+    G = nx.erdos_renyi_graph(10, 0.5, seed=3)
+    rng = np.random.default_rng(0)
+    for u, v in G.edges():
+        G[u][v]["weight"] = rng.random()
+    value, x, bound = goemans_williamson_maxcut(G, nsamples=500, chunk_size=64, seed=1)
+    optimum, _ = maxcut_brute_force(G)
+    assert np.isclose(cut_value(G, x), value)
+    assert 0.878 * bound <= value <= optimum + 1e-9 <= bound + 1e-6
+
+    # a relabelled copy is answered from the cache
+    n_entries = len(sdp_embedding_cache.entries)
+    H = nx.relabel_nodes(G, dict(enumerate(rng.permutation(10))))
+    for cuts, values in sample_goemans_williamson_cuts(H, 100, chunk_size=40):
+        assert len(cuts) <= 40
+        for x, value in zip(cuts, values):
+            assert np.isclose(cut_value(H, x), value)
+    assert len(sdp_embedding_cache.entries) == n_entries
+
+
+def test_local_search_finds_local_optima():
+    G = nx.erdos_renyi_graph(14, 0.4, seed=1)
+    rng = np.random.default_rng(0)
+    for u, v in G.edges():
+        G[u][v]["weight"] = rng.random()
+    x, values = local_search_maxcut(G, rng.integers(0, 2, (20, 14)))
+    optimum, _ = maxcut_brute_force(G)
+    for cut, value in zip(x, values):
+        assert np.isclose(cut_value(G, cut), value)
+        assert value <= optimum + 1e-9
+        # no single flip improves the cut
+        for i in range(14):
+            flipped = cut.copy()
+            flipped[i] ^= 1
+            assert cut_value(G, flipped) <= value + 1e-9
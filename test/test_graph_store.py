@@ -0,0 +1,48 @@
+import pytest
+import networkx as nx
+import numpy as np
+
+from QAOAKit.graph_store import (
+    GraphStore,
+    bitmask_to_graph,
+    get_edge_counts,
+    graph_to_bitmask,
+)
+
+
+def test_graph_bitmask_roundtrip():
+    for G in nx.graph_atlas_g()[1:200]:
+        n = G.number_of_nodes()
+        bitmask = graph_to_bitmask(G)
+        H = bitmask_to_graph(bitmask, n)
+        assert sorted(H.edges()) == sorted(G.edges())
+        assert [d["edge_id"] for _, _, d in H.edges(data=True)] == list(
+            range(G.number_of_edges())
+        )
+        assert get_edge_counts(np.array([bitmask]))[0] == G.number_of_edges()
+    assert graph_to_bitmask(nx.complete_graph(11)) == np.uint64(2**55 - 1)
+
+
+def test_graph_store():
+    graphs = [G for G in nx.graph_atlas_g() if G.number_of_nodes() == 6]
+    graph_ids = np.arange(len(graphs))[::-1] + 10
+    store = GraphStore(6, graph_ids, [graph_to_bitmask(G) for G in graphs])
+    assert len(store) == len(graphs) and 10 in store and 9 not in store
+
+    edges, offsets = store.get_edges(graph_ids)
+    w = store.get_adjacency_matrices(graph_ids)
+    for i, (graph_id, G) in enumerate(zip(graph_ids, graphs)):
+        assert sorted(map(tuple, edges[offsets[i] : offsets[i + 1]])) == sorted(
+            G.edges()
+        )
+        assert np.array_equal(w[i], nx.to_numpy_array(G, nodelist=range(6)))
+
+    G = store.get_graph(graph_ids[5])
+    assert sorted(G.edges()) == sorted(graphs[5].edges())
+    with pytest.raises(nx.NetworkXError):
+        G.add_edge(0, 1)
+    H = nx.Graph(G)
+    H.add_edge(0, 1)
+    assert store.get_graph(graph_ids[5]).number_of_edges() == G.number_of_edges()
+    with pytest.raises(KeyError):
+        store.get_bitmasks([10, 9])
@@ -0,0 +1,185 @@
+import pytest
+import networkx as nx
+import numpy as np
+
+from QAOAKit import qaoa_maxcut_energy
+from QAOAKit.simulators import (
+    get_symmetric_structure,
+    qaoa_maxcut_energy_symmetric,
+    qaoa_maxcut_energy_mps,
+    qaoa_maxcut_energy_statevector,
+    get_maxcut_diagonal,
+    get_indexed_maxcut_diagonal,
+    qaoa_maxcut_energy_p1,
+)
+from QAOAKit.simulators.statevector import (
+    get_qaoa_energy_and_gradient,
+    get_qaoa_energies,
+)
+from QAOAKit.parameter_optimization import (
+    optimize_angles,
+    optimize_fourier_angles,
+    angles_to_fourier,
+    fourier_to_angles,
+)
+
+
+def assign_weights(G, weight):
+    for u, v in G.edges():
+        G[u][v]["weight"] = weight
+    return G
+
+
+def test_symmetric_structure_detection():
+    assert get_symmetric_structure(nx.to_numpy_array(nx.complete_graph(6)))[
+        "parts"
+    ] == (6,)
+    G = nx.relabel_nodes(
+        nx.complete_bipartite_graph(2, 4), {0: 0, 1: 3, 2: 1, 3: 2, 4: 4, 5: 5}
+    )
+    w = nx.to_numpy_array(G, nodelist=range(6))
+    assert sorted(get_symmetric_structure(w)["parts"]) == [2, 4]
+    assert get_symmetric_structure(nx.to_numpy_array(nx.cycle_graph(5))) is None
+
+
+@pytest.mark.parametrize(
+    "G",
+    [
+        nx.complete_graph(5),
+        assign_weights(nx.complete_graph(4), 0.7),
+        nx.complete_bipartite_graph(2, 3),
+        assign_weights(nx.complete_bipartite_graph(3, 3), 1.3),
+    ],
+)
+def test_symmetric_energy_matches_statevector(G):
+    beta = np.array([0.3, -0.2])
+    gamma = np.array([0.4, 0.1])
+    assert np.isclose(
+        qaoa_maxcut_energy_symmetric(G, beta, gamma),
+        qaoa_maxcut_energy(G, beta, gamma),
+    )
+
+
+def test_mps_energy_matches_statevector():
+    G = nx.random_regular_graph(3, 8, seed=1)
+    for u, v in G.edges():
+        G[u][v]["weight"] = 1 + (u + v) / 10
+    beta = np.array([0.3, -0.2])
+    gamma = np.array([0.4, 0.1])
+    energy, info = qaoa_maxcut_energy_mps(G, beta, gamma, return_truncation_error=True)
+    assert np.isclose(energy, qaoa_maxcut_energy(G, beta, gamma))
+    assert info["truncation_error"] < 1e-9
+
+
+def test_mps_reports_truncation_error():
+    G = nx.random_regular_graph(3, 12, seed=2)
+    _, info = qaoa_maxcut_energy_mps(
+        G, [0.4], [0.6], max_bond_dim=2, return_truncation_error=True
+    )
+    assert info["max_bond_dim"] == 2
+    assert info["truncation_error"] > 0
+
+
+@pytest.mark.parametrize("n_threads,chunk_bits", [(1, 14), (3, 2), (4, 5)])
+def test_statevector_energy_matches_qiskit(n_threads, chunk_bits):
+    G = nx.erdos_renyi_graph(8, 0.5, seed=3)
+    for u, v in G.edges():
+        G[u][v]["weight"] = 1 + (u * v) % 3 / 4
+    beta = np.array([0.3, -0.2, 0.5])
+    gamma = np.array([0.4, 0.1, -0.3])
+    assert np.isclose(
+        qaoa_maxcut_energy_statevector(
+            G, beta, gamma, n_threads=n_threads, chunk_bits=chunk_bits
+        ),
+        qaoa_maxcut_energy(G, beta, gamma),
+    )
+
+
+def test_statevector_single_precision():
+    G = nx.random_regular_graph(3, 10, seed=4)
+    beta = np.array([0.3, -0.2])
+    gamma = np.array([0.4, 0.1])
+    single = qaoa_maxcut_energy_statevector(G, beta, gamma, precision="single")
+    double = qaoa_maxcut_energy_statevector(G, beta, gamma)
+    assert np.isclose(single, double, rtol=1e-5)
+
+
+def test_indexed_diagonal():
+    G = nx.erdos_renyi_graph(9, 0.5, seed=5)
+    for u, v in G.edges():
+        G[u][v]["weight"] = [0.5, 1.5, -1.0][(u + v) % 3]
+    diagonal = get_indexed_maxcut_diagonal(G, chunk_bits=4, n_threads=2)
+    assert diagonal.index.dtype == np.uint8
+    assert np.allclose(diagonal[:], get_maxcut_diagonal(G))
+    beta = np.array([0.3, -0.2])
+    gamma = np.array([0.4, 0.1])
+    assert np.isclose(
+        qaoa_maxcut_energy_statevector(G, beta, gamma, precomputed_energies=diagonal),
+        qaoa_maxcut_energy_statevector(G, beta, gamma, phase_table=False),
+    )
+    G[0][next(iter(G[0]))]["weight"] = np.pi
+    assert get_indexed_maxcut_diagonal(G) is None
+
+
+def test_adjoint_gradient_matches_finite_differences():
+    G = nx.erdos_renyi_graph(7, 0.5, seed=3)
+    diagonal = get_maxcut_diagonal(G)
+    beta = np.array([0.3, -0.2, 0.5])
+    gamma = np.array([0.4, 0.1, -0.3])
+    energy, grad_beta, grad_gamma = get_qaoa_energy_and_gradient(
+        diagonal, beta, gamma, chunk_bits=3
+    )
+    assert np.isclose(energy, qaoa_maxcut_energy(G, beta, gamma))
+    eps = 1e-6
+    for i in range(3):
+        shift = eps * np.eye(3)[i]
+        d_beta = qaoa_maxcut_energy_statevector(
+            G, beta + shift, gamma
+        ) - qaoa_maxcut_energy_statevector(G, beta - shift, gamma)
+        d_gamma = qaoa_maxcut_energy_statevector(
+            G, beta, gamma + shift
+        ) - qaoa_maxcut_energy_statevector(G, beta, gamma - shift)
+        assert np.isclose(grad_beta[i], d_beta / (2 * eps), atol=1e-6)
+        assert np.isclose(grad_gamma[i], d_gamma / (2 * eps), atol=1e-6)
+
+
+@pytest.mark.parametrize("method", ["lbfgs", "adam"])
+def test_optimize_angles_improves_energy(method):
+    G = nx.random_regular_graph(3, 8, seed=6)
+    res = optimize_angles(G, [0.3], [-0.3], method=method, maxiter=100)
+    assert res["energy"] > res["initial_energy"]
+    assert res["nfev"] == res["ngev"]
+    assert np.isclose(res["energy"], qaoa_maxcut_energy(G, res["beta"], res["gamma"]))
+
+
+def test_fourier_reparameterisation():
+    beta, gamma = np.array([0.5, 0.3, 0.1]), np.array([0.2, 0.4, 0.6])
+    u, v = angles_to_fourier(beta, gamma, 3)
+    assert np.allclose(fourier_to_angles(u, v, 3), (beta, gamma))
+    G = nx.random_regular_graph(3, 8, seed=6)
+    res = optimize_fourier_angles(G, u[:2], v[:2], 3)
+    assert res["energy"] > res["initial_energy"]
+    assert np.allclose(fourier_to_angles(res["u"], res["v"], 3), (res["beta"], res["gamma"]))
+    assert np.isclose(res["energy"], qaoa_maxcut_energy(G, res["beta"], res["gamma"]))
+
+
+def test_batched_energies():
+    G = nx.erdos_renyi_graph(7, 0.5, seed=3)
+    rng = np.random.default_rng(0)
+    betas, gammas = rng.uniform(-1, 1, (2, 10, 2))
+    energies = get_qaoa_energies(get_maxcut_diagonal(G), betas, gammas, 2**8)
+    expected = [qaoa_maxcut_energy(G, b, g) for b, g in zip(betas, gammas)]
+    assert np.allclose(energies, expected)
+    indexed = get_qaoa_energies(get_indexed_maxcut_diagonal(G), betas, gammas)
+    assert np.allclose(indexed, expected)
+
+
+def test_p1_closed_form_matches_qiskit():
+    G = nx.erdos_renyi_graph(8, 0.5, seed=4)
+    rng = np.random.default_rng(1)
+    for u, v in G.edges():
+        G[u][v]["weight"] = rng.normal()
+    betas, gammas = rng.uniform(-1, 1, (2, 6))
+    energies = qaoa_maxcut_energy_p1(G, betas, gammas, max_batch_size=4)
+    expected = [qaoa_maxcut_energy(G, [b], [g]) for b, g in zip(betas, gammas)]
+    assert np.allclose(energies, expected)
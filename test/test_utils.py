@@ -1,9 +1,12 @@
 import pytest
+import time
+import json
 from fastapi.testclient import TestClient
 from main import app
 import networkx as nx
 import numpy as np
 from models.base import InstanceClass
+from config import BASIC_AUTH_USERNAME, BASIC_AUTH_PASSWORD
 
 client = TestClient(app)
 
@@ -108,5 +111,107 @@ def test_invalid_instance_class(auth_headers):
                            headers=auth_headers)
     assert response.status_code == 400
 
+def test_optimize():
+    graph = nx.to_numpy_array(nx.cycle_graph(6)).tolist()
+    response = client.post("/graph/optimize",
+                           json={"adjacency_matrix": graph, "p": 2, "beta": [0.3, 0.2], "gamma": [-0.2, -0.3]},
+                           auth=(BASIC_AUTH_USERNAME, BASIC_AUTH_PASSWORD))
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["beta"]) == 2 and len(data["gamma"]) == 2
+    assert data["energy"] >= data["initial_energy"]
+    assert data["nfev"] > 0 and data["ngev"] > 0
+    assert data["source"] == "Optimize"
+
+@pytest.mark.parametrize("strategy", ["interp", "fourier"])
+def test_interp_ladder(strategy):
+    graph = nx.to_numpy_array(nx.cycle_graph(6)).tolist()
+    response = client.post("/graph/interp/ladder",
+                           json={"adjacency_matrix": graph, "p": 1, "beta": [-0.3], "gamma": [0.3], "k": 2, "strategy": strategy},
+                           auth=(BASIC_AUTH_USERNAME, BASIC_AUTH_PASSWORD))
+    assert response.status_code == 200
+    levels = [json.loads(line) for line in response.text.strip().split("\n")]
+    assert [level["p"] for level in levels] == [1, 2, 3]
+    for level in levels:
+        assert len(level["beta"]) == len(level["gamma"]) == level["p"]
+        assert level["energy"] >= level["initial_energy"]
+    # more layers never do worse
+    assert levels[-1]["energy"] >= levels[0]["energy"] - 1e-6
+
+@pytest.mark.parametrize("strategy", ["random", "tqa"])
+def test_multistart(strategy):
+    graph = nx.to_numpy_array(nx.random_regular_graph(3, 8, seed=1)).tolist()
+    response = client.post("/graph/multistart",
+                           json={"adjacency_matrix": graph, "p": 2, "strategy": strategy, "n_samples": 32, "top_m": 3, "seed": 0},
+                           auth=(BASIC_AUTH_USERNAME, BASIC_AUTH_PASSWORD))
+    assert response.status_code == 200
+    data = response.json()
+    assert data["source"] == f"MultiStart_{strategy}"
+    assert len(data["optimized_energies"]) == 3
+    assert data["energy"] == max(data["optimized_energies"])
+    assert data["energy"] >= data["sample_energies"]["max"] - 1e-9
+
+@pytest.mark.parametrize("p", [1, 3])
+def test_tqa_auto(p):
+    graph = nx.to_numpy_array(nx.random_regular_graph(3, 8, seed=1)).tolist()
+    response = client.post("/graph/tqa_initialisation",
+                           json={"adjacency_matrix": graph, "p": p, "t_max": "auto", "n_scan": 16},
+                           auth=(BASIC_AUTH_USERNAME, BASIC_AUTH_PASSWORD))
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["beta"]) == p and len(data["gamma"]) == p
+    assert data["nfev"] == len(data["scan"]["t_max"]) > 16
+    assert data["energy"] == max(data["scan"]["energy"])
+    assert data["t_max"] == data["scan"]["t_max"][np.argmax(data["scan"]["energy"])]
+    response = client.post("/graph/tqa_initialisation",
+                           json={"adjacency_matrix": graph, "p": p, "t_max": "best"},
+                           auth=(BASIC_AUTH_USERNAME, BASIC_AUTH_PASSWORD))
+    assert response.status_code == 422
+
+def test_maxcut_baseline():
+    auth = (BASIC_AUTH_USERNAME, BASIC_AUTH_PASSWORD)
+    G = nx.random_regular_graph(3, 12, seed=2)
+    response = client.post("/graph/maxcut_baseline", json={"adjacency_matrix": nx.to_numpy_array(G).tolist()}, auth=auth)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["method"] == "exact" and data["exact"]
+    assert data["value"] == sum(1 for u, v in G.edges() if data["cut"][u] != data["cut"][v])
+    # an isomorphic copy is served from the cache
+    relabelled = nx.to_numpy_array(G, nodelist=np.random.default_rng(0).permutation(12)).tolist()
+    data = client.post("/graph/maxcut_baseline", json={"adjacency_matrix": relabelled, "method": "local_search"}, auth=auth).json()
+    assert data["cached"] and data["exact"]
+    G = nx.random_regular_graph(3, 30, seed=2)
+    data = client.post("/graph/maxcut_baseline", json={"adjacency_matrix": nx.to_numpy_array(G).tolist(), "method": "local_search", "nsamples": 20},
+                       auth=auth).json()
+    assert not data["exact"] and data["upper_bound"] is None
+    assert data["value"] == sum(1 for u, v in G.edges() if data["cut"][u] != data["cut"][v])
+
+@pytest.fixture
+def job_manager(tmp_path, monkeypatch):
+    from utils.jobs import JobManager
+    manager = JobManager(tmp_path / "jobs.sqlite", max_workers=1, max_queue=4)
+    monkeypatch.setattr("routes.jobs.job_manager", manager)
+    return manager
+
+def test_jobs(job_manager):
+    auth = (BASIC_AUTH_USERNAME, BASIC_AUTH_PASSWORD)
+    graph = nx.to_numpy_array(nx.cycle_graph(5)).tolist()
+    response = client.post("/jobs", json={"adjacency_matrix": graph, "p": 1, "kind": "maxcut"}, auth=auth)
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    for _ in range(100):
+        data = client.get(f"/jobs/{job_id}", auth=auth).json()
+        if data["status"] == "done":
+            break
+        time.sleep(0.1)
+    assert data["result"] == {"maxcut": 4.0}
+    # an isomorphic graph is deduplicated
+    relabelled = nx.to_numpy_array(nx.cycle_graph(5), nodelist=[2, 0, 3, 1, 4]).tolist()
+    response = client.post("/jobs", json={"adjacency_matrix": relabelled, "p": 1, "kind": "maxcut"}, auth=auth)
+    assert response.json()["id"] == job_id
+    lines = client.get(f"/jobs/{job_id}/stream", auth=auth).text.strip().split("\n")
+    assert '"status":"done"' in lines[-1]
+    assert client.get("/jobs/unknown", auth=auth).status_code == 404
+
 if __name__ == "__main__":
     pytest.main()
\ No newline at end of file
@@ -0,0 +1,262 @@
+# Asynchronous jobs for evaluations that take longer than an HTTP request.
+# Jobs run on a local process pool and their state and results are kept in
+# SQLite, so finished work survives restarts and unfinished jobs are requeued.
+import json
+import sqlite3
+import threading
+import time
+import uuid
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+import networkx as nx
+import numpy as np
+
+from QAOAKit.utils import get_canonical_graph_hash
+from QAOAKit.classical import maxcut_brute_force
+from QAOAKit.parameter_optimization import optimize_angles
+from QAOAKit.simulators.statevector import (
+    get_maxcut_diagonal,
+    get_indexed_maxcut_diagonal,
+    get_qaoa_landscape,
+)
+from config import JOBS_DB_PATH, JOBS_MAX_WORKERS, JOBS_MAX_QUEUE
+
+MAX_JOB_QUBITS = 26
+TERMINAL_STATUSES = ("done", "failed", "cancelled")
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+def run_job(kind, adjacency_matrix, p, params):
+    """Runs one job in a worker process and returns a JSON-serialisable result
+
+    kind "optimize": refines params['beta'], params['gamma'] with `optimize_angles`,
+        other params (method, maxiter, tol, learning_rate) are passed through
+    kind "maxcut": brute-force optimal cut value
+    kind "landscape": p = 1 energies on a params['n_beta'] x params['n_gamma'] grid
+        over beta in [-pi/4, pi/4] and gamma in [-pi, pi]
+    """
+    G = nx.from_numpy_array(np.array(adjacency_matrix))
+    if G.number_of_nodes() > MAX_JOB_QUBITS:
+        raise ValueError(f"Jobs support graphs with at most {MAX_JOB_QUBITS} nodes")
+    if kind == "optimize":
+        options = ["method", "maxiter", "tol", "learning_rate"]
+        res = optimize_angles(
+            G,
+            params["beta"],
+            params["gamma"],
+            **{k: params[k] for k in options if k in params},
+        )
+        res["beta"] = [float(x) for x in res["beta"]]
+        res["gamma"] = [float(x) for x in res["gamma"]]
+        return res
+    elif kind == "maxcut":
+        value, _ = maxcut_brute_force(G)
+        return {"maxcut": value}
+    elif kind == "landscape":
+        if p != 1:
+            raise ValueError("Landscapes are only available for p = 1")
+        betas = np.linspace(-np.pi / 4, np.pi / 4, params.get("n_beta", 32))
+        gammas = np.linspace(-np.pi, np.pi, params.get("n_gamma", 32))
+        diagonal = get_indexed_maxcut_diagonal(G)
+        if diagonal is None:
+            diagonal = get_maxcut_diagonal(G)
+        energies = get_qaoa_landscape(diagonal, betas, gammas)
+        return {
+            "beta": betas.tolist(),
+            "gamma": gammas.tolist(),
+            "energy": energies.tolist(),
+        }
+    raise ValueError(f"Unknown job kind {kind}")
+
+
+def get_job_key(kind, adjacency_matrix, p, params):
+    """Identical submissions (up to graph isomorphism) share the same key"""
+    G = nx.from_numpy_array(np.array(adjacency_matrix))
+    key = {
+        "graph": get_canonical_graph_hash(G),
+        "p": p,
+        "kind": kind,
+        "params": params,
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+class JobStore:
+    """SQLite table of jobs; a connection is opened per operation
+    so the store can be used from the request and executor threads
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    key TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key)")
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def to_dict(row):
+        job_id, key, kind, request, status, result, error, created, updated = row
+        return {
+            "id": job_id,
+            "key": key,
+            "kind": kind,
+            "request": json.loads(request),
+            "status": status,
+            "result": None if result is None else json.loads(result),
+            "error": error,
+            "created": created,
+            "updated": updated,
+        }
+
+    def get(self, job_id):
+        with self.connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return None if row is None else self.to_dict(row)
+
+    def find(self, key):
+        """Returns the most recent job with key that was not cancelled and did not fail"""
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE key = ? AND status IN ('queued', 'running', 'done') "
+                "ORDER BY created DESC LIMIT 1",
+                (key,),
+            ).fetchone()
+        return None if row is None else self.to_dict(row)
+
+    def unfinished(self):
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'running') ORDER BY created"
+            ).fetchall()
+        return [self.to_dict(row) for row in rows]
+
+    def insert(self, job_id, key, kind, request):
+        now = time.time()
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?, 'queued', NULL, NULL, ?, ?)",
+                (job_id, key, kind, json.dumps(request), now, now),
+            )
+
+    def update(self, job_id, status, result=None, error=None):
+        with self.connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated = ? WHERE id = ?",
+                (
+                    status,
+                    None if result is None else json.dumps(result),
+                    error,
+                    time.time(),
+                    job_id,
+                ),
+            )
+
+
+class JobManager:
+    """Runs jobs on a process pool with a bounded number of active jobs
+
+    The pool and the store are created on first use; at that point jobs left
+    queued or running by a previous server process are submitted again.
+    Cancelling a job that is already running lets the worker finish
+    but its result is discarded.
+    """
+
+    def __init__(self, db_path, max_workers, max_queue):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.store = None
+        self.executor = None
+        self.futures = {}
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.executor is not None:
+                return
+            self.store = JobStore(self.db_path)
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            for job in self.store.unfinished():
+                self.run(job["id"], job["kind"], job["request"])
+
+    def run(self, job_id, kind, request):
+        future = self.executor.submit(
+            run_job,
+            kind,
+            request["adjacency_matrix"],
+            request["p"],
+            request["params"],
+        )
+        self.futures[job_id] = future
+        future.add_done_callback(partial(self.finish, job_id))
+
+    def finish(self, job_id, future):
+        self.futures.pop(job_id, None)
+        if future.cancelled():
+            self.store.update(job_id, "cancelled")
+        elif future.exception() is not None:
+            self.store.update(job_id, "failed", error=str(future.exception()))
+        elif self.store.get(job_id)["status"] != "cancelled":
+            self.store.update(job_id, "done", result=future.result())
+
+    def submit(self, kind, adjacency_matrix, p, params):
+        """Submits a job, or returns the existing job for an identical submission
+
+        Raises JobQueueFullError if max_queue jobs are already queued or running
+        """
+        self.start()
+        key = get_job_key(kind, adjacency_matrix, p, params)
+        existing = self.store.find(key)
+        if existing is not None:
+            return self.get(existing["id"])
+        with self.lock:
+            if len(self.futures) >= self.max_queue:
+                raise JobQueueFullError(
+                    f"Too many active jobs ({len(self.futures)}), try again later"
+                )
+            job_id = uuid.uuid4().hex
+            request = {"adjacency_matrix": adjacency_matrix, "p": p, "params": params}
+            self.store.insert(job_id, key, kind, request)
+            self.run(job_id, kind, request)
+        return self.get(job_id)
+
+    def get(self, job_id):
+        self.start()
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        future = self.futures.get(job_id)
+        if job["status"] == "queued" and future is not None and future.running():
+            job["status"] = "running"
+        return job
+
+    def cancel(self, job_id):
+        self.start()
+        job = self.store.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return self.get(job_id)
+        future = self.futures.get(job_id)
+        if future is None or not future.cancel():
+            self.store.update(job_id, "cancelled")
+        return self.get(job_id)
+
+
+job_manager = JobManager(JOBS_DB_PATH, JOBS_MAX_WORKERS, JOBS_MAX_QUEUE)